@@ -12,7 +12,13 @@ from typing import Optional, MutableMapping, Any, Tuple, Union, List
 from multinet import auth
 from multinet.auth import google
 from multinet import api
-from multinet.db import register_legacy_workspaces
+from multinet.db import (
+    register_legacy_workspaces,
+    ensure_system_indexes,
+    configure_query_cache,
+    monitor,
+    pool_stats,
+)
 from multinet import uploaders, downloaders
 from multinet.errors import ServerError
 from multinet.util import flask_secret_key
@@ -41,8 +47,9 @@ def create_app(config: Optional[MutableMapping] = None) -> Flask:
     CORS(app, origins=allowed_origins, supports_credentials=True)
     Swagger(app, template_file="swagger/template.yaml")
 
-    # Set max file upload size to 32 MB
-    app.config["MAX_CONTENT_LENGTH"] = 32 * 1024 * 1024
+    # Set max file upload size (32 MB by default)
+    max_upload_mb = int(os.environ.get("MAX_UPLOAD_SIZE_MB", "32"))
+    app.config["MAX_CONTENT_LENGTH"] = max_upload_mb * 1024 * 1024
 
     app.secret_key = flask_secret_key()
 
@@ -66,6 +73,13 @@ def create_app(config: Optional[MutableMapping] = None) -> Flask:
 
     google.init_oauth(app)
     register_legacy_workspaces()
+    configure_query_cache()
+
+    missing_indexes = ensure_system_indexes()
+    if missing_indexes:
+        app.logger.warning(
+            "Could not create system indexes: %s", "; ".join(missing_indexes)
+        )
 
     # Register error handler.
     @app.errorhandler(ServerError)
@@ -87,4 +101,22 @@ def create_app(config: Optional[MutableMapping] = None) -> Flask:
             </div>
         """
 
+    @app.route("/health")
+    def health() -> Tuple[Any, int]:
+        status = monitor.status()
+
+        # The route needs no login, so connection errors and pool details
+        # (which name the database's address) are logged, not returned.
+        if not status["live"]:
+            app.logger.warning(
+                "Database unreachable: %s (pool: %s)", status["error"], pool_stats()
+            )
+
+        report = {
+            "live": status["live"],
+            "circuit": status["circuit"],
+            "consecutive_failures": status["consecutive_failures"],
+        }
+        return (report, 200 if status["live"] else 503)
+
     return app
@@ -1,9 +1,10 @@
 """Flask blueprint for Multinet REST API."""
+import os
 from copy import deepcopy
 from dataclasses import asdict
 from flasgger import swag_from
-from flask import Blueprint, request
-from webargs import fields
+from flask import Blueprint, Response, request
+from webargs import fields, validate
 from webargs.flaskparser import use_kwargs
 
 from typing import Any, Optional, List, Dict, cast
@@ -20,17 +21,29 @@ from multinet.validation import ValidationFailure, UndefinedKeys, UndefinedTable
 from multinet.types import WorkspacePermissions
 
 from multinet import db, util
+from multinet.downloaders.d3_json import d3_json
 from multinet.errors import (
     ValidationFailed,
     BadQueryArgument,
     MalformedRequestBody,
     AlreadyExists,
     RequiredParamsMissing,
+    TableNotFound,
 )
 from multinet.user import current_user, find_user_from_id
 
 bp = Blueprint("multinet", __name__)
 
+# How many steps out from its seeds a subgraph may reach.
+MAX_SUBGRAPH_DEPTH = 5
+
+# The most nodes and edges a subgraph may hold; larger limits are lowered to these.
+MAX_SUBGRAPH_NODES = int(os.environ.get("SUBGRAPH_MAX_NODES", "10000"))
+MAX_SUBGRAPH_EDGES = int(os.environ.get("SUBGRAPH_MAX_EDGES", "50000"))
+
+# How many missing keys to report for each table when graph creation fails.
+MAX_UNDEFINED_KEYS = 100
+
 
 # Included here due to circular imports
 # TODO: Remove once implementing new ORM and permission storage
@@ -132,11 +145,13 @@ def set_workspace_permissions(workspace: str) -> Any:
 
 @bp.route("/workspaces/<workspace>/tables", methods=["GET"])
 @require_reader
-@use_kwargs({"type": fields.Str()})
+@use_kwargs({"type": fields.Str(), "counts": fields.Bool()})
 @swag_from("swagger/workspace_tables.yaml")
-def get_workspace_tables(workspace: str, type: TableType = "all") -> Any:  # noqa: A002
+def get_workspace_tables(
+    workspace: str, type: TableType = "all", counts: bool = False  # noqa: A002
+) -> Any:
     """Retrieve the tables of a single workspace."""
-    tables = db.workspace_tables(workspace, type)
+    tables = db.workspace_tables(workspace, type, counts)
     return util.stream(tables)
 
 
@@ -154,11 +169,33 @@ def create_aql_table(workspace: str, table: str) -> Any:
 
 @bp.route("/workspaces/<workspace>/tables/<table>", methods=["GET"])
 @require_reader
-@use_kwargs({"offset": fields.Int(), "limit": fields.Int()})
+@use_kwargs(
+    {
+        "offset": fields.Int(),
+        "limit": fields.Int(),
+        "cursor": fields.Str(),
+        "count": fields.Bool(),
+    }
+)
 @swag_from("swagger/table_rows.yaml")
-def get_table_rows(workspace: str, table: str, offset: int = 0, limit: int = 30) -> Any:
+def get_table_rows(
+    workspace: str,
+    table: str,
+    offset: int = 0,
+    limit: int = 30,
+    cursor: Optional[str] = None,
+    count: bool = True,
+) -> Any:
     """Retrieve the rows and headers of a table."""
-    return db.workspace_table(workspace, table, offset, limit)
+    return db.workspace_table(workspace, table, offset, limit, cursor, count)
+
+
+@bp.route("/workspaces/<workspace>/tables/<table>/schema", methods=["GET"])
+@require_reader
+@swag_from("swagger/table_schema.yaml")
+def get_table_schema(workspace: str, table: str) -> Any:
+    """Retrieve the columns of a table, with statistics about each."""
+    return db.table_schema(workspace, table).describe()
 
 
 @bp.route("/workspaces/<workspace>/graphs", methods=["GET"])
@@ -180,13 +217,25 @@ def get_workspace_graph(workspace: str, graph: str) -> Any:
 
 @bp.route("/workspaces/<workspace>/graphs/<graph>/nodes", methods=["GET"])
 @require_reader
-@use_kwargs({"offset": fields.Int(), "limit": fields.Int()})
+@use_kwargs(
+    {
+        "offset": fields.Int(),
+        "limit": fields.Int(),
+        "cursor": fields.Str(),
+        "count": fields.Bool(),
+    }
+)
 @swag_from("swagger/graph_nodes.yaml")
 def get_graph_nodes(
-    workspace: str, graph: str, offset: int = 0, limit: int = 30
+    workspace: str,
+    graph: str,
+    offset: int = 0,
+    limit: int = 30,
+    cursor: Optional[str] = None,
+    count: bool = True,
 ) -> Any:
     """Retrieve the nodes of a graph."""
-    return db.graph_nodes(workspace, graph, offset, limit)
+    return db.graph_nodes(workspace, graph, offset, limit, cursor, count)
 
 
 @bp.route(
@@ -200,11 +249,79 @@ def get_node_data(workspace: str, graph: str, table: str, node: str) -> Any:
     return db.graph_node(workspace, graph, table, node)
 
 
+@bp.route(
+    "/workspaces/<workspace>/graphs/<graph>/nodes/attributes", methods=["POST"]
+)
+@require_reader
+@swag_from("swagger/nodes_data.yaml")
+def get_nodes_data(workspace: str, graph: str) -> Any:
+    """Return the attributes associated with a list of nodes."""
+    node_ids = request.get_json(silent=True)
+    if not isinstance(node_ids, list) or not all(
+        isinstance(node_id, str) and "/" in node_id for node_id in node_ids
+    ):
+        raise MalformedRequestBody(request.data.decode("utf8", errors="replace"))
+
+    return util.stream(db.graph_nodes_by_id(workspace, graph, node_ids))
+
+
+@bp.route("/workspaces/<workspace>/graphs/<graph>/subgraph", methods=["POST"])
+@require_reader
+@use_kwargs(
+    {
+        "seeds": fields.List(fields.Str(), required=True),
+        "depth": fields.Int(),
+        "direction": fields.Str(),
+        "node_limit": fields.Int(validate=validate.Range(min=1)),
+        "edge_limit": fields.Int(validate=validate.Range(min=1)),
+        "filters": fields.Dict(),
+    }
+)
+@swag_from("swagger/subgraph.yaml")
+def get_subgraph(
+    workspace: str,
+    graph: str,
+    seeds: List[str],
+    depth: int = 1,
+    direction: EdgeDirection = "all",
+    node_limit: int = 1000,
+    edge_limit: int = 5000,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """Return the subgraph around some seed nodes, in d3 json format."""
+    if not 0 <= depth <= MAX_SUBGRAPH_DEPTH:
+        allowed = [str(d) for d in range(MAX_SUBGRAPH_DEPTH + 1)]
+        raise BadQueryArgument("depth", str(depth), allowed)
+
+    if any("/" not in seed for seed in seeds):
+        raise MalformedRequestBody(request.data.decode("utf8", errors="replace"))
+
+    nodes, links = db.subgraph(
+        workspace,
+        graph,
+        seeds,
+        depth,
+        direction,
+        min(node_limit, MAX_SUBGRAPH_NODES),
+        min(edge_limit, MAX_SUBGRAPH_EDGES),
+        filters or {},
+    )
+    return Response(d3_json(nodes, links), mimetype="application/json")
+
+
 @bp.route(
     "/workspaces/<workspace>/graphs/<graph>/nodes/<table>/<node>/edges", methods=["GET"]
 )
 @require_reader
-@use_kwargs({"direction": fields.Str(), "offset": fields.Int(), "limit": fields.Int()})
+@use_kwargs(
+    {
+        "direction": fields.Str(),
+        "offset": fields.Int(),
+        "limit": fields.Int(),
+        "count": fields.Bool(),
+        "neighbors": fields.Bool(),
+    }
+)
 @swag_from("swagger/node_edges.yaml")
 def get_node_edges(
     workspace: str,
@@ -214,13 +331,17 @@ def get_node_edges(
     direction: EdgeDirection = "all",
     offset: int = 0,
     limit: int = 30,
+    count: bool = True,
+    neighbors: bool = False,
 ) -> Any:
     """Return the edges connected to a node."""
     allowed = ["incoming", "outgoing", "all"]
     if direction not in allowed:
         raise BadQueryArgument("direction", direction, allowed)
 
-    return db.node_edges(workspace, graph, table, node, offset, limit, direction)
+    return db.node_edges(
+        workspace, graph, table, node, offset, limit, direction, count, neighbors
+    )
 
 
 @bp.route("/workspaces/<workspace>", methods=["POST"])
@@ -285,23 +406,29 @@ def create_graph(workspace: str, graph: str, edge_table: Optional[str] = None) -
     if loaded_workspace.has_graph(graph):
         raise AlreadyExists("Graph", graph)
 
-    # Get reference tables with respective referenced keys,
-    # tables in the _from column and tables in the _to column
+    if not loaded_workspace.has_collection(edge_table):
+        raise TableNotFound(workspace, edge_table)
+
+    # Get the tables in the _from column and the tables in the _to column
     edge_table_properties = util.get_edge_table_properties(workspace, edge_table)
-    referenced_tables = edge_table_properties["table_keys"]
     from_tables = edge_table_properties["from_tables"]
     to_tables = edge_table_properties["to_tables"]
 
     errors: List[ValidationFailure] = []
-    for table, keys in referenced_tables.items():
+    existing_tables = []
+    for table in sorted(from_tables | to_tables):
         if not loaded_workspace.has_collection(table):
             errors.append(UndefinedTable(table=table))
         else:
-            table_keys = set(loaded_workspace.collection(table).keys())
-            undefined = keys - table_keys
-
-            if undefined:
-                errors.append(UndefinedKeys(table=table, keys=list(undefined)))
+            existing_tables.append(table)
+
+    # Check the referenced keys in the database, bringing back only (some of)
+    # those that are missing.
+    missing = db.missing_references(
+        workspace, edge_table, existing_tables, MAX_UNDEFINED_KEYS
+    )
+    for table, keys in missing.items():
+        errors.append(UndefinedKeys(table=table, keys=keys))
 
     if errors:
         raise ValidationFailed(errors)
@@ -1,12 +1,12 @@
 """Utility functions for auth."""
 
 import functools
-from typing import Any, Optional, Callable
+from typing import Any, Optional, Callable, Tuple
 
 from multinet import db
 from multinet.errors import Unauthorized
 from multinet.types import Workspace
-from multinet.auth.types import UserInfo
+from multinet.auth.types import User, UserInfo
 from multinet.user import current_user
 
 
@@ -27,6 +27,16 @@ def require_login(f: Callable) -> Callable:
     return wrapper
 
 
+def request_context(workspace: str) -> Tuple[Optional[User], Workspace]:
+    """
+    Return the logged in user and the metadata of `workspace`.
+
+    Both are resolved at most once per request and shared with the view
+    function and the `multinet.db` helpers it calls.
+    """
+    return current_user(), db.get_workspace_metadata(workspace)
+
+
 def is_reader(user: Optional[UserInfo], workspace: Workspace) -> bool:
     """Indicate whether `user` has read permissions for `workspace`."""
     perms = workspace["permissions"]
@@ -52,8 +62,7 @@ def require_reader(f: Any) -> Any:
 
     @functools.wraps(f)
     def wrapper(workspace: str, *args: Any, **kwargs: Any) -> Any:
-        user = current_user()
-        workspace_metadata = db.get_workspace_metadata(workspace)
+        user, workspace_metadata = request_context(workspace)
         if not is_reader(user, workspace_metadata):
             raise Unauthorized(f"You must be a reader of workspace '{workspace}'")
 
@@ -81,8 +90,7 @@ def require_writer(f: Any) -> Any:
 
     @functools.wraps(f)
     def wrapper(workspace: str, *args: Any, **kwargs: Any) -> Any:
-        user = current_user()
-        workspace_metadata = db.get_workspace_metadata(workspace)
+        user, workspace_metadata = request_context(workspace)
         if not is_writer(user, workspace_metadata):
             raise Unauthorized(f"You must be a writer of workspace '{workspace}'")
 
@@ -108,8 +116,7 @@ def require_maintainer(f: Any) -> Any:
 
     @functools.wraps(f)
     def wrapper(workspace: str, *args: Any, **kwargs: Any) -> Any:
-        user = current_user()
-        workspace_metadata = db.get_workspace_metadata(workspace)
+        user, workspace_metadata = request_context(workspace)
         if not is_maintainer(user, workspace_metadata):
             raise Unauthorized(f"You must be a maintainer of workspace '{workspace}'")
 
@@ -135,8 +142,7 @@ def require_owner(f: Any) -> Any:
 
     @functools.wraps(f)
     def wrapper(workspace: str, *args: Any, **kwargs: Any) -> Any:
-        user = current_user()
-        workspace_metadata = db.get_workspace_metadata(workspace)
+        user, workspace_metadata = request_context(workspace)
         if not is_owner(user, workspace_metadata):
             raise Unauthorized(f"You must be the owner of workspace '{workspace}'")
 
@@ -0,0 +1,156 @@
+"""Caches that stay consistent across worker processes."""
+import functools
+import threading
+import time
+
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Revision:
+    """
+    A revision marker for some shared state, e.g. an ArangoDB collection.
+
+    The marker is re-read from `source` at most once every `ttl` seconds, so
+    every cache keyed on it notices writes made by *other* worker processes
+    within `ttl` seconds, at the cost of one cheap read per interval instead of
+    one read per lookup.
+    """
+
+    def __init__(self, source: Callable[[], str], ttl: float):
+        """Initialize the marker with its source and refresh interval."""
+        self.source = source
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._value: Optional[str] = None
+        self._checked = 0.0
+
+    def current(self) -> str:
+        """Return the current revision, re-reading it if it has gone stale."""
+        with self._lock:
+            now = time.monotonic()
+            if self._value is None or now - self._checked >= self.ttl:
+                self._value = self.source()
+                self._checked = now
+
+            return self._value
+
+    def expire(self) -> None:
+        """Force the next call to `current()` to re-read the revision."""
+        with self._lock:
+            self._value = None
+
+
+class RevisionCache(Generic[T]):
+    """
+    Memoize a function until the revision it depends on changes.
+
+    Unless `cache_misses` is set, None results aren't stored, so that lookups
+    of arbitrary missing keys can't grow the cache.
+    """
+
+    def __init__(
+        self, func: Callable[..., T], revision: Revision, cache_misses: bool = True
+    ):
+        """Wrap `func`, caching its results under `revision`."""
+        functools.update_wrapper(self, func)
+        self.__wrapped__ = func
+        self.revision = revision
+        self.cache_misses = cache_misses
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[Hashable, ...], T] = {}
+        self._revision: Optional[str] = None
+
+    def __call__(self, *args: Hashable, **kwargs: Hashable) -> T:
+        """Return the cached result for these arguments, computing it if needed."""
+        key = args + tuple(sorted(kwargs.items()))
+        revision = self.revision.current()
+
+        with self._lock:
+            if revision != self._revision:
+                self._entries.clear()
+                self._revision = revision
+
+            if key in self._entries:
+                return self._entries[key]
+
+        value = self.__wrapped__(*args, **kwargs)
+        if value is None and not self.cache_misses:
+            return value
+
+        with self._lock:
+            # Don't store a value computed against a revision that has since
+            # been replaced.
+            if revision == self._revision:
+                self._entries[key] = value
+
+        return value
+
+    def cache_clear(self) -> None:
+        """Discard every cached result in this process."""
+        with self._lock:
+            self._entries.clear()
+            self._revision = None
+
+        self.revision.expire()
+
+
+def revision_cache(
+    revision: Revision, cache_misses: bool = True
+) -> Callable[[Callable[..., T]], RevisionCache[T]]:
+    """Decorate a function to cache its results until `revision` changes."""
+
+    def decorator(func: Callable[..., T]) -> RevisionCache[T]:
+        return RevisionCache(func, revision, cache_misses)
+
+    return decorator
+
+
+class TTLCache(Generic[K, V]):
+    """A small thread-safe mapping whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        """Initialize an empty cache."""
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._entries: Dict[K, Tuple[float, V]] = {}
+
+    def get(self, key: K) -> Optional[V]:
+        """Return the live entry for `key`, if there is one."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store `value` under `key`, evicting the oldest entry if full."""
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.maxsize:
+                del self._entries[next(iter(self._entries))]
+
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key: K) -> None:
+        """Remove the entry for `key`, if there is one."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,18 @@
+"""State that is resolved once and shared for the lifetime of a request."""
+from flask import g, has_request_context
+
+from typing import Any, Dict
+
+
+def request_cache(name: str) -> Dict[Any, Any]:
+    """
+    Return the dict named `name` that is stored on the current request.
+
+    Outside of a request (e.g. in scripts and tests) a fresh, throwaway dict is
+    returned, so callers can use this unconditionally.
+    """
+    if not has_request_context():
+        return {}
+
+    caches = g.setdefault("multinet_cache", {})
+    return caches.setdefault(name, {})
@@ -1,10 +1,10 @@
 """Low-level database operations."""
 import os
 import copy
+import itertools
 from functools import lru_cache
 from uuid import uuid4
 
-from arango import ArangoClient
 from arango.graph import Graph
 from arango.database import StandardDatabase
 from arango.collection import StandardCollection
@@ -14,12 +14,24 @@ from arango.cursor import Cursor
 from arango.exceptions import (
     DatabaseCreateError,
     EdgeDefinitionCreateError,
+    IndexCreateError,
     AQLQueryValidateError,
     AQLQueryExecuteError,
 )
-from requests.exceptions import ConnectionError
 
-from typing import Any, List, Dict, Set, Generator, Optional, cast
+from typing import (
+    Any,
+    List,
+    Dict,
+    Set,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 from typing_extensions import TypedDict
 from multinet.types import (
     EdgeDirection,
@@ -31,63 +43,107 @@ from multinet.types import (
 from multinet.auth.types import User
 from multinet.errors import InternalServerError
 from multinet.validation.csv import validate_csv
-from multinet import util
+from multinet import util, queries
+from multinet.pagination import encode_cursor, decode_cursor
+from multinet.cache import Revision, revision_cache
+from multinet.context import request_cache
+from multinet.health import HealthMonitor
+from multinet.pool import HandleRegistry, PoolStats
+from multinet.schema import TableSchema
+from multinet.ingest import import_documents
 
 from multinet.errors import (
     BadQueryArgument,
+    InvalidCursor,
     WorkspaceNotFound,
     TableNotFound,
     GraphNotFound,
     NodeNotFound,
-    UploadNotFound,
     AlreadyExists,
     GraphCreationError,
     AQLExecutionError,
     AQLValidationError,
-    DatabaseCorrupted,
 )
 
 
 # Type definitions.
 GraphSpec = TypedDict("GraphSpec", {"nodeTables": List[str], "edgeTable": str})
-GraphNodesSpec = TypedDict("GraphNodesSpec", {"count": int, "nodes": List[str]})
-GraphEdgesSpec = TypedDict("GraphEdgesSpec", {"count": int, "edges": List[str]})
+GraphNodesSpec = TypedDict(
+    "GraphNodesSpec",
+    {"count": int, "nodes": List[Dict], "cursor": Optional[str]},
+    total=False,
+)
+TableSpec = TypedDict("TableSpec", {"name": str, "type": str, "count": int})
+CatalogSpec = TypedDict(
+    "CatalogSpec", {"tables": Dict[str, str], "graphs": Dict[str, GraphSpec]}
+)
+GraphEdgesSpec = TypedDict(
+    "GraphEdgesSpec", {"count": int, "edges": List[str]}, total=False
+)
+IndexSpec = TypedDict(
+    "IndexSpec", {"fields": List[str], "unique": bool, "sparse": bool}
+)
 
-arango = ArangoClient(
+handles = HandleRegistry(
     host=os.environ.get("ARANGO_HOST", "localhost"),
     port=int(os.environ.get("ARANGO_PORT", "8529")),
     protocol=os.environ.get("ARANGO_PROTOCOL", "http"),
+    pool_size=int(os.environ.get("ARANGO_POOL_SIZE", "10")),
+    retries=int(os.environ.get("ARANGO_RETRIES", "3")),
+    backoff=float(os.environ.get("ARANGO_RETRY_BACKOFF", "0.1")),
 )
 restricted_keys = {"_rev", "_id"}
 
+# The system collection, in each workspace, that holds the schema of its tables.
+SCHEMA_COLLECTION = "_multinet_schema"
+
+# The document, in the schema collection, that is rewritten whenever a table or
+# graph is created or deleted. Table names can't start with an underscore, so
+# it can't clash with the schema of a table.
+CATALOG_MARKER = "_catalog"
+
+# How many rows describe a table that has no stored schema yet.
+SCHEMA_SAMPLE_SIZE = int(os.environ.get("SCHEMA_SAMPLE_SIZE", "1000"))
+
+# Whether read-only queries should ask for the AQL query result cache.
+query_cache = os.environ.get("AQL_QUERY_CACHE", "off").lower() in ("on", "true", "1")
+
 
 def db(name: str) -> StandardDatabase:
     """Return a handle for Arango database `name`."""
-    return arango.db(
-        name,
-        username="root",
-        password=os.environ.get("ARANGO_PASSWORD", "letmein"),
-        verify=True,
-    )
+    return handles.get(name, "root", os.environ.get("ARANGO_PASSWORD", "letmein"))
 
 
 def read_only_db(name: str) -> StandardDatabase:
     """Return a read-only handle for the Arango database `name`."""
-    return arango.db(
-        name,
-        username="readonly",
-        password=os.environ.get("ARANGO_READONLY_PASSWORD", "letmein"),
-        verify=True,
+    return handles.get(
+        name, "readonly", os.environ.get("ARANGO_READONLY_PASSWORD", "letmein")
     )
 
 
+def pool_stats() -> PoolStats:
+    """Report how the pooled database handles are being used."""
+    return handles.stats()
+
+
+def ping() -> None:
+    """Make a lightweight request to the database, raising if it fails."""
+    db("_system").version()
+
+
+# Tracks database liveness in the background, so that requests can check it
+# without an extra round trip.
+monitor = HealthMonitor(
+    ping,
+    interval=float(os.environ.get("HEALTH_CHECK_INTERVAL", "5")),
+    max_backoff=float(os.environ.get("HEALTH_CHECK_MAX_BACKOFF", "60")),
+    retry_after=float(os.environ.get("HEALTH_CHECK_RETRY_AFTER", "1")),
+)
+
+
 def check_db() -> bool:
     """Check the database to see if it's alive."""
-    try:
-        db("_system").has_database("test")
-        return True
-    except ConnectionError:
-        return False
+    return monitor.is_live()
 
 
 def register_legacy_workspaces() -> None:
@@ -104,20 +160,91 @@ def register_legacy_workspaces() -> None:
         coll.insert({"name": workspace, "internal": workspace})
 
 
-# Since this shouldn't ever change while running, this function becomes a singleton
-@lru_cache(maxsize=1)
+# The secondary indexes backing the `_system` lookups made on nearly every
+# request: users by `sub` and by session cookie, workspaces by name.
+SYSTEM_INDEXES: Dict[str, List[IndexSpec]] = {
+    "users": [
+        {"fields": ["sub"], "unique": True, "sparse": False},
+        {"fields": ["multinet.session"], "unique": False, "sparse": True},
+    ],
+    "workspace_mapping": [
+        {"fields": ["name"], "unique": True, "sparse": False},
+        {"fields": ["internal"], "unique": True, "sparse": False},
+    ],
+}
+
+
+def describe_index(collection: str, spec: IndexSpec) -> str:
+    """Return a human-readable description of an index."""
+    kind = "unique" if spec["unique"] else "sparse" if spec["sparse"] else "plain"
+    return f"{collection}({', '.join(spec['fields'])}) [{kind}]"
+
+
+def _has_index(existing: List[Dict], spec: IndexSpec) -> bool:
+    # Hash and skiplist indexes are aliases for persistent indexes.
+    return any(
+        index["type"] in ("persistent", "hash", "skiplist")
+        and index["fields"] == spec["fields"]
+        and index.get("unique", False) == spec["unique"]
+        and index.get("sparse", False) == spec["sparse"]
+        for index in existing
+    )
+
+
+def ensure_system_indexes() -> List[str]:
+    """
+    Create any missing `_system` indexes.
+
+    Returns descriptions of the indexes that could not be created (e.g. because
+    existing documents violate a uniqueness constraint).
+    """
+    sysdb = db("_system")
+
+    failed = []
+    for collection, specs in SYSTEM_INDEXES.items():
+        if not sysdb.has_collection(collection):
+            sysdb.create_collection(collection)
+
+        coll = sysdb.collection(collection)
+        existing = coll.indexes()
+        for spec in specs:
+            if _has_index(existing, spec):
+                continue
+
+            try:
+                coll.add_persistent_index(
+                    spec["fields"], unique=spec["unique"], sparse=spec["sparse"]
+                )
+            except IndexCreateError:
+                failed.append(describe_index(collection, spec))
+
+    return failed
+
+
+def system_collection(name: str) -> StandardCollection:
+    """Return the `_system` collection `name`, creating it if it doesn't exist."""
+    return handles.collection(
+        "_system", name, os.environ.get("ARANGO_PASSWORD", "letmein")
+    )
+
+
 def workspace_mapping_collection() -> StandardCollection:
     """Return the collection used for mapping external to internal workspace names."""
-    sysdb = db("_system")
+    return system_collection("workspace_mapping")
 
-    if not sysdb.has_collection("workspace_mapping"):
-        sysdb.create_collection("workspace_mapping")
 
-    return sysdb.collection("workspace_mapping")
+# The revision of the workspace mapping collection changes on every write to it,
+# in any worker process; caches keyed on it are refreshed within
+# WORKSPACE_CACHE_TTL seconds of a write made elsewhere.
+workspace_revision = Revision(
+    lambda: workspace_mapping_collection().revision(),
+    ttl=float(os.environ.get("WORKSPACE_CACHE_TTL", "5")),
+)
 
 
-# Caches the document that maps an external workspace name to it's internal one
-@lru_cache()
+# Caches the document that maps an external workspace name to it's internal one.
+# Names that aren't mapped aren't cached, since anyone can ask for any name.
+@revision_cache(workspace_revision, cache_misses=False)
 def workspace_mapping(name: str) -> Optional[WorkspaceDocument]:
     """
     Get the document containing the workspace mapping for :name: (if it exists).
@@ -133,10 +260,24 @@ def workspace_mapping(name: str) -> Optional[WorkspaceDocument]:
     return None
 
 
+def resolve_workspace(name: str) -> Optional[WorkspaceDocument]:
+    """Return the workspace mapping for :name:, looked up once per request."""
+    resolved = request_cache("workspaces")
+    if name not in resolved:
+        resolved[name] = workspace_mapping(name)
+
+    return resolved[name]
+
+
+def invalidate_workspaces() -> None:
+    """Discard cached workspace mappings after a workspace has been changed."""
+    workspace_mapping.cache_clear()
+    request_cache("workspaces").clear()
+
+
 def workspace_exists(name: str) -> bool:
     """Convinience wrapper for checking if a workspace exists."""
-    # Use un-cached underlying function
-    return bool(workspace_mapping.__wrapped__(name))
+    return bool(resolve_workspace(name))
 
 
 def workspace_exists_internal(name: str) -> bool:
@@ -148,8 +289,9 @@ def workspace_exists_internal(name: str) -> bool:
 def create_workspace(name: str, user: User) -> str:
     """Create a new workspace named `name`, owned by `user`."""
 
-    # Bail out with a 409 if the workspace exists already.
-    if workspace_exists(name):
+    # Bail out with a 409 if the workspace exists already. Use the un-cached
+    # lookup, since another worker may have just created it.
+    if workspace_mapping.__wrapped__(name):
         raise AlreadyExists("Workspace", name)
 
     # Create a workspace mapping document to represent the new workspace. This
@@ -184,19 +326,20 @@ def create_workspace(name: str, user: User) -> str:
     coll.insert(ws_doc)
 
     # Invalidate the cache for things changed by this function
-    workspace_mapping.cache_clear()
-    get_workspace_db.cache_clear()
+    invalidate_workspaces()
 
     return name
 
 
 def rename_workspace(old_name: str, new_name: str) -> None:
     """Rename a workspace."""
-    doc = workspace_mapping(old_name)
+    # Writes use the un-cached document, whose revision is current; another
+    # worker may have changed it since it was cached here.
+    doc = workspace_mapping.__wrapped__(old_name)
     if not doc:
         raise WorkspaceNotFound(old_name)
 
-    if workspace_exists(new_name):
+    if workspace_mapping.__wrapped__(new_name):
         raise AlreadyExists("Workspace", new_name)
 
     doc["name"] = new_name
@@ -204,13 +347,12 @@ def rename_workspace(old_name: str, new_name: str) -> None:
     coll.update(doc)
 
     # Invalidate the cache for things changed by this function
-    get_workspace_db.cache_clear()
-    workspace_mapping.cache_clear()
+    invalidate_workspaces()
 
 
 def delete_workspace(name: str) -> None:
     """Delete the workspace named `name`."""
-    doc = workspace_mapping(name)
+    doc = resolve_workspace(name)
     if not doc:
         raise WorkspaceNotFound(name)
 
@@ -219,22 +361,18 @@ def delete_workspace(name: str) -> None:
 
     sysdb.delete_database(doc["internal"])
     coll.delete(doc["_id"])
+    handles.discard(doc["internal"])
+    catalog_revisions.pop(doc["internal"], None)
 
     # Invalidate the cache for things changed by this function
-    get_workspace_db.cache_clear()
-    workspace_mapping.cache_clear()
+    invalidate_workspaces()
 
 
 def get_workspace_metadata(name: str) -> Workspace:
     """Return the metadata for a single workspace, if it exists."""
-    if not workspace_exists(name):
-        raise WorkspaceNotFound(name)
-
-    # Find the metadata record for the named workspace. If it's not there,
-    # something went very wrong, so bail out.
-    metadata = workspace_mapping.__wrapped__(name)
+    metadata = resolve_workspace(name)
     if metadata is None:
-        raise DatabaseCorrupted()
+        raise WorkspaceNotFound(name)
 
     return metadata
 
@@ -243,9 +381,10 @@ def set_workspace_permissions(
     name: str, permissions: WorkspacePermissions
 ) -> WorkspacePermissions:
     """Update the permissions for a given workspace."""
-    doc = copy.deepcopy(get_workspace_metadata(name))
+    # As in `rename_workspace()`, write to the un-cached document.
+    doc = workspace_mapping.__wrapped__(name)
     if doc is None:
-        raise DatabaseCorrupted()
+        raise WorkspaceNotFound(name)
 
     # TODO: Do user object validation once ORM is implemented
 
@@ -258,16 +397,14 @@ def set_workspace_permissions(
         workspace_mapping_collection().update(doc)
     )["permissions"]
 
-    workspace_mapping.cache_clear()
+    invalidate_workspaces()
 
     return cast(WorkspacePermissions, return_doc)
 
 
-# Caches the reference to the StandardDatabase instance for each workspace
-@lru_cache()
 def get_workspace_db(name: str, readonly: bool = True) -> StandardDatabase:
     """Return the Arango database associated with a workspace, if it exists."""
-    doc = workspace_mapping(name)
+    doc = resolve_workspace(name)
     if not doc:
         raise WorkspaceNotFound(name)
 
@@ -275,6 +412,116 @@ def get_workspace_db(name: str, readonly: bool = True) -> StandardDatabase:
     return read_only_db(name) if readonly else db(name)
 
 
+# The revision of the schema collection of each workspace (by internal name).
+# It changes on every write to that collection, which `catalog_changed()`
+# makes whenever a table or graph changes, so caches keyed on it are refreshed
+# within CATALOG_CACHE_TTL seconds of a change made by another worker.
+catalog_revisions: Dict[str, Revision] = {}
+
+
+def catalog_revision(internal: str) -> Revision:
+    """Return the revision marker for the catalog of workspace `internal`."""
+    revision = catalog_revisions.get(internal)
+    if revision is None:
+        revision = catalog_revisions.setdefault(
+            internal,
+            Revision(
+                lambda: schema_collection(db(internal)).revision(),
+                ttl=float(os.environ.get("CATALOG_CACHE_TTL", "5")),
+            ),
+        )
+
+    return revision
+
+
+@lru_cache(maxsize=256)
+def load_catalog(internal: str, version: str) -> CatalogSpec:
+    """
+    Read the tables and graphs of the workspace database `internal`.
+
+    `version` is the catalog revision of the workspace; since a new version
+    means a new cache key, every worker picks up a change as soon as it sees
+    the new revision.
+    """
+    space = read_only_db(internal)
+
+    tables: Dict[str, str] = {
+        coll["name"]: "edge" if coll["type"] == "edge" else "node"
+        for coll in space.collections()
+        if not coll["system"]
+    }
+
+    graphs: Dict[str, GraphSpec] = {}
+    for graph in space.graphs():
+        definitions = graph["edge_definitions"]
+        node_tables = set(graph.get("orphan_collections", []))
+        for definition in definitions:
+            node_tables.update(definition["from_vertex_collections"])
+            node_tables.update(definition["to_vertex_collections"])
+
+        graphs[graph["name"]] = {
+            "nodeTables": sorted(node_tables),
+            "edgeTable": definitions[0]["edge_collection"] if definitions else "",
+        }
+
+    return {"tables": tables, "graphs": graphs}
+
+
+def workspace_catalog(workspace: str, fresh: bool = False) -> CatalogSpec:
+    """Return the (cached, unless `fresh` is set) catalog of a workspace."""
+    doc = resolve_workspace(workspace)
+    if not doc:
+        raise WorkspaceNotFound(workspace)
+
+    internal = doc["internal"]
+    load = load_catalog.__wrapped__ if fresh else load_catalog
+    return load(internal, catalog_revision(internal).current())
+
+
+def catalog_changed(workspace: str, written: bool = False) -> None:
+    """
+    Record that the tables, graphs or table schemas of a workspace have changed.
+
+    Unless `written` is set, meaning the schema collection has just been written
+    to anyway, the catalog marker is rewritten to change the catalog revision.
+    """
+    doc = resolve_workspace(workspace)
+    if not doc:
+        return
+
+    internal = doc["internal"]
+    if not written:
+        schema_collection(db(internal)).insert(
+            {"_key": CATALOG_MARKER, "version": uuid4().hex}, overwrite=True
+        )
+
+    catalog_revision(internal).expire()
+
+
+def catalog_graph(workspace: str, graph: str) -> GraphSpec:
+    """Return the catalog entry for a graph, if it exists."""
+    graphs = workspace_catalog(workspace)["graphs"]
+    if graph not in graphs:
+        # It may have been created by another worker, whose change to the
+        # catalog this worker hasn't seen yet.
+        graphs = workspace_catalog(workspace, fresh=True)["graphs"]
+        if graph not in graphs:
+            raise GraphNotFound(workspace, graph)
+
+    return graphs[graph]
+
+
+def catalog_table(workspace: str, table: str) -> str:
+    """Return the type ("node" or "edge") of a table, if it exists."""
+    tables = workspace_catalog(workspace)["tables"]
+    if table not in tables:
+        tables = workspace_catalog(workspace, fresh=True)["tables"]
+        if table not in tables:
+            raise TableNotFound(workspace, table)
+
+    return tables[table]
+
+
 def get_graph_collection(workspace: str, graph: str) -> Graph:
     """Return the Arango collection associated with a graph, if it exists."""
     space = get_workspace_db(workspace)
@@ -300,85 +547,128 @@ def get_workspaces() -> Generator[Workspace, None, None]:
 
 
 def workspace_tables(
-    workspace: str, table_type: TableType
-) -> Generator[str, None, None]:
-    """Return a list of all table names in the workspace named `workspace`."""
-    space = get_workspace_db(workspace)
-    tables = (
-        space.collection(table["name"]).properties()
-        for table in space.collections()
-        if not table["name"].startswith("_")
-    )
+    workspace: str, table_type: TableType, counts: bool = False
+) -> Union[List[str], List[TableSpec]]:
+    """
+    Return a list of all table names in the workspace named `workspace`.
+
+    The tables are read from the workspace catalog. If `counts` is set, each
+    table is instead described by its name, type and row count, with all of
+    the counts fetched in a single query.
+    """
+    if table_type not in ("all", "node", "edge"):
+        raise BadQueryArgument("type", table_type, ["all", "node", "edge"])
 
-    def pass_all(x: Dict[str, Any]) -> bool:
-        return True
+    tables = {
+        name: kind
+        for name, kind in workspace_catalog(workspace)["tables"].items()
+        if table_type in ("all", kind)
+    }
 
-    def is_edge(x: Dict[str, Any]) -> bool:
-        return x["edge"]
+    if not counts:
+        return list(tables)
 
-    def is_node(x: Dict[str, Any]) -> bool:
-        return not x["edge"]
+    names = list(tables)
+    sizes = next(run_query(workspace, queries.table_counts(names)))
+    described: List[TableSpec] = [
+        {"name": name, "type": tables[name], "count": count}
+        for name, count in zip(names, sizes)
+    ]
+
+    return described
+
+
+def check_cursor_limit(limit: int) -> None:
+    """Reject a page size that a cursor could never advance past."""
+    if limit < 1:
+        raise BadQueryArgument("limit", str(limit), ["positive integers"])
 
-    if table_type == "all":
-        desired_type = pass_all
-    elif table_type == "node":
-        desired_type = is_node
-    elif table_type == "edge":
-        desired_type = is_edge
-    else:
-        raise BadQueryArgument("type", table_type, ["all", "node", "edge"])
 
-    return (table["name"] for table in tables if desired_type(table))
+def workspace_table(
+    workspace: str,
+    table: str,
+    offset: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    count: bool = True,
+) -> dict:
+    """
+    Return a specific table named `name` in workspace `workspace`.
 
+    If `cursor` is given (the empty string denotes the first page), rows are
+    returned in key order starting after the cursor position, and `offset` is
+    ignored; the response then includes the cursor for the next page, which is
+    None once the table has been exhausted. A cursor needs a positive `limit`,
+    or paging would never advance.
 
-def workspace_table(workspace: str, table: str, offset: int, limit: int) -> dict:
-    """Return a specific table named `name` in workspace `workspace`."""
-    get_table_collection(workspace, table)
+    The row count is fetched in the same query as the rows, unless `count` is
+    False, in which case it is left out of the response.
+    """
+    catalog_table(workspace, table)
 
-    count = workspace_table_row_count(workspace, table)
-    rows = workspace_table_rows(workspace, table, offset, limit)
+    if cursor is None:
+        query = queries.table_page(table, offset, limit, count)
+    else:
+        check_cursor_limit(limit)
+        after = decode_cursor(cursor).get("key", "")
+        query = queries.table_page_after(table, after, limit, count)
+
+    page = next(run_query(workspace, query))
+    result = {"rows": page["rows"]}
+
+    if count:
+        result["count"] = page["count"]
+
+    if cursor is not None:
+        rows = page["rows"]
+        result["cursor"] = (
+            encode_cursor({"key": rows[-1]["_key"]})
+            if rows and len(rows) == limit
+            else None
+        )
 
-    return {"count": count, "rows": list(rows)}
+    return result
 
 
 def workspace_table_rows(
     workspace: str, table: str, offset: int, limit: int
-) -> Generator[Dict, None, None]:
+) -> Cursor:
     """Stream the rows of a table in CSV form."""
+    return run_query(workspace, queries.table_rows(table, offset, limit))
 
-    query = f"""
-    FOR d in {table}
-        LIMIT {offset}, {limit}
-        RETURN d
-    """
 
-    return aql_query(workspace, query)
+def workspace_table_export(workspace: str, table: str) -> Cursor:
+    """Stream every row of a table, without ArangoDB's internal attributes."""
+    return run_query(workspace, queries.table_export(table, sorted(restricted_keys)))
 
 
 def workspace_table_row_count(workspace: str, table: str) -> int:
-    """Return the number of rows in a table."""
-    count_query = f"""
-    RETURN LENGTH({table})
-    """
-    return next(aql_query(workspace, count_query))
+    """Return the number of rows in a table, from the collection's metadata."""
+    return get_table_collection(workspace, table).count()
 
 
 def workspace_table_keys(
-    workspace: str, table: str, filter_keys: bool = False
+    workspace: str, table: str, filter_keys: bool = False, complete: bool = False
 ) -> List[str]:
-    """Get the keys of a table in a workspace."""
+    """
+    Get the keys of a table in a workspace, from the table's schema.
 
-    query = f"""
-    FOR d in {table}
-        LIMIT 0, 1
-        RETURN ATTRIBUTES(d)
+    The schema can miss columns (e.g., if it was sampled), so if `complete` is
+    set, any other attributes used in the table are found by the database and
+    listed after the schema's columns.
     """
-    cur = aql_query(workspace, query)
+    columns = table_schema(workspace, table).column_names()
 
-    try:
-        keys = next(cur)
-    except StopIteration:
-        return []
+    # Every stored document has a key, and every edge its endpoints, even when
+    # the rows they were made from didn't (so the schema doesn't list them).
+    stored = ["_key"]
+    if catalog_table(workspace, table) == "edge":
+        stored += ["_from", "_to"]
+
+    keys = stored + [column for column in columns if column not in stored]
+    if complete:
+        found = run_query(workspace, queries.table_attributes(table))
+        keys += sorted(set(found) - set(keys))
 
     if filter_keys:
         return [k for k in keys if k not in restricted_keys]
@@ -386,6 +676,98 @@ def workspace_table_keys(
     return keys
 
 
+def schema_collection(space: StandardDatabase) -> StandardCollection:
+    """Return the collection holding the table schemas of a workspace."""
+    if not space.has_collection(SCHEMA_COLLECTION):
+        space.create_collection(SCHEMA_COLLECTION, system=True)
+
+    return space.collection(SCHEMA_COLLECTION)
+
+
+def record_table_schema(
+    workspace: str, table: str, rows: Iterable[Dict[str, Any]]
+) -> None:
+    """Fold `rows`, which have just been added to `table`, into its schema."""
+    save_table_schema(workspace, table, TableSchema().observe_all(rows))
+
+
+def save_table_schema(workspace: str, table: str, schema: TableSchema) -> None:
+    """Merge `schema`, describing rows just added to `table`, into its schema."""
+    coll = schema_collection(get_workspace_db(workspace, readonly=False))
+    stored = coll.get(table)
+    if stored:
+        merged = TableSchema.from_document(stored)
+        merged.merge(schema)
+        schema = merged
+
+    coll.insert({"_key": table, **schema.to_document()}, overwrite=True)
+    catalog_changed(workspace, written=True)
+
+
+@lru_cache(maxsize=256)
+def load_table_schema(internal: str, table: str, version: str) -> TableSchema:
+    """
+    Read the stored schema of `table` in the workspace database `internal`.
+
+    As with `load_catalog()`, `version` is the catalog revision of the
+    workspace. Tables without a stored schema (e.g., those created before
+    schemas were recorded) are described from a sample of their rows, until
+    `backfill_table_schemas()` stores their full schema.
+    """
+    space = read_only_db(internal)
+    if space.has_collection(SCHEMA_COLLECTION):
+        stored = space.collection(SCHEMA_COLLECTION).get(table)
+        if stored:
+            return TableSchema.from_document(stored)
+
+    sample = queries.table_rows(table, 0, SCHEMA_SAMPLE_SIZE)
+    rows = space.aql.execute(sample.text, bind_vars=sample.bind_vars)
+    return TableSchema().observe_all(rows)
+
+
+def backfill_table_schemas() -> List[str]:
+    """
+    Scan and store the schema of every table that doesn't have one yet.
+
+    This is a migration, for tables created before schemas were recorded;
+    it returns the tables it stored a schema for, as "workspace/table".
+    """
+    backfilled = []
+    for doc in workspace_mapping_collection().all():
+        space = db(doc["internal"])
+        schemas = schema_collection(space)
+
+        for coll in space.collections():
+            table = coll["name"]
+            if coll["system"] or schemas.has(table):
+                continue
+
+            scan = queries.table_scan(table)
+            rows = space.aql.execute(
+                scan.text,
+                bind_vars=scan.bind_vars,
+                stream=scan.stream,
+                batch_size=scan.batch_size,
+            )
+            schema = TableSchema().observe_all(rows)
+            schemas.insert({"_key": table, **schema.to_document()}, overwrite=True)
+            backfilled.append(f"{doc['name']}/{table}")
+
+    return backfilled
+
+
+def table_schema(workspace: str, table: str) -> TableSchema:
+    """Return the schema of a table in a workspace."""
+    catalog_table(workspace, table)
+
+    doc = resolve_workspace(workspace)
+    if not doc:
+        raise WorkspaceNotFound(workspace)
+
+    internal = doc["internal"]
+    return load_table_schema(internal, table, catalog_revision(internal).current())
+
+
 def create_aql_table(workspace: str, name: str, aql: str) -> str:
     """Create a new table from an AQL query."""
     db = get_workspace_db(workspace, readonly=True)
@@ -400,82 +782,177 @@ def create_aql_table(workspace: str, name: str, aql: str) -> str:
 
     db = get_workspace_db(workspace, readonly=False)
     coll = db.create_collection(name, sync=True)
-    coll.insert_many(rows)
+    import_documents(coll, rows)
+    record_table_schema(workspace, name, rows)
 
     return name
 
 
 def graph_node(workspace: str, graph: str, table: str, node: str) -> dict:
     """Return the data associated with a particular node in a graph."""
-    space = get_workspace_db(workspace)
-    graphs = filter(lambda g: g["name"] == graph, space.graphs())
-    try:
-        next(graphs)
-    except StopIteration:
-        raise GraphNotFound(workspace, graph)
+    spec = catalog_graph(workspace, graph)
 
-    tables = filter(lambda t: t["name"] == table, space.collections())
-    try:
-        next(tables)
-    except StopIteration:
+    if table not in spec["nodeTables"]:
         raise TableNotFound(workspace, table)
 
-    query = f"""
-    FOR d in {table}
-      FILTER d._id == "{table}/{node}"
-      RETURN d
-    """
-
-    result = aql_query(workspace, query)
+    result = run_query(workspace, queries.node_attributes(table, node))
     try:
-        data = next(result)
+        return next(result)
     except StopIteration:
         raise NodeNotFound(table, node)
 
-    return {k: data[k] for k in data if k != "_rev"}
+
+def graph_nodes_by_id(
+    workspace: str, graph: str, node_ids: List[str]
+) -> Iterator[Dict]:
+    """
+    Return the data associated with many nodes of a graph.
+
+    The ids (of the form `table/key`) are grouped by table, and each group is
+    fetched with a single query. Nodes that don't exist are left out.
+    """
+    spec = catalog_graph(workspace, graph)
+
+    groups: Dict[str, Dict[str, None]] = {}
+    for node_id in node_ids:
+        table, key = node_id.split("/", 1)
+        if table not in spec["nodeTables"]:
+            raise TableNotFound(workspace, table)
+
+        groups.setdefault(table, {})[key] = None
+
+    # Start every query now, while the request is still active; the results
+    # are then drained as the response is streamed.
+    cursors = [
+        run_query(workspace, queries.nodes_by_key(table, list(keys)))
+        for table, keys in groups.items()
+    ]
+    return itertools.chain.from_iterable(cursors)
+
+
+def subgraph(
+    workspace: str,
+    graph: str,
+    seeds: List[str],
+    depth: int,
+    direction: EdgeDirection,
+    node_limit: int,
+    edge_limit: int,
+    filters: Dict[str, Any],
+) -> Tuple[Iterator[Dict], Iterator[Dict]]:
+    """
+    Return the neighborhood of some seed nodes, as an induced subgraph.
+
+    Nodes up to `depth` steps away from any seed (and matching `filters`, if
+    given) are gathered, up to `node_limit` of them, along with up to
+    `edge_limit` of the edges between them.
+
+    The nodes and the edges are returned as iterators over one cursor, so
+    they are read a batch at a time; the nodes must be read before the edges.
+    """
+    spec = catalog_graph(workspace, graph)
+
+    for seed in seeds:
+        table = seed.split("/", 1)[0]
+        if table not in spec["nodeTables"]:
+            raise TableNotFound(workspace, table)
+
+    query = queries.subgraph(
+        spec["edgeTable"], seeds, depth, direction, node_limit, edge_limit, filters
+    )
+    rows = run_query(workspace, query)
+    first_link: List[Dict] = []
+
+    def nodes() -> Iterator[Dict]:
+        for row in rows:
+            if "link" in row:
+                first_link.append(row["link"])
+                return
+
+            yield row["node"]
+
+    def links() -> Iterator[Dict]:
+        yield from first_link
+        for row in rows:
+            yield row["link"]
+
+    return nodes(), links()
 
 
 def workspace_graphs(workspace: str) -> List[str]:
     """Return a list of all graph names in workspace `workspace`."""
-    space = get_workspace_db(workspace)
-    return [graph["name"] for graph in space.graphs()]
+    return list(workspace_catalog(workspace)["graphs"])
 
 
 def workspace_graph(workspace: str, graph: str) -> GraphSpec:
     """Return a specific graph named `name` in workspace `workspace`."""
-    get_graph_collection(workspace, graph)
-
-    # Get the lists of node and edge tables.
     node_tables = graph_node_tables(workspace, graph)
     edge_table = graph_edge_table(workspace, graph)
 
     return {"nodeTables": node_tables, "edgeTable": edge_table}
 
 
-def graph_nodes(workspace: str, graph: str, offset: int, limit: int) -> GraphNodesSpec:
-    """Return the nodes of a graph."""
-    get_graph_collection(workspace, graph)
-
-    # Get the actual node data.
-    node_tables = graph_node_tables(workspace, graph)
-    node_query = f"""
-    FOR c in [{", ".join(node_tables)}]
-      FOR d in c
-        LIMIT {offset}, {limit}
-        RETURN d
+def graph_nodes(
+    workspace: str,
+    graph: str,
+    offset: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    count: bool = True,
+) -> GraphNodesSpec:
     """
-    nodes = aql_query(workspace, node_query)
-
-    # Get the total node count.
-    count_query = f"""
-    FOR c in [{", ".join(node_tables)}]
-      FOR d in c
-        COLLECT WITH COUNT INTO count
-        RETURN count
+    Return the nodes of a graph.
+
+    As with `workspace_table()`, passing `cursor` switches to keyset
+    pagination. Node tables are walked one after another, in name order, and
+    the cursor records both the current table and the last key seen in it.
+    Only a page that crosses from one table into the next needs more than one
+    query; the node count always rides along with the first.
     """
-    count: int = next(aql_query(workspace, count_query))
+    node_tables = graph_node_tables(workspace, graph)
+
+    if cursor is None:
+        page = next(
+            run_query(workspace, queries.graph_nodes(node_tables, offset, limit, count))
+        )
+        result: GraphNodesSpec = {"nodes": page["nodes"]}
+        if count:
+            result["count"] = page["count"]
+
+        return result
+
+    check_cursor_limit(limit)
+    tables = sorted(node_tables)
+    position = decode_cursor(cursor)
+    table = position.get("table", tables[0] if tables else None)
+    after = position.get("key", "")
+
+    if table is not None and table not in tables:
+        raise InvalidCursor(cursor)
+
+    result = {"nodes": [], "cursor": None}
+    for table in tables[tables.index(table) :] if table is not None else []:
+        want_count = count and "count" not in result
+        query = queries.graph_nodes_after(
+            tables, table, after, limit - len(result["nodes"]), want_count
+        )
+        page = next(run_query(workspace, query))
+
+        result["nodes"] += page["nodes"]
+        if want_count:
+            result["count"] = page["count"]
+
+        if result["nodes"] and len(result["nodes"]) == limit:
+            last = result["nodes"][-1]["_key"]
+            result["cursor"] = encode_cursor({"table": table, "key": last})
+            break
+
+        after = ""
+
+    if count and "count" not in result:
+        result["count"] = 0
 
-    return {"count": count, "nodes": list(nodes)}
+    return result
 
 
 def delete_table(workspace: str, table: str) -> str:
@@ -483,6 +960,10 @@ def delete_table(workspace: str, table: str) -> str:
     space = get_workspace_db(workspace, readonly=False)
     if space.has_collection(table):
         space.delete_collection(table)
+        if space.has_collection(SCHEMA_COLLECTION):
+            space.collection(SCHEMA_COLLECTION).delete(table, ignore_missing=True)
+
+        catalog_changed(workspace)
 
     return table
 
@@ -507,6 +988,50 @@ def aql_query(workspace: str, query: str) -> Cursor:
     return _run_aql_query(aql, query)
 
 
+def run_query(workspace: str, query: queries.Query) -> Cursor:
+    """
+    Run a query built by `multinet.queries` in the given workspace.
+
+    These queries are known to be well-formed, so unlike `aql_query()` this
+    skips the separate validation round trip.
+    """
+    aql = get_workspace_db(workspace, readonly=True).aql
+    try:
+        return aql.execute(
+            query.text,
+            bind_vars=query.bind_vars,
+            full_count=query.full_count,
+            batch_size=query.batch_size,
+            # Streaming queries can't be served from the result cache.
+            stream=query.stream or None,
+            cache=query_cache and not query.stream,
+        )
+    except AQLQueryExecuteError as e:
+        raise AQLExecutionError(str(e))
+
+
+def configure_query_cache() -> None:
+    """Switch the server's AQL result cache to on-demand mode, if requested."""
+    if query_cache:
+        db("_system").aql.cache.configure(mode="demand")
+
+
+def missing_references(
+    workspace: str, edge_table: str, tables: List[str], limit: int
+) -> Dict[str, List[str]]:
+    """
+    Return keys referenced by the edges of `edge_table` but missing from `tables`.
+
+    The check runs on the server, and at most `limit` keys are returned for
+    each table; tables with no missing keys are left out.
+    """
+    if not tables:
+        return {}
+
+    query = queries.missing_references(edge_table, tables, limit)
+    return {row["table"]: row["keys"] for row in run_query(workspace, query)}
+
+
 def create_graph(
     workspace: str,
     graph: str,
@@ -533,6 +1058,7 @@ def create_graph(
     except EdgeDefinitionCreateError as e:
         raise GraphCreationError(str(e))
 
+    catalog_changed(workspace)
     return True
 
 
@@ -541,25 +1067,24 @@ def delete_graph(workspace: str, graph: str) -> str:
     space = get_workspace_db(workspace, readonly=False)
     if space.has_graph(graph):
         space.delete_graph(graph)
+        catalog_changed(workspace)
 
     return graph
 
 
 def graph_node_tables(workspace: str, graph: str) -> List[str]:
     """Return the node tables associated with a graph."""
-    g = get_graph_collection(workspace, graph)
-    return g.vertex_collections()
+    return list(catalog_graph(workspace, graph)["nodeTables"])
 
 
 def graph_edge_table(workspace: str, graph: str) -> str:
     """Return the edge tables associated with a graph."""
-    g = get_graph_collection(workspace, graph)
-    edge_collections = g.edge_definitions()
+    edge_table = catalog_graph(workspace, graph)["edgeTable"]
 
-    if not edge_collections:
+    if not edge_table:
         raise InternalServerError
 
-    return edge_collections[0]["edge_collection"]
+    return edge_table
 
 
 def node_edges(
@@ -570,89 +1095,30 @@ def node_edges(
     offset: int,
     limit: int,
     direction: EdgeDirection,
+    count: bool = True,
+    neighbors: bool = False,
 ) -> GraphEdgesSpec:
-    """Return the edges connected to a node."""
-    get_table_collection(workspace, table)
-    edge_table = graph_edge_table(workspace, graph)
-
-    def query_text(filt: str) -> str:
-        return f"""
-        FOR e IN {edge_table}
-            FILTER {filt}
-            LIMIT {offset}, {limit}
-            RETURN {{
-                "edge": e._id,
-                "from": e._from,
-                "to": e._to
-            }}
-        """
-
-    def count_text(filt: str) -> str:
-        return f"""
-        FOR e IN {edge_table}
-            FILTER {filt}
-            COLLECT WITH COUNT INTO count
-            RETURN count
-        """
-
-    if direction == "all":
-        filter_clause = f'e._from == "{table}/{node}" || e._to == "{table}/{node}"'
-    elif direction == "incoming":
-        filter_clause = f'e._to == "{table}/{node}"'
-    elif direction == "outgoing":
-        filter_clause = f'e._from == "{table}/{node}"'
-    else:
-        raise BadQueryArgument("direction", direction, ["all", "incoming", "outgoing"])
-
-    query = query_text(filter_clause)
-    count = count_text(filter_clause)
-
-    return {
-        "edges": list(aql_query(workspace, query)),
-        "count": next(aql_query(workspace, count)),
-    }
-
-
-@lru_cache(maxsize=1)
-def uploads_database() -> StandardDatabase:
-    """Return the database used for storing multipart upload collections."""
-    sysdb = db("_system")
-    if not sysdb.has_database("uploads"):
-        sysdb.create_database("uploads")
-    return db("uploads")
-
-
-def create_upload_collection() -> str:
-    """Insert empty multipart upload temp collection."""
-    uploads_db = uploads_database()
-    upload_id = f"u-{uuid4().hex}"
-    uploads_db.create_collection(upload_id)
-    return upload_id
-
-
-def insert_file_chunk(upload_id: str, sequence: str, chunk: str) -> str:
-    """Insert b64-encoded string `chunk` into temporary collection."""
-    uploads_db = uploads_database()
-    if not uploads_db.has_collection(upload_id):
-        raise UploadNotFound(upload_id)
-
-    collection = uploads_db.collection(upload_id)
-
-    if collection.get(sequence) is not None:
-        raise AlreadyExists("Upload Chunk", f"{upload_id}/{sequence}")
-
-    collection.insert({sequence: chunk, "_key": sequence})
-
-    return upload_id
-
+    """
+    Return the edges connected to a node.
 
-def delete_upload_collection(upload_id: str) -> str:
-    """Delete a multipart upload collection."""
-    uploads_db = uploads_database()
+    The total number of such edges comes from the `fullCount` statistic of the
+    same query, unless `count` is False. If `neighbors` is True, each edge
+    includes the attributes of the node at its other end.
+    """
+    catalog_table(workspace, table)
+    edge_table = graph_edge_table(workspace, graph)
 
-    if not uploads_db.has_collection(upload_id):
-        raise UploadNotFound(upload_id)
+    node_id = f"{table}/{node}"
+    edges = run_query(
+        workspace,
+        queries.node_edges(
+            edge_table, node_id, direction, offset, limit, count, neighbors
+        ),
+    )
 
-    uploads_db.delete_collection(upload_id)
+    result: GraphEdgesSpec = {"edges": list(edges)}
+    if count:
+        stats = edges.statistics() or {}
+        result["count"] = stats.get("fullCount", len(result["edges"]))
 
-    return upload_id
+    return result
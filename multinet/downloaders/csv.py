@@ -3,11 +3,10 @@ import csv
 from flasgger import swag_from
 from io import StringIO
 
-from multinet.util import require_db, generate_filtered_docs
+from multinet.util import require_db
 from multinet.db import (
     get_workspace_db,
-    workspace_table_row_count,
-    workspace_table_rows,
+    workspace_table_export,
     workspace_table_keys,
 )
 from multinet.errors import NotFound
@@ -15,12 +14,42 @@ from multinet.errors import NotFound
 from flask import Blueprint, Response
 
 # Import types
-from typing import Any, Generator
+from typing import Any, Dict, Iterable, Iterator, List
 
 
 bp = Blueprint("download_csv", __name__)
 bp.before_request(require_db)
 
+# How much CSV text (in characters) to collect before sending it.
+CHUNK_SIZE = 64 * 1024
+
+
+def csv_chunks(
+    rows: Iterable[Dict], fields: List[str], chunk_size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Generate CSV text for `rows`, in chunks of about `chunk_size` characters.
+
+    One writer formats every row into a shared buffer, which is sent (and
+    emptied) whenever it fills, so the response is written in a few large
+    pieces rather than one small one per row. A row with a column missing from
+    `fields` raises ValueError, rather than losing that column.
+    """
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+
+    for row in rows:
+        writer.writerow(row)
+
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
 
 @bp.route("/workspaces/<workspace>/tables/<table>/download", methods=["GET"])
 @swag_from("swagger/csv.yaml")
@@ -35,23 +64,10 @@ def download(workspace: str, table: str) -> Any:
     if not space.has_collection(table):
         raise NotFound("table", table)
 
-    limit = workspace_table_row_count(workspace, table)
-    table_rows = workspace_table_rows(workspace, table, 0, limit)
-    fields = workspace_table_keys(workspace, table, filter_keys=True)
-
-    def csv_row_generator() -> Generator[str, None, None]:
-        header_line = StringIO()
-        writer = csv.DictWriter(header_line, fieldnames=fields)
-        writer.writeheader()
-        yield header_line.getvalue()
-
-        for csv_row in generate_filtered_docs(table_rows):
-            line = StringIO()
-            writer = csv.DictWriter(line, fieldnames=fields)
-            writer.writerow(csv_row)
-            yield line.getvalue()
+    fields = workspace_table_keys(workspace, table, filter_keys=True, complete=True)
+    table_rows = workspace_table_export(workspace, table)
 
-    response = Response(csv_row_generator(), mimetype="text/csv")
+    response = Response(csv_chunks(table_rows, fields), mimetype="text/csv")
     response.headers["Content-Disposition"] = f"attachment; filename={table}.csv"
     response.headers["Content-type"] = "text/csv"
 
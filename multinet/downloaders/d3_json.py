@@ -12,57 +12,74 @@ from multinet.errors import GraphNotFound
 from flask import Blueprint, Response
 
 # Import types
-from typing import Any, Generator
+from typing import Any, Dict, Generator, Iterable
 
 bp = Blueprint("download_d3_json", __name__)
 bp.before_request(require_db)
 
 
-def node_generator(loaded_graph: Graph) -> Generator[str, None, None]:
-    """Generate the JSON list of nodes."""
+# Checks for node tables that have a `_nodes` suffix.
+table_nodes_pattern = re.compile(r"^([^\d_]\w+)_nodes(/.+)")
+
+
+def d3_node(node: Dict) -> Dict:
+    """Convert a node document to its d3 form."""
+    node["id"] = node["_key"]
+    del node["_key"]
+
+    return node
 
-    comma = ""
-    node_tables = loaded_graph.vertex_collections()
-    for node_table in node_tables:
-        table_nodes = loaded_graph.vertex_collection(node_table).all()
 
-        for node in table_nodes:
-            node["id"] = node["_key"]
-            del node["_key"]
+def d3_link(edge: Dict) -> Dict:
+    """Convert an edge document to its d3 form."""
+    source = edge["_from"]
+    target = edge["_to"]
 
-            yield f"{comma}{json.dumps(node, separators=(',', ':'))}"
-            comma = comma or ","
+    # If both ends are in such tables, remove the suffix.
+    source_match = table_nodes_pattern.search(source)
+    target_match = table_nodes_pattern.search(target)
+    if source_match and target_match:
+        source = "".join(source_match.groups())
+        target = "".join(target_match.groups())
 
+    edge["source"] = source
+    edge["target"] = target
+    del edge["_from"]
+    del edge["_to"]
 
-def link_generator(loaded_graph: Graph) -> Generator[str, None, None]:
-    """Generate the JSON list of links."""
+    return edge
 
-    # Checks for node tables that have a `_nodes` suffix.
-    # If matched, removes this suffix.
-    table_nodes_pattern = re.compile(r"^([^\d_]\w+)_nodes(/.+)")
-    edge_tables = [edef["edge_collection"] for edef in loaded_graph.edge_definitions()]
+
+def json_items(items: Iterable[Dict]) -> Generator[str, None, None]:
+    """Generate the comma-separated JSON encodings of `items`."""
 
     comma = ""
-    for edge_table in edge_tables:
-        edges = loaded_graph.edge_collection(edge_table).all()
+    for item in items:
+        yield f"{comma}{json.dumps(item, separators=(',', ':'))}"
+        comma = comma or ","
+
 
-        for edge in edges:
-            source = edge["_from"]
-            target = edge["_to"]
-            source_match = table_nodes_pattern.search(source)
-            target_match = table_nodes_pattern.search(target)
+def d3_json(
+    nodes: Iterable[Dict], links: Iterable[Dict]
+) -> Generator[str, None, None]:
+    """Generate a d3 json-encoded graph from node and edge documents."""
+    yield """{"nodes":["""
+    yield from json_items(d3_node(node) for node in nodes)
+    yield """],"links":["""
+    yield from json_items(d3_link(edge) for edge in links)
+    yield "]}"
 
-            if source_match and target_match:
-                source = "".join(source_match.groups())
-                target = "".join(target_match.groups())
 
-            edge["source"] = source
-            edge["target"] = target
-            del edge["_from"]
-            del edge["_to"]
+def graph_nodes(loaded_graph: Graph) -> Generator[Dict, None, None]:
+    """Generate every node of a graph."""
+    for node_table in loaded_graph.vertex_collections():
+        yield from loaded_graph.vertex_collection(node_table).all()
 
-            yield f"{comma}{json.dumps(edge, separators=(',', ':'))}"
-            comma = comma or ","
+
+def graph_links(loaded_graph: Graph) -> Generator[Dict, None, None]:
+    """Generate every edge of a graph."""
+    for edef in loaded_graph.edge_definitions():
+        yield from loaded_graph.edge_collection(edef["edge_collection"]).all()
 
 
 @bp.route("/workspaces/<workspace>/graphs/<graph>/download", methods=["GET"])
@@ -80,14 +97,10 @@ def download(workspace: str, graph: str) -> Any:
 
     loaded_graph = space.graph(graph)
 
-    def d3_json_generator() -> Generator[str, None, None]:
-        yield """{"nodes":["""
-        yield from node_generator(loaded_graph)
-        yield """],"links":["""
-        yield from link_generator(loaded_graph)
-        yield "]}"
-
-    response = Response(d3_json_generator(), mimetype="application/json")
+    response = Response(
+        d3_json(graph_nodes(loaded_graph), graph_links(loaded_graph)),
+        mimetype="application/json",
+    )
     response.headers["Content-Disposition"] = f"attachment; filename={graph}.json"
     response.headers["Content-type"] = "application/json"
 
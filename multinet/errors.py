@@ -127,6 +127,18 @@ class BadQueryArgument(ServerError):
         return (payload, "400 Bad Query Argument")
 
 
+class InvalidCursor(ServerError):
+    """Exception for a pagination cursor that can't be decoded."""
+
+    def __init__(self, cursor: str):
+        """Initialize the exception."""
+        self.cursor = cursor
+
+    def flask_response(self) -> FlaskTuple:
+        """Generate a 400 error for the bad cursor."""
+        return (self.cursor, "400 Invalid Cursor")
+
+
 class AlreadyExists(ServerError):
     """Exception for attempting to create a resource that already exists."""
 
@@ -250,3 +262,19 @@ class UploadNotFound(NotFound):
     def __init__(self, upload_id: str):
         """Initialize the exception."""
         super().__init__("Upload", upload_id)
+
+
+class IncompleteUpload(ServerError):
+    """Exception for finalizing a multipart upload with missing chunks."""
+
+    def __init__(self, upload_id: str, missing: List[int]):
+        """Initialize the exception."""
+        self.upload_id = upload_id
+        self.missing = missing
+
+    def flask_response(self) -> FlaskTuple:
+        """Generate a 400 error listing the missing chunks."""
+        return (
+            {"upload_id": self.upload_id, "missing": self.missing},
+            "400 Incomplete Upload",
+        )
@@ -0,0 +1,169 @@
+"""Background liveness monitoring of the database."""
+import os
+import threading
+import time
+
+from typing import Callable, Optional
+from typing_extensions import TypedDict
+
+LatencyStats = TypedDict(
+    "LatencyStats", {"last": Optional[float], "average": Optional[float]}
+)
+HealthStatus = TypedDict(
+    "HealthStatus",
+    {
+        "live": bool,
+        "circuit": str,
+        "consecutive_failures": int,
+        "seconds_since_check": Optional[float],
+        "latency_ms": LatencyStats,
+        "error": Optional[str],
+    },
+)
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+class HealthMonitor:
+    """
+    Keep a cached view of whether the database is reachable.
+
+    A daemon thread calls `probe` every `interval` seconds. After `threshold`
+    consecutive failures the circuit opens: requests are refused without
+    touching the database, and the probe backs off exponentially (up to
+    `max_backoff` seconds) until it succeeds again, which closes the circuit.
+
+    So that recovery is noticed sooner than the backed-off probe would notice
+    it, while the circuit is open one request at a time, at most once every
+    `retry_after` seconds, is let through to probe the database itself.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], None],
+        interval: float = 5,
+        max_backoff: float = 60,
+        threshold: int = 2,
+        retry_after: float = 1,
+    ):
+        """Initialize the monitor; the probing thread starts on first use."""
+        self.probe = probe
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.threshold = threshold
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._trial = threading.Lock()
+        self._pid: Optional[int] = None
+
+        self.failures = 0
+        self.checked_at: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.average_latency: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def _ensure_started(self) -> None:
+        # Threads don't survive fork(), so each worker process starts its own.
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._pid = os.getpid()
+
+        # Probe synchronously once, so the first request has a real answer.
+        self.check()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.next_interval())
+            self.check()
+
+    def next_interval(self) -> float:
+        """Return the delay before the next probe, backing off on failure."""
+        if not self.failures:
+            return self.interval
+
+        return min(self.interval * 2 ** (self.failures - 1), self.max_backoff)
+
+    def check(self) -> bool:
+        """Probe the database now and record the result."""
+        start = time.monotonic()
+        try:
+            self.probe()
+        except Exception as e:
+            self.record_failure(str(e) or type(e).__name__)
+        else:
+            self.record_success((time.monotonic() - start) * 1000)
+
+        return self.circuit_closed()
+
+    def record_success(self, latency_ms: float) -> None:
+        """Record a successful round trip that took `latency_ms` milliseconds."""
+        with self._lock:
+            self.failures = 0
+            self.error = None
+            self.checked_at = time.monotonic()
+            self.last_latency = latency_ms
+            self.average_latency = (
+                latency_ms
+                if self.average_latency is None
+                else 0.8 * self.average_latency + 0.2 * latency_ms
+            )
+
+    def record_failure(self, error: str) -> None:
+        """Record a failed attempt to reach the database."""
+        with self._lock:
+            self.failures += 1
+            self.error = error
+            self.checked_at = time.monotonic()
+
+    def circuit_closed(self) -> bool:
+        """Return True if requests should be allowed through to the database."""
+        return self.failures < self.threshold
+
+    def is_live(self) -> bool:
+        """Return the cached liveness state of the database."""
+        self._ensure_started()
+        return self.circuit_closed() or self.trial()
+
+    def trial(self) -> bool:
+        """Probe the open circuit, if a trial is due and none is under way."""
+        with self._lock:
+            due = (
+                self.checked_at is None
+                or time.monotonic() - self.checked_at >= self.retry_after
+            )
+
+        if not due or not self._trial.acquire(blocking=False):
+            return False
+
+        try:
+            return self.check()
+        finally:
+            self._trial.release()
+
+    def status(self) -> HealthStatus:
+        """Return a report of the cached liveness state."""
+        self._ensure_started()
+
+        with self._lock:
+            live = self.circuit_closed()
+            return {
+                "live": live,
+                "circuit": "closed" if live else "open",
+                "consecutive_failures": self.failures,
+                "seconds_since_check": _rounded(
+                    None
+                    if self.checked_at is None
+                    else time.monotonic() - self.checked_at
+                ),
+                "latency_ms": {
+                    "last": _rounded(self.last_latency),
+                    "average": _rounded(self.average_latency),
+                },
+                "error": self.error,
+            }
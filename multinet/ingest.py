@@ -0,0 +1,228 @@
+"""Bulk import of documents into ArangoDB collections."""
+import os
+import threading
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from arango.collection import StandardCollection
+
+from typing import Any, Dict, Iterable, List, Optional
+from typing_extensions import Literal, TypedDict
+
+OnDuplicate = Literal["error", "update", "replace", "ignore"]
+
+BatchReport = TypedDict(
+    "BatchReport",
+    {"batch": int, "rows": int, "failed": int, "seconds": float, "errors": List[str]},
+)
+ImportReport = TypedDict(
+    "ImportReport",
+    {
+        "collection": str,
+        "rows": int,
+        "created": int,
+        "updated": int,
+        "ignored": int,
+        "failed": int,
+        "seconds": float,
+        "rows_per_second": float,
+        "batches": List[BatchReport],
+    },
+)
+
+# How many batches may be importing at once.
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", "4"))
+
+# The first batch size, and the bounds within which batch sizes are adapted.
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))
+MIN_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 50000
+
+# Whether imports wait for each batch to be synced to disk by default ("on"),
+# or leave it to the collection's setting ("off").
+IMPORT_SYNC: Optional[bool] = os.environ.get("IMPORT_SYNC", "off") == "on" or None
+
+# How long (in seconds) each batch should take to import; batch sizes are
+# scaled towards this after each batch completes.
+TARGET_BATCH_SECONDS = 0.5
+
+# How many error messages to keep from each batch.
+MAX_BATCH_ERRORS = 10
+
+
+class BulkImporter:
+    """
+    Import documents into a collection through the bulk import API.
+
+    Documents are added one at a time (or from an iterable), grouped into
+    batches, and sent by a bounded pool of threads. Batch sizes adapt to how
+    long each batch takes, and at most twice as many batches as there are
+    workers are held in memory at once, so adding documents blocks whenever
+    the database falls behind. Use as a context manager, or call `close()` to
+    flush the last batch and obtain a report of the import.
+    """
+
+    def __init__(
+        self,
+        collection: StandardCollection,
+        on_duplicate: OnDuplicate = "error",
+        sync: Optional[bool] = IMPORT_SYNC,
+        workers: int = IMPORT_WORKERS,
+        batch_size: int = IMPORT_BATCH_SIZE,
+    ):
+        """Prepare to import into `collection`."""
+        self.collection = collection
+        self.on_duplicate = on_duplicate
+        self.sync = sync
+        self.batch_size = batch_size
+
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(2 * workers)
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self._buffer: List[Dict[str, Any]] = []
+        self._started = time.monotonic()
+        self._closed = False
+
+        self.report: ImportReport = {
+            "collection": collection.name,
+            "rows": 0,
+            "created": 0,
+            "updated": 0,
+            "ignored": 0,
+            "failed": 0,
+            "seconds": 0.0,
+            "rows_per_second": 0.0,
+            "batches": [],
+        }
+
+    def __enter__(self) -> "BulkImporter":
+        """Start an import."""
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        """Finish the import, unless it is being abandoned due to an error."""
+        if exc_type is None:
+            self.close()
+        else:
+            self._shutdown()
+
+    def add(self, document: Dict[str, Any]) -> None:
+        """Queue a document for import."""
+        self._buffer.append(document)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def extend(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """Queue many documents for import."""
+        for document in documents:
+            self.add(document)
+
+    def flush(self) -> None:
+        """Send the queued documents as a batch."""
+        if not self._buffer:
+            return
+
+        batch, self._buffer = self._buffer, []
+        number = len(self._futures)
+
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._import, number, batch)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def close(self) -> ImportReport:
+        """Import any remaining documents, and wait for every batch to finish."""
+        if not self._closed:
+            try:
+                self.flush()
+
+                # Raise the first error encountered by any batch.
+                for future in self._futures:
+                    future.result()
+            finally:
+                self._shutdown()
+
+            elapsed = time.monotonic() - self._started
+            self.report["seconds"] = round(elapsed, 3)
+            self.report["rows_per_second"] = round(
+                self.report["rows"] / elapsed if elapsed else 0.0, 1
+            )
+            self.report["batches"].sort(key=lambda b: b["batch"])
+
+        return self.report
+
+    def _shutdown(self) -> None:
+        self._closed = True
+        self._pool.shutdown(wait=True)
+
+    def _import(self, number: int, batch: List[Dict[str, Any]]) -> None:
+        start = time.monotonic()
+        result = self.collection.import_bulk(
+            batch,
+            halt_on_error=False,
+            details=True,
+            on_duplicate=self.on_duplicate,
+            sync=self.sync,
+        )
+        elapsed = time.monotonic() - start
+
+        with self._lock:
+            self.report["rows"] += len(batch)
+            self.report["created"] += result.get("created", 0)
+            self.report["updated"] += result.get("updated", 0)
+            self.report["ignored"] += result.get("ignored", 0)
+            self.report["failed"] += result.get("errors", 0)
+            self.report["batches"].append(
+                {
+                    "batch": number,
+                    "rows": len(batch),
+                    "failed": result.get("errors", 0),
+                    "seconds": round(elapsed, 3),
+                    "errors": result.get("details", [])[:MAX_BATCH_ERRORS],
+                }
+            )
+
+            # Scale the batch size towards the target duration, but by no more
+            # than a factor of two each time, to smooth out noisy timings.
+            scale = TARGET_BATCH_SECONDS / max(elapsed, 1e-3)
+            scale = min(max(scale, 0.5), 2.0)
+            self.batch_size = int(
+                min(max(self.batch_size * scale, MIN_BATCH_SIZE), MAX_BATCH_SIZE)
+            )
+
+
+def import_documents(
+    collection: StandardCollection,
+    documents: Iterable[Dict[str, Any]],
+    on_duplicate: OnDuplicate = "error",
+    sync: Optional[bool] = IMPORT_SYNC,
+) -> ImportReport:
+    """Import `documents` into `collection`, returning a report of the import."""
+    with BulkImporter(collection, on_duplicate=on_duplicate, sync=sync) as importer:
+        importer.extend(documents)
+
+    return importer.report
+
+
+def first_errors(report: ImportReport, limit: int = MAX_BATCH_ERRORS) -> List[str]:
+    """Return the first error messages of a finished import, in batch order."""
+    errors = [error for batch in report["batches"] for error in batch["errors"]]
+    return errors[:limit]
+
+
+def summarize(report: ImportReport) -> str:
+    """Describe an import in one line, for logging."""
+    failed_batches = sum(1 for batch in report["batches"] if batch["failed"])
+    return (
+        f"imported {report['rows']} rows into {report['collection']} "
+        f"in {report['seconds']}s ({report['rows_per_second']} rows/s): "
+        f"{report['created']} created, {report['updated']} updated, "
+        f"{report['ignored']} ignored, {report['failed']} failed "
+        f"(in {failed_batches} of {len(report['batches'])} batches)"
+    )
@@ -0,0 +1,240 @@
+"""Incremental, event-based parsing of JSON text that is too big to load at once."""
+import json
+import re
+from json.decoder import scanstring  # type: ignore
+
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple, Union
+
+# Each event is a kind, and a value for `map_key` and `value` events:
+#   start_map, map_key, end_map, start_array, end_array, value
+Event = Tuple[str, Any]
+Container = Union[Dict[str, Any], List[Any]]
+
+# How much text to read from the stream at once.
+CHUNK_SIZE = 64 * 1024
+
+whitespace = re.compile(r"[ \t\n\r]*")
+scalar = re.compile(
+    r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null"
+)
+literals = {"true": True, "false": False, "null": None}
+
+# Scalars that end this close to the end of a chunk may have been cut off
+# (e.g., "fal" or "1e"), so are only read once more text has been read.
+SHORT_TOKEN = 5
+
+EOF = ""
+
+
+class JSONStreamError(ValueError):
+    """Invalid JSON, with the character offset at which the problem was found."""
+
+    def __init__(self, message: str, offset: int):
+        """Initialize the error."""
+        super().__init__(f"{message} (char {offset})")
+        self.offset = offset
+
+
+class Tokenizer:
+    """Split JSON text, read in chunks from a stream, into tokens."""
+
+    def __init__(self, stream: IO[str], chunk_size: int = CHUNK_SIZE):
+        """Prepare to read `stream`."""
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        # Read at least as much as is left over, so that a long token which
+        # spans many chunks is re-scanned a logarithmic number of times.
+        chunk = self.stream.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> JSONStreamError:
+        """Return an error describing a problem at the current position."""
+        return JSONStreamError(message, self.offset + self.pos)
+
+    def next(self) -> Tuple[str, Any]:
+        """
+        Return the next token, as a kind and a value.
+
+        The kind is a punctuation character, "string", "value" (for numbers and
+        literals), or `EOF` at the end of the text.
+        """
+        while True:
+            self.pos = whitespace.match(self.buffer, self.pos).end()  # type: ignore
+            if self.pos == len(self.buffer):
+                if self._fill():
+                    continue
+
+                return (EOF, None)
+
+            char = self.buffer[self.pos]
+            if char in "{}[]:,":
+                self.pos += 1
+                return (char, None)
+
+            if char == '"':
+                try:
+                    value, end = scanstring(self.buffer, self.pos + 1)
+                except json.JSONDecodeError as e:
+                    if not self.eof and self._fill():
+                        continue
+
+                    raise JSONStreamError(e.msg, self.offset + e.pos)
+
+                self.pos = end
+                return ("string", value)
+
+            match = scalar.match(self.buffer, self.pos)
+
+            end = match.end() if match else self.pos
+            if len(self.buffer) - end < SHORT_TOKEN and not self.eof and self._fill():
+                continue
+
+            if match is None:
+                raise self.error("Expecting value")
+
+            self.pos = match.end()
+            token = match.group()
+            if token in literals:
+                return ("value", literals[token])
+
+            return ("value", json.loads(token))
+
+
+def parse(stream: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Event]:
+    """
+    Generate the parsing events for the JSON document in `stream`.
+
+    Only the current token and the kinds of the open containers are held in
+    memory, so documents of any size or depth can be parsed.
+    """
+    tokens = Tokenizer(stream, chunk_size)
+
+    # "map" or "array" for each open container.
+    stack: List[str] = []
+
+    # What may come next: "value", "first_value" (a value or the end of an
+    # array), "key", "first_key" (a key or the end of a map), "colon", "comma"
+    # (or the end of the container), or "end" (of the document).
+    expect = "value"
+
+    while True:
+        kind, value = tokens.next()
+
+        if kind == EOF:
+            if expect != "end":
+                raise tokens.error("Unexpected end of document")
+            return
+
+        if expect == "end":
+            raise tokens.error("Extra data")
+
+        if expect == "colon":
+            if kind != ":":
+                raise tokens.error("Expecting ':' delimiter")
+            expect = "value"
+            continue
+
+        if expect in ("key", "first_key"):
+            if kind == "string":
+                yield ("map_key", value)
+                expect = "colon"
+                continue
+            if not (expect == "first_key" and kind == "}"):
+                raise tokens.error("Expecting property name enclosed in double quotes")
+
+        elif expect in ("value", "first_value"):
+            if kind == "{":
+                stack.append("map")
+                yield ("start_map", None)
+                expect = "first_key"
+                continue
+            if kind == "[":
+                stack.append("array")
+                yield ("start_array", None)
+                expect = "first_value"
+                continue
+            if kind in ("string", "value"):
+                yield ("value", value)
+                expect = "comma" if stack else "end"
+                continue
+            if not (expect == "first_value" and kind == "]"):
+                raise tokens.error("Expecting value")
+
+        elif kind == ",":
+            expect = "key" if stack[-1] == "map" else "value"
+            continue
+
+        # What remains is the end of a container.
+        if (kind, stack[-1]) == ("}", "map"):
+            yield ("end_map", None)
+        elif (kind, stack[-1]) == ("]", "array"):
+            yield ("end_array", None)
+        else:
+            raise tokens.error("Expecting ',' delimiter")
+
+        stack.pop()
+        expect = "comma" if stack else "end"
+
+
+def build(event: Event, events: Iterator[Event]) -> Any:
+    """Return the value that starts with `event`, consuming the rest of its events."""
+    kind, value = event
+    if kind == "value":
+        return value
+
+    root: Container = {} if kind == "start_map" else []
+    stack: List[Container] = [root]
+    key: Optional[str] = None
+
+    for kind, value in events:
+        if kind == "map_key":
+            key = value
+            continue
+
+        if kind in ("end_map", "end_array"):
+            stack.pop()
+            if not stack:
+                return root
+            continue
+
+        if kind == "start_map":
+            item: Any = {}
+        elif kind == "start_array":
+            item = []
+        else:
+            item = value
+
+        container = stack[-1]
+        if isinstance(container, dict):
+            container[key] = item  # type: ignore
+        else:
+            container.append(item)
+
+        if kind in ("start_map", "start_array"):
+            stack.append(item)
+
+    raise ValueError("Incomplete value")
+
+
+def skip(event: Event, events: Iterator[Event]) -> None:
+    """Consume the rest of the value that starts with `event`, discarding it."""
+    depth = 1 if event[0] in ("start_map", "start_array") else 0
+    while depth:
+        kind, _ = next(events)
+        if kind in ("start_map", "start_array"):
+            depth += 1
+        elif kind in ("end_map", "end_array"):
+            depth -= 1
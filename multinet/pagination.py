@@ -0,0 +1,35 @@
+"""Opaque cursors for keyset pagination."""
+import base64
+import binascii
+import json
+
+from typing import Any, Dict
+
+from multinet.errors import InvalidCursor
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a position in a result set as an opaque, URL-safe string."""
+    raw = json.dumps(position, separators=(",", ":")).encode("utf8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor created by `encode_cursor()`.
+
+    The empty string is a valid cursor, denoting the start of the result set.
+    """
+    if not cursor:
+        return {}
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error):
+        raise InvalidCursor(cursor)
+
+    if not isinstance(position, dict):
+        raise InvalidCursor(cursor)
+
+    return position
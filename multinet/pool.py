@@ -0,0 +1,224 @@
+"""Pooled, long-lived ArangoDB database handles."""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from arango import ArangoClient
+from arango.collection import StandardCollection
+from arango.database import StandardDatabase
+from arango.http import HTTPClient
+from arango.response import Response
+
+from typing import Any, Dict, Optional, Tuple
+from typing_extensions import Literal, TypedDict
+
+Role = Literal["root", "readonly"]
+
+PoolStats = TypedDict(
+    "PoolStats",
+    {
+        "handles": int,
+        "handle_hits": int,
+        "handle_misses": int,
+        "requests": int,
+        "pool_size": int,
+        "pools": Dict[str, Dict[str, int]],
+    },
+)
+
+
+class PooledHTTPClient(HTTPClient):
+    """
+    HTTP client that shares one keep-alive connection pool between handles.
+
+    python-arango creates a fresh `requests.Session` for every database handle
+    unless it is given an HTTP client; using a single instance of this class
+    for all handles means every request reuses the same pool of connections.
+    """
+
+    def __init__(self, pool_size: int, retries: int, backoff: float):
+        """Initialize the session and mount a pooled, retrying adapter on it."""
+        self.pool_size = pool_size
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            backoff_factor=backoff,
+            status_forcelist=(503,),
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+
+        self._session = requests.Session()
+        self._session.mount("http://", self._adapter)
+        self._session.mount("https://", self._adapter)
+
+    def send_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        data: Any = None,
+        headers: Optional[Dict] = None,
+        auth: Optional[Tuple[str, str]] = None,
+    ) -> Response:
+        """Send an HTTP request over the shared session."""
+        with self._lock:
+            self.requests += 1
+
+        raw_resp = self._session.request(
+            method=method, url=url, params=params, data=data, headers=headers, auth=auth
+        )
+        return Response(
+            method=raw_resp.request.method,
+            url=raw_resp.url,
+            headers=raw_resp.headers,
+            status_code=raw_resp.status_code,
+            status_text=raw_resp.reason,
+            raw_body=raw_resp.text,
+        )
+
+    def pool_usage(self) -> Dict[str, Dict[str, int]]:
+        """Report the connection usage of every host pool."""
+        pools = self._adapter.poolmanager.pools
+        usage = {}
+        for key in pools.keys():
+            pool = pools[key]
+            if pool is None:
+                continue
+
+            usage[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": pool.pool.qsize() if pool.pool is not None else 0,
+            }
+
+        return usage
+
+
+class HandleRegistry:
+    """
+    Thread-safe registry of database handles, one per (database, role) pair.
+
+    Handles are created (and verified) the first time they are requested, and
+    shared by every thread in the process afterwards. Verification is a round
+    trip to the database, so it is done without holding the registry's lock;
+    if two threads race to create the same handle, the first one stored wins.
+    Since connection pools must not be shared across `fork()`, the registry
+    resets itself whenever it notices that it is running in a new process.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        protocol: str,
+        pool_size: int = 10,
+        retries: int = 3,
+        backoff: float = 0.1,
+    ):
+        """Record the connection parameters; connections are made lazily."""
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._http = PooledHTTPClient(self.pool_size, self.retries, self.backoff)
+        self._client = ArangoClient(
+            host=self.host,
+            port=self.port,
+            protocol=self.protocol,
+            http_client=self._http,
+        )
+        self._handles: Dict[Tuple[str, Role], StandardDatabase] = {}
+        self._collections: Dict[Tuple[str, str], StandardCollection] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def _current_client(self) -> ArangoClient:
+        # Must be called with the lock held.
+        if self._pid != os.getpid():
+            self._reset()
+
+        return self._client
+
+    def get(self, name: str, role: Role, password: str) -> StandardDatabase:
+        """Return the shared handle for database `name` under `role`."""
+        with self._lock:
+            client = self._current_client()
+            handle = self._handles.get((name, role))
+            if handle is not None:
+                self._hits += 1
+                return handle
+
+            self._misses += 1
+
+        handle = client.db(name, username=role, password=password, verify=True)
+
+        with self._lock:
+            # Don't store a handle made by a client that has since been reset.
+            if client is not self._client:
+                return handle
+
+            return self._handles.setdefault((name, role), handle)
+
+    def collection(
+        self, name: str, collection: str, password: str
+    ) -> StandardCollection:
+        """
+        Return the shared handle for `collection` in database `name`.
+
+        The collection is created if it doesn't exist yet; either way, the
+        database is only asked about it the first time in each process.
+        """
+        with self._lock:
+            client = self._current_client()
+            handle = self._collections.get((name, collection))
+            if handle is not None:
+                return handle
+
+        database = self.get(name, "root", password)
+        if not database.has_collection(collection):
+            database.create_collection(collection)
+
+        handle = database.collection(collection)
+
+        with self._lock:
+            if client is not self._client:
+                return handle
+
+            return self._collections.setdefault((name, collection), handle)
+
+    def discard(self, name: str) -> None:
+        """Drop the handles for database `name` (e.g., after it is deleted)."""
+        with self._lock:
+            self._handles.pop((name, "root"), None)
+            self._handles.pop((name, "readonly"), None)
+            for key in [key for key in self._collections if key[0] == name]:
+                del self._collections[key]
+
+    def stats(self) -> PoolStats:
+        """Report handle reuse and connection pool usage."""
+        with self._lock:
+            return {
+                "handles": len(self._handles),
+                "handle_hits": self._hits,
+                "handle_misses": self._misses,
+                "requests": self._http.requests,
+                "pool_size": self.pool_size,
+                "pools": self._http.pool_usage(),
+            }
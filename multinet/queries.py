@@ -0,0 +1,376 @@
+"""
+AQL query builders.
+
+Every query here has fixed text: table names, keys, offsets and limits are
+passed as bind variables (`@@collection` for collections, `@param` for
+values). Since the text of a query never depends on its inputs, ArangoDB can
+reuse its query plans, and its result cache can serve repeated requests.
+"""
+from dataclasses import dataclass
+
+from typing import Any, Dict, List, Optional
+from multinet.types import EdgeDirection
+from multinet.errors import BadQueryArgument
+
+
+@dataclass(frozen=True)
+class Query:
+    """The text of an AQL query, along with its bind variables."""
+
+    text: str
+    bind_vars: Dict[str, Any]
+
+    # Ask the server to report, alongside the (LIMITed) results, how many rows
+    # the query would have produced without its LIMIT.
+    full_count: bool = False
+
+    # For queries that read whole tables: produce results as the cursor is
+    # read (rather than all at once, before the first batch is returned), and
+    # how many rows to fetch per round trip.
+    stream: bool = False
+    batch_size: Optional[int] = None
+
+
+TABLE_ROWS = """
+FOR d IN @@table
+    LIMIT @offset, @limit
+    RETURN d
+"""
+
+# A page of rows together with the row count, in one round trip. LENGTH() of a
+# collection is answered from the collection's metadata, not by scanning it.
+TABLE_PAGE = """
+RETURN {
+    count: @count ? LENGTH(@@table) : null,
+    rows: (
+        FOR d IN @@table
+            LIMIT @offset, @limit
+            RETURN d
+    )
+}
+"""
+
+# Keyset pagination: resume after the last key seen, walking the primary index
+# in key order, so that every page costs the same regardless of its depth.
+TABLE_PAGE_AFTER = """
+RETURN {
+    count: @count ? LENGTH(@@table) : null,
+    rows: (
+        FOR d IN @@table
+            FILTER d._key > @after
+            SORT d._key
+            LIMIT @limit
+            RETURN d
+    )
+}
+"""
+
+TABLE_SCAN = """
+FOR d IN @@table
+    RETURN d
+"""
+
+# Every row of a table, with the given attributes stripped on the server.
+TABLE_EXPORT = """
+FOR d IN @@table
+    RETURN UNSET(d, @unset)
+"""
+
+# The names of the attributes found in any row of a table. Only the names come
+# back, so the cost on this side doesn't grow with the number of rows.
+TABLE_ATTRIBUTES = """
+FOR d IN @@table
+    FOR name IN ATTRIBUTES(d)
+        COLLECT attribute = name
+        RETURN attribute
+"""
+
+# How many rows each round trip of a table export fetches.
+EXPORT_BATCH_SIZE = 5000
+
+# A primary index lookup, with the revision stripped on the server.
+NODE_ATTRIBUTES = """
+FOR d IN @@table
+    FILTER d._key == @key
+    LIMIT 1
+    RETURN UNSET(d, "_rev")
+"""
+
+# Many primary index lookups in one query.
+NODES_BY_KEY = """
+FOR d IN @@table
+    FILTER d._key IN @keys
+    RETURN UNSET(d, "_rev")
+"""
+
+# Traversal directions can't be bound as parameters, so there is one (fixed)
+# query text per direction. A one-step traversal reads the edge index, so its
+# cost depends on the degree of the node rather than the size of the table.
+EDGE_DIRECTIONS: Dict[EdgeDirection, str] = {
+    "all": "ANY",
+    "incoming": "INBOUND",
+    "outgoing": "OUTBOUND",
+}
+
+NODE_EDGES = """
+FOR v, e IN 1..1 {direction} @node @@edges
+    LIMIT @offset, @limit
+    RETURN {{
+        "edge": e._id,
+        "from": e._from,
+        "to": e._to{neighbor}
+    }}
+"""
+
+NEIGHBOR = """,
+        "neighbor": UNSET(v, "_rev")"""
+
+# A breadth-first traversal out to @depth steps from every seed, keeping the
+# nodes that match @filters, followed by the edges running between the nodes
+# that were found. LIMITs bound the work done for densely connected seeds.
+# Edges can point at nodes that have since been deleted, so only the nodes that
+# still exist are kept, along with the edges between them. The nodes and then
+# the edges are returned one per row, so that the cursor can be read in batches.
+SUBGRAPH = """
+LET ids = UNIQUE(
+    FOR s IN @seeds
+        FOR v IN 0..@depth {direction} s @@edges
+            OPTIONS {{bfs: true, uniqueVertices: "global"}}
+            FILTER v != null
+            FILTER @filters == {{}} OR MATCHES(v, @filters)
+            LIMIT @node_limit
+            RETURN v._id
+)
+LET nodes = (
+    FOR id IN ids
+        LET doc = DOCUMENT(id)
+        FILTER doc != null
+        RETURN UNSET(doc, "_rev")
+)
+LET members = ZIP(nodes[*]._id, nodes[*]._id)
+LET links = (
+    FOR node IN nodes
+        FOR v, e IN 1..1 OUTBOUND node._id @@edges
+            FILTER HAS(members, e._to)
+            LIMIT @edge_limit
+            RETURN UNSET(e, "_rev")
+)
+
+FOR row IN APPEND(nodes[* RETURN {{node: CURRENT}}], links[* RETURN {{link: CURRENT}}])
+    RETURN row
+"""
+
+# The tables referenced by each column (_from or _to) of an edge table,
+# aggregated on the server so that only one row per table and column comes
+# back.
+EDGE_TABLE_REFERENCES = """
+FOR e IN @@edges
+    FOR side IN ["_from", "_to"]
+        COLLECT table = PARSE_IDENTIFIER(e[side]).collection, column = side
+        RETURN {table, column}
+"""
+
+# An anti-join of the ends of an edge table's edges against the node tables
+# they reference: each end is a primary index lookup, and only references to
+# missing nodes are gathered, so the result grows with the number of missing
+# nodes rather than the size of the tables. Only ends in @tables (which must
+# exist) are checked, and at most @limit missing keys are returned per table.
+MISSING_REFERENCES = """
+FOR e IN @@edges
+    FOR id IN UNIQUE([e._from, e._to])
+        LET ref = PARSE_IDENTIFIER(id)
+        FILTER ref.collection IN @tables
+        FILTER DOCUMENT(id) == null
+        COLLECT missing_table = ref.collection, missing_key = ref.key
+        COLLECT table = missing_table INTO keys = missing_key
+        RETURN {table, keys: SLICE(keys, 0, @limit)}
+"""
+
+
+def _table_list(tables: List[str]) -> Dict[str, str]:
+    return {f"@table{i}": table for i, table in enumerate(tables)}
+
+
+def _table_array(tables: List[str]) -> str:
+    return ", ".join(f"@{param}" for param in _table_list(tables))
+
+
+def table_rows(table: str, offset: int, limit: int) -> Query:
+    """Return a page of the rows of `table`."""
+    return Query(TABLE_ROWS, {"@table": table, "offset": offset, "limit": limit})
+
+
+def table_page(table: str, offset: int, limit: int, count: bool = True) -> Query:
+    """Return a page of the rows of `table`, and (if `count`) its row count."""
+    return Query(
+        TABLE_PAGE,
+        {"@table": table, "offset": offset, "limit": limit, "count": count},
+    )
+
+
+def table_page_after(table: str, after: str, limit: int, count: bool = True) -> Query:
+    """Return up to `limit` rows of `table` with keys following `after`."""
+    return Query(
+        TABLE_PAGE_AFTER,
+        {"@table": table, "after": after, "limit": limit, "count": count},
+    )
+
+
+def table_counts(tables: List[str]) -> Query:
+    """Return the row count of each of `tables`, in order."""
+    lengths = ", ".join(f"LENGTH(@{param})" for param in _table_list(tables))
+    return Query(f"RETURN [{lengths}]", _table_list(tables))
+
+
+def table_scan(table: str) -> Query:
+    """Stream every row of `table`."""
+    return Query(
+        TABLE_SCAN, {"@table": table}, stream=True, batch_size=EXPORT_BATCH_SIZE
+    )
+
+
+def table_attributes(table: str) -> Query:
+    """Return the name of every attribute used in `table`."""
+    return Query(TABLE_ATTRIBUTES, {"@table": table})
+
+
+def table_export(
+    table: str, unset: List[str], batch_size: int = EXPORT_BATCH_SIZE
+) -> Query:
+    """Stream every row of `table`, without the attributes in `unset`."""
+    return Query(
+        TABLE_EXPORT,
+        {"@table": table, "unset": unset},
+        stream=True,
+        batch_size=batch_size,
+    )
+
+
+def node_attributes(table: str, key: str) -> Query:
+    """Return the document with key `key` in `table`, without its `_rev`."""
+    return Query(NODE_ATTRIBUTES, {"@table": table, "key": key})
+
+
+def _table_count(tables: List[str]) -> str:
+    return " + ".join(f"LENGTH(@{param})" for param in _table_list(tables)) or "0"
+
+
+def graph_nodes(
+    tables: List[str], offset: int, limit: int, count: bool = True
+) -> Query:
+    """Return a page of the nodes stored in `tables`, and (if `count`) their count."""
+    text = f"""
+    RETURN {{
+        count: @count ? {_table_count(tables)} : null,
+        nodes: (
+            FOR c IN [{_table_array(tables)}]
+                FOR d IN c
+                    LIMIT @offset, @limit
+                    RETURN d
+        )
+    }}
+    """
+
+    bind_vars = {**_table_list(tables), "offset": offset, "limit": limit}
+    return Query(text, {**bind_vars, "count": count})
+
+
+def graph_nodes_after(
+    tables: List[str], table: str, after: str, limit: int, count: bool = True
+) -> Query:
+    """
+    Return up to `limit` nodes of `table` with keys following `after`.
+
+    If `count` is set, the total number of nodes across `tables` is returned
+    with them.
+    """
+    text = f"""
+    RETURN {{
+        count: @count ? {_table_count(tables)} : null,
+        nodes: (
+            FOR d IN @@table
+                FILTER d._key > @after
+                SORT d._key
+                LIMIT @limit
+                RETURN d
+        )
+    }}
+    """
+
+    bind_vars = {**_table_list(tables), "@table": table, "after": after}
+    return Query(text, {**bind_vars, "limit": limit, "count": count})
+
+
+def subgraph(
+    edge_table: str,
+    seeds: List[str],
+    depth: int,
+    direction: EdgeDirection,
+    node_limit: int,
+    edge_limit: int,
+    filters: Dict[str, Any],
+) -> Query:
+    """Return the subgraph induced by the neighborhood of the `seeds` nodes."""
+    text = SUBGRAPH.format(direction=_edge_direction(direction))
+    bind_vars = {
+        "@edges": edge_table,
+        "seeds": seeds,
+        "depth": depth,
+        "node_limit": node_limit,
+        "edge_limit": edge_limit,
+        "filters": filters,
+    }
+
+    return Query(text, bind_vars)
+
+
+def nodes_by_key(table: str, keys: List[str]) -> Query:
+    """Return the documents of `table` with the given keys, without `_rev`."""
+    return Query(NODES_BY_KEY, {"@table": table, "keys": keys})
+
+
+def _edge_direction(direction: EdgeDirection) -> str:
+    if direction not in EDGE_DIRECTIONS:
+        raise BadQueryArgument("direction", direction, list(EDGE_DIRECTIONS))
+
+    return EDGE_DIRECTIONS[direction]
+
+
+def node_edges(
+    edge_table: str,
+    node: str,
+    direction: EdgeDirection,
+    offset: int,
+    limit: int,
+    count: bool = True,
+    neighbors: bool = False,
+) -> Query:
+    """
+    Return a page of the edges in `edge_table` incident on the node `node`.
+
+    If `count` is set, the total number of such edges is reported as the
+    `fullCount` statistic of the query. If `neighbors` is set, each edge comes
+    with the document at its other end.
+    """
+    text = NODE_EDGES.format(
+        direction=_edge_direction(direction), neighbor=NEIGHBOR if neighbors else ""
+    )
+    bind_vars = {"@edges": edge_table, "node": node, "offset": offset, "limit": limit}
+
+    return Query(text, bind_vars, full_count=count)
+
+
+def edge_table_references(edge_table: str) -> Query:
+    """Return the tables referenced by each column of `edge_table`."""
+    return Query(EDGE_TABLE_REFERENCES, {"@edges": edge_table})
+
+
+def missing_references(edge_table: str, tables: List[str], limit: int) -> Query:
+    """
+    Return the keys referenced by `edge_table` that are missing from `tables`.
+
+    Each result is a table with (up to `limit` of) its missing keys.
+    """
+    return Query(
+        MISSING_REFERENCES, {"@edges": edge_table, "tables": tables, "limit": limit}
+    )
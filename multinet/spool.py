@@ -0,0 +1,165 @@
+"""On-disk storage for the chunks of multipart uploads."""
+import io
+import os
+import re
+import shutil
+import tempfile
+import time
+from uuid import uuid4
+
+from multinet.errors import AlreadyExists, IncompleteUpload, UploadNotFound
+
+from typing import IO, List, Optional
+
+# Directory under which each upload gets a directory of chunk files.
+SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR") or os.path.join(
+    tempfile.gettempdir(), "multinet-uploads"
+)
+
+# Uploads that haven't been written to for this many seconds are abandoned, and
+# deleted the next time an upload is created.
+MAX_AGE = float(os.environ.get("UPLOAD_SPOOL_MAX_AGE", "86400"))
+
+# Upload IDs become directory names, so anything else is rejected outright.
+upload_id_pattern = re.compile("u-[0-9a-f]{32}")
+
+CHUNK_SUFFIX = ".chunk"
+
+
+def upload_path(upload_id: str) -> str:
+    """Return the directory holding the chunks of an existing upload."""
+    if not upload_id_pattern.fullmatch(upload_id):
+        raise UploadNotFound(upload_id)
+
+    path = os.path.join(SPOOL_DIR, upload_id)
+    if not os.path.isdir(path):
+        raise UploadNotFound(upload_id)
+
+    return path
+
+
+def sweep_uploads(max_age: Optional[float] = None) -> List[str]:
+    """
+    Delete the uploads not written to for `max_age` (or MAX_AGE) seconds.
+
+    Writing a chunk updates the modification time of its upload's directory,
+    so that is the time of the last write. Returns the IDs of deleted uploads.
+    """
+    cutoff = time.time() - (MAX_AGE if max_age is None else max_age)
+
+    try:
+        names = os.listdir(SPOOL_DIR)
+    except FileNotFoundError:
+        return []
+
+    swept = []
+    for upload_id in names:
+        path = os.path.join(SPOOL_DIR, upload_id)
+        try:
+            if not upload_id_pattern.fullmatch(upload_id) or (
+                os.path.getmtime(path) >= cutoff
+            ):
+                continue
+        except FileNotFoundError:
+            continue
+
+        # Another worker may be sweeping the same upload.
+        shutil.rmtree(path, ignore_errors=True)
+        swept.append(upload_id)
+
+    return swept
+
+
+def create_upload() -> str:
+    """Create an empty upload, after sweeping abandoned ones, and return its ID."""
+    sweep_uploads()
+    upload_id = f"u-{uuid4().hex}"
+    os.makedirs(os.path.join(SPOOL_DIR, upload_id))
+    return upload_id
+
+
+def write_chunk(upload_id: str, sequence: int, data: IO[bytes]) -> None:
+    """Copy the chunk numbered `sequence` of an upload from `data` to disk."""
+    path = upload_path(upload_id)
+    final = os.path.join(path, f"{sequence}{CHUNK_SUFFIX}")
+
+    # Write to a private file first, so that a chunk is never visible half
+    # written, and link it into place so that a duplicate is never overwritten.
+    fd, partial = tempfile.mkstemp(dir=path, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as chunk_file:
+            shutil.copyfileobj(data, chunk_file)
+
+        try:
+            os.link(partial, final)
+        except FileExistsError:
+            raise AlreadyExists("Upload Chunk", f"{upload_id}/{sequence}")
+    finally:
+        os.unlink(partial)
+
+
+def chunk_paths(upload_id: str) -> List[str]:
+    """Return the chunk files of an upload, in sequence order."""
+    path = upload_path(upload_id)
+
+    sequences = sorted(
+        int(name[: -len(CHUNK_SUFFIX)])
+        for name in os.listdir(path)
+        if name.endswith(CHUNK_SUFFIX)
+    )
+    if not sequences:
+        raise IncompleteUpload(upload_id, [0])
+
+    # Chunks are numbered from zero.
+    missing = sorted(set(range(sequences[-1] + 1)) - set(sequences))
+    if missing:
+        raise IncompleteUpload(upload_id, missing)
+
+    return [os.path.join(path, f"{sequence}{CHUNK_SUFFIX}") for sequence in sequences]
+
+
+class ChunkReader(io.RawIOBase):
+    """A read-only stream of the concatenated chunks of an upload."""
+
+    def __init__(self, paths: List[str]):
+        """Prepare to read the files in `paths`, one after another."""
+        self.paths = list(paths)
+        self._current: Optional[IO[bytes]] = None
+
+    def readable(self) -> bool:
+        """Indicate that this stream can be read."""
+        return True
+
+    def readinto(self, buffer: bytearray) -> int:  # type: ignore
+        """Read into `buffer` from the current chunk, moving on when it ends."""
+        while True:
+            if self._current is None:
+                if not self.paths:
+                    return 0
+
+                self._current = open(self.paths.pop(0), "rb")
+
+            count = self._current.readinto(buffer)  # type: ignore
+            if count:
+                return count
+
+            self._current.close()
+            self._current = None
+
+    def close(self) -> None:
+        """Close the chunk being read, if there is one."""
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+        super().close()
+
+
+def open_upload(upload_id: str) -> IO[bytes]:
+    """Return a buffered stream of the contents of an upload, in sequence order."""
+    return io.BufferedReader(ChunkReader(chunk_paths(upload_id)))  # type: ignore
+
+
+def delete_upload(upload_id: str) -> None:
+    """Delete an upload and its chunks."""
+    shutil.rmtree(upload_path(upload_id))
@@ -1,5 +1,5 @@
 """Custom types for Multinet codebase."""
-from typing import Dict, Set, List
+from typing import Set, List
 from typing_extensions import Literal, TypedDict
 
 EdgeDirection = Literal["all", "incoming", "outgoing"]
@@ -35,9 +35,6 @@ class WorkspaceDocument(Workspace):
 class EdgeTableProperties(TypedDict):
     """Describes gathered information about an edge table."""
 
-    # Dictionary mapping all referenced tables to the referenced keys within that table
-    table_keys: Dict[str, Set[str]]
-
     # Keeps track of which tables are referenced in the _from column
     from_tables: Set[str]
 
@@ -1,13 +1,21 @@
 """Multinet uploader for CSV files."""
 import csv
 from flasgger import swag_from
-from io import StringIO
+from io import TextIOWrapper
 
 from multinet import db, util
 from multinet.auth.util import require_writer
-from multinet.errors import AlreadyExists, FlaskTuple, ServerError
-from multinet.util import decode_data
-from multinet.validation.csv import validate_csv
+from multinet.errors import (
+    AlreadyExists,
+    DecodeFailed,
+    FlaskTuple,
+    ServerError,
+    ValidationFailed,
+)
+from multinet.ingest import BulkImporter, first_errors, summarize
+from multinet.schema import TableSchema
+from multinet.validation import RejectedRows
+from multinet.validation.csv import CSVValidator
 
 from flask import Blueprint, request
 from flask import current_app as app
@@ -15,8 +23,7 @@ from webargs import fields as webarg_fields
 from webargs.flaskparser import use_kwargs
 
 # Import types
-from typing import Any, List, Dict
-
+from typing import Any, IO
 
 bp = Blueprint("csv", __name__)
 bp.before_request(util.require_db)
@@ -30,17 +37,6 @@ class CSVReadError(ServerError):
         return ("Could not read CSV data", "415 Unsupported Media Type")
 
 
-def set_table_key(rows: List[Dict[str, str]], key: str) -> List[Dict[str, str]]:
-    """Update the _key field in each row."""
-    new_rows: List[Dict[str, str]] = []
-    for row in rows:
-        new_row = dict(row)
-        new_row["_key"] = new_row[key]
-        new_rows.append(new_row)
-
-    return new_rows
-
-
 @bp.route("/<workspace>/<table>", methods=["POST"])
 @use_kwargs(
     {
@@ -61,38 +57,84 @@ def upload(
     `data` - the CSV data, passed in the request body. If the CSV data contains
              `_from` and `_to` fields, it will be treated as an edge table.
     """
+    return import_csv(workspace, table, request.stream, key, overwrite)
+
+
+def import_csv(
+    workspace: str,
+    table: str,
+    stream: IO[bytes],
+    key: str = "_key",
+    overwrite: bool = False,
+) -> Any:
+    """Import CSV data from `stream` into a new table, as it is read."""
     space = db.get_workspace_db(workspace, readonly=False)
     if space.has_collection(table):
         raise AlreadyExists("table", table)
 
     app.logger.info("Bulk Loading")
 
-    # Read the request body into CSV format
-    body = decode_data(request.data)
+    # Parse the data as it arrives, rather than reading it all in.
+    body = TextIOWrapper(stream, encoding="utf8", newline="")
+    reader = csv.DictReader(body)
 
     try:
-        # Type to a Dict rather than an OrderedDict
-        rows: List[Dict[str, str]] = list(csv.DictReader(StringIO(body)))
+        # Check the header, which decides whether this is an edge table (i.e.,
+        # whether it has _from/_to fields).
+        validator = CSVValidator(reader.fieldnames, key, overwrite)
     except csv.Error:
         raise CSVReadError()
+    except UnicodeDecodeError as e:
+        raise DecodeFailed(str(e))
 
-    # Perform validation.
-    validate_csv(rows, key, overwrite)
-
-    # Once we reach here, we know that the specified key field must be present,
-    # and either:
-    #   key == "_key"   # noqa: E800
-    #   or key != "_key" and the "_key" field is not present
-    #   or key != "_key" and "_key" is present, but overwrite = True
-    if key != "_key":
-        rows = set_table_key(rows, key)
-
-    # Set the collection, paying attention to whether the data contains
-    # _from/_to fields.
-    fieldnames = rows[0].keys()
-    edges = "_from" in fieldnames and "_to" in fieldnames
-    coll = space.create_collection(table, edge=edges)
-
-    # Insert the data into the collection.
-    results = coll.insert_many(rows)
-    return {"count": len(results)}
+    coll = space.create_collection(table, edge=validator.edges)
+    schema = TableSchema()
+
+    try:
+        with BulkImporter(coll) as importer:
+            for row in reader:
+                validator.validate(row)
+
+                # Keep validating after the first error, so that every problem
+                # is reported (up to a limit), but stop importing rows that
+                # will be thrown away.
+                if validator.exhausted:
+                    break
+                if validator.errors:
+                    continue
+
+                # Once we reach here, we know that the specified key field must
+                # be present, and either:
+                #   key == "_key"   # noqa: E800
+                #   or key != "_key" and the "_key" field is not present
+                #   or key != "_key" and "_key" is present, but overwrite = True
+                if key != "_key":
+                    row["_key"] = row[key]
+
+                importer.add(row)
+                schema.observe(row)
+
+        validator.finish()
+
+        # Rows that pass validation can still be refused by the database (e.g.,
+        # for keys with illegal characters); the table would be missing them.
+        report = importer.report
+        if report["failed"]:
+            raise ValidationFailed(
+                [RejectedRows(count=report["failed"], errors=first_errors(report))]
+            )
+    except Exception as e:
+        # Don't leave a partially uploaded table behind.
+        db.delete_table(workspace, table)
+
+        if isinstance(e, csv.Error):
+            raise CSVReadError()
+        if isinstance(e, UnicodeDecodeError):
+            raise DecodeFailed(str(e))
+
+        raise
+
+    app.logger.info(summarize(importer.report))
+    db.save_table_schema(workspace, table, schema)
+
+    return {"count": importer.report["created"]}
@@ -1,20 +1,27 @@
 """Multinet uploader for nested JSON files."""
-import json
-from io import StringIO
+from io import TextIOWrapper
 from flasgger import swag_from
 from dataclasses import dataclass
-from collections import OrderedDict
 
-from multinet import db, util
+from multinet import db, jsonstream, util
 from multinet.auth.util import require_writer
-from multinet.errors import ValidationFailed, AlreadyExists
-from multinet.util import decode_data
-from multinet.validation import ValidationFailure
+from multinet.errors import (
+    ValidationFailed,
+    AlreadyExists,
+    DecodeFailed,
+    MalformedRequestBody,
+)
+from multinet.ingest import BulkImporter, IMPORT_SYNC, summarize
+from multinet.schema import TableSchema
+from multinet.validation import ValidationFailure, key_digest
 
 from flask import Blueprint, request
+from flask import current_app as app
+from webargs import fields as webarg_fields
+from webargs.flaskparser import use_kwargs
 
 # Import types
-from typing import Any, List, Sequence
+from typing import Any, Dict, IO, Iterator, List, Optional, Sequence, Set, Tuple
 
 bp = Blueprint("d3_json", __name__)
 bp.before_request(util.require_db)
@@ -40,88 +47,256 @@ class NodeDuplicates(ValidationFailure):
     """Duplicate nodes in a D3 JSON file."""
 
 
+class D3Validator:
+    """
+    Validate the nodes and links of a D3 JSON file one at a time.
+
+    Node IDs are remembered as hashes, so validation needs little memory;
+    each kind of problem is reported once, by `errors()`.
+    """
+
+    def __init__(self) -> None:
+        """Prepare to check a file."""
+        self.has_nodes = False
+        self.has_links = False
+        self.invalid_structure = False
+        self.invalid_link_keys = False
+        self.inconsistent_link_keys = False
+        self.node_duplicates = False
+
+        self.ids: Set[int] = set()
+        self.link_keys: Optional[Set[str]] = None
+
+    def node(self, node: Any) -> bool:
+        """Check the next node, returning whether it is valid."""
+        if not isinstance(node, dict) or "id" not in node:
+            self.invalid_structure = True
+            return False
+
+        digest = key_digest(node["id"])
+        if digest in self.ids:
+            self.node_duplicates = True
+            return False
+
+        self.ids.add(digest)
+        return True
+
+    def link(self, link: Any) -> bool:
+        """Check the next link, returning whether it is valid."""
+        if not isinstance(link, dict):
+            self.invalid_structure = True
+            return False
+
+        # Check that links are in source -> target form
+        valid = True
+        if "source" not in link or "target" not in link:
+            self.invalid_link_keys = True
+            valid = False
+
+        # Check that the keys for each link match
+        if self.link_keys is None:
+            self.link_keys = set(link)
+        elif self.link_keys != link.keys():
+            self.inconsistent_link_keys = True
+            valid = False
+
+        return valid
+
+    def failed(self) -> bool:
+        """Return whether any of the nodes or links checked so far were invalid."""
+        return (
+            self.invalid_structure
+            or self.invalid_link_keys
+            or self.inconsistent_link_keys
+            or self.node_duplicates
+        )
+
+    def errors(self) -> List[ValidationFailure]:
+        """Return the problems found with the file."""
+        data_errors: List[ValidationFailure] = []
+        if self.invalid_structure or not (self.has_nodes and self.has_links):
+            data_errors.append(InvalidStructure())
+        if self.invalid_link_keys:
+            data_errors.append(InvalidLinkKeys())
+        if self.inconsistent_link_keys:
+            data_errors.append(InconsistentLinkKeys())
+        if self.node_duplicates:
+            data_errors.append(NodeDuplicates())
+
+        return data_errors
+
+
 def validate_d3_json(data: dict) -> Sequence[ValidationFailure]:
     """Perform any necessary d3 json validation, and return appropriate errors."""
-    data_errors: List[ValidationFailure] = []
+    validator = D3Validator()
+    validator.has_nodes = "nodes" in data
+    validator.has_links = "links" in data
 
-    # Check the structure of the uploaded file is what we expect
-    if "nodes" not in data.keys() or "links" not in data.keys():
-        data_errors.append(InvalidStructure())
+    for node in data.get("nodes", []):
+        validator.node(node)
+    for link in data.get("links", []):
+        validator.link(link)
 
-    # Check that links are in source -> target form
-    if not all(
-        "source" in row.keys() and "target" in row.keys() for row in data["links"]
-    ):
-        data_errors.append(InvalidLinkKeys())
+    return validator.errors()
 
-    # Check that the keys for each dictionary match
-    if not all(data["links"][0].keys() == row.keys() for row in data["links"]):
-        data_errors.append(InconsistentLinkKeys())
 
-    # Check for duplicated nodes
-    ids = {row["id"] for row in data["nodes"]}
-    if len(data["nodes"]) != len(ids):
-        data_errors.append(NodeDuplicates())
+def read_d3_json(
+    stream: IO[str], validator: D3Validator
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Read the nodes and links of a D3 JSON file, one at a time.
 
-    return data_errors
+    Yields "nodes" or "links" with each element of those arrays, after checking
+    it with `validator`; elements are read as they arrive, so the file is
+    never held in memory.
+    """
+    events = jsonstream.parse(stream)
+    if next(events, None) != ("start_map", None):
+        validator.invalid_structure = True
+        return
+
+    for kind, value in events:
+        if kind == "end_map":
+            return
+
+        event = next(events)
+        if value not in ("nodes", "links") or event[0] != "start_array":
+            jsonstream.skip(event, events)
+            continue
+
+        if value == "nodes":
+            validator.has_nodes = True
+        else:
+            validator.has_links = True
+
+        check = validator.node if value == "nodes" else validator.link
+        for event in events:
+            if event[0] == "end_array":
+                break
+
+            item = jsonstream.build(event, events)
+            if check(item):
+                yield (value, item)
+
+
+def check_d3_json(stream: IO[str]) -> None:
+    """Validate a whole D3 JSON file, raising the problems found with it."""
+    validator = D3Validator()
+    for _ in read_d3_json(stream, validator):
+        pass
+
+    errors = validator.errors()
+    if errors:
+        raise ValidationFailed(errors)
 
 
 @bp.route("/<workspace>/<graph>", methods=["POST"])
+@use_kwargs({"sync": webarg_fields.Bool(location="query")})
 @require_writer
 @swag_from("swagger/d3_json.yaml")
-def upload(workspace: str, graph: str) -> Any:
+def upload(workspace: str, graph: str, sync: Optional[bool] = None) -> Any:
     """Store a d3 json-encoded graph into the database, with node and edge tables.
 
     `workspace` - the target workspace
     `graph` - the target graph
+    `sync` - whether to wait for the data to be synced to disk
     `data` - the json data, passed in the request body. The json data should contain
     nodes: [] and links: []
     """
+    return import_d3_json(workspace, graph, request.stream, sync)
+
+
+def import_d3_json(
+    workspace: str, graph: str, stream: IO[bytes], sync: Optional[bool] = None
+) -> Any:
+    """Import a d3 json-encoded graph from `stream` into a new graph."""
     space = db.get_workspace_db(workspace, readonly=False)
     if space.has_graph(graph):
         raise AlreadyExists("graph", graph)
 
-    # Get data from the request and load it as json
-    body = decode_data(request.data)
-    data = json.load(StringIO(body), object_pairs_hook=OrderedDict)
-
-    # Check file structure
-    errors = validate_d3_json(data)
-    if len(errors) > 0:
-        raise ValidationFailed(errors)
-
     node_table_name = f"{graph}_nodes"
     edge_table_name = f"{graph}_links"
-
-    # Change column names from the d3 format to the arango format
-    nodes = data["nodes"]
-    for node in nodes:
-        node["_key"] = str(node["id"])
-        del node["id"]
-
-    links = data["links"]
-    for link in links:
-        link["_from"] = f"{node_table_name}/{link['source']}"
-        link["_to"] = f"{node_table_name}/{link['target']}"
-        del link["source"]
-        del link["target"]
-
-    # Create or retrieve the workspace
-    if space.has_collection(node_table_name):
-        nodes_coll = space.collection(node_table_name)
-    else:
-        nodes_coll = space.create_collection(node_table_name, edge=False)
-
-    if space.has_collection(edge_table_name):
-        links_coll = space.collection(edge_table_name)
-    else:
-        links_coll = space.create_collection(edge_table_name, edge=True)
-
-    # Insert data
-    nodes_coll.insert_many(nodes, sync=True)
-    links_coll.insert_many(links, sync=True)
-
-    properties = util.get_edge_table_properties(workspace, edge_table_name)
+    names = [("nodes", node_table_name, False), ("links", edge_table_name, True)]
+
+    if sync is None:
+        sync = IMPORT_SYNC
+
+    # Remember which tables are new, so that a failed upload doesn't leave them
+    # behind.
+    created: List[str] = []
+    tables = {}
+    text: IO[str] = TextIOWrapper(stream, encoding="utf8")
+    copy: Optional[IO[str]] = None
+
+    try:
+        # Rows can't be taken back out of tables that are already there, so if
+        # either table is, the whole file is validated (and copied) before
+        # anything is imported; otherwise, it is validated while importing.
+        if any(space.has_collection(name) for _, name, _ in names):
+            copy = text = util.validated_copy(text, check_d3_json)
+
+        for kind, name, edge in names:
+            if space.has_collection(name):
+                tables[kind] = space.collection(name)
+            else:
+                tables[kind] = space.create_collection(name, edge=edge)
+                created.append(name)
+
+        # Nodes and links are imported at the same time, each by its own
+        # importer.
+        importers = {
+            kind: BulkImporter(table, sync=sync) for kind, table in tables.items()
+        }
+        schemas = {kind: TableSchema() for kind in tables}
+        validator = D3Validator()
+        edge_tables = util.EdgeTableTracker()
+
+        with importers["nodes"], importers["links"]:
+            for kind, item in read_d3_json(text, validator):
+                # Keep validating after the first error, so that every kind of
+                # problem is reported, but stop importing.
+                if validator.failed():
+                    continue
+
+                # Change column names from the d3 format to the arango format
+                if kind == "nodes":
+                    item["_key"] = str(item.pop("id"))
+                else:
+                    item["_from"] = f"{node_table_name}/{item.pop('source')}"
+                    item["_to"] = f"{node_table_name}/{item.pop('target')}"
+
+                importers[kind].add(item)
+                schemas[kind].observe(item)
+                if kind == "links":
+                    edge_tables.observe(item)
+
+            # Check file structure
+            errors = validator.errors()
+            if errors:
+                raise ValidationFailed(errors)
+    except Exception as e:
+        for name in created:
+            db.delete_table(workspace, name)
+
+        if isinstance(e, UnicodeDecodeError):
+            raise DecodeFailed(str(e))
+        if isinstance(e, jsonstream.JSONStreamError):
+            raise MalformedRequestBody(str(e))
+
+        raise
+    finally:
+        if copy is not None:
+            copy.close()
+
+    for kind, importer in importers.items():
+        app.logger.info(summarize(importer.report))
+
+    db.save_table_schema(workspace, node_table_name, schemas["nodes"])
+    db.save_table_schema(workspace, edge_table_name, schemas["links"])
+
+    properties = util.uploaded_edge_table_properties(
+        workspace, edge_table_name, edge_tables, edge_table_name in created
+    )
 
     db.create_graph(
         workspace,
@@ -131,4 +306,4 @@ def upload(workspace: str, graph: str) -> Any:
         properties["to_tables"],
     )
 
-    return {"nodecount": len(nodes), "edgecount": len(links)}
+    return {"nodecount": schemas["nodes"].rows, "edgecount": schemas["links"].rows}
@@ -1,7 +1,7 @@
 """Multinet uploader for multi-part uploaded files."""
-from base64 import b64encode
-
-from multinet import db, util
+from multinet import spool, util
+from multinet.auth.util import require_login, require_writer
+from multinet.uploaders import csv, d3_json, nested_json, newick
 
 from flasgger import swag_from
 from flask import Blueprint, request
@@ -11,38 +11,96 @@ from webargs.flaskparser import use_kwargs
 # Import types
 from typing import Any
 
-from multinet.errors import RequiredParamsMissing
+from multinet.errors import BadQueryArgument, RequiredParamsMissing
 
 bp = Blueprint("uploads", __name__)
 bp.before_request(util.require_db)
 
+# The importers that a finished upload can be fed into, other than CSV (which
+# also takes the key field and overwrite flag).
+graph_importers = {
+    "d3_json": d3_json.import_d3_json,
+    "nested_json": nested_json.import_nested_json,
+    "newick": newick.import_newick,
+}
+upload_types = ["csv", *graph_importers]
+
 
 @bp.route("", methods=["POST"])
+@require_login
 @swag_from("swagger/create_upload.yaml")
 def create_upload() -> str:
-    """Create a collection for multipart upload."""
-    return db.create_upload_collection()
+    """Create a spool directory for multipart upload."""
+    return spool.create_upload()
 
 
 @bp.route("/<upload_id>/chunk", methods=["POST"])
-@use_kwargs({"sequence": fields.Str(required=True)})
+@use_kwargs({"sequence": fields.Int(required=True)})
+@require_login
 @swag_from("swagger/chunk_upload.yaml")
-def chunk_upload(upload_id: str, sequence: str) -> Any:
-    """Upload a chunk to the specified collection."""
+def chunk_upload(upload_id: str, sequence: int) -> Any:
+    """Upload a chunk to the specified upload."""
     chunk = dict(request.files).get("chunk")
 
     if chunk is None:
         raise RequiredParamsMissing(["chunk"])
 
-    # convert bytes to base64 string since arango doesn't support binary blobs
-    stringified_blob = b64encode(chunk.read()).decode("ascii")
+    if sequence < 0:
+        raise BadQueryArgument("sequence", str(sequence), ["non-negative integers"])
+
+    spool.write_chunk(upload_id, sequence, chunk.stream)
+    return str(sequence)
+
+
+@bp.route("/<upload_id>/finalize", methods=["POST"])
+@use_kwargs(
+    {
+        "workspace": fields.Str(required=True, location="query"),
+        "type": fields.Str(required=True, location="query"),
+        "name": fields.Str(required=True, location="query"),
+        "key": fields.Str(location="query"),
+        "overwrite": fields.Bool(location="query"),
+    }
+)
+@require_writer
+@swag_from("swagger/finalize_upload.yaml")
+def finalize_upload(
+    workspace: str,
+    upload_id: str,
+    type: str,
+    name: str,
+    key: str = "_key",
+    overwrite: bool = False,
+) -> Any:
+    """
+    Import a finished upload into a workspace, then delete the upload.
+
+    `workspace` - the target workspace
+    `upload_id` - the upload to import
+    `type` - the format of the uploaded file (csv, d3_json, nested_json or newick)
+    `name` - the table (for CSV files) or graph to create
+    `key`, `overwrite` - as for CSV uploads
+    """
+    if type not in upload_types:
+        raise BadQueryArgument("type", type, upload_types)
+
+    # The chunks are read from disk one after another as the importer consumes
+    # them; they're only deleted once the import succeeds, so a failed import
+    # can be retried.
+    with spool.open_upload(upload_id) as stream:
+        if type == "csv":
+            result = csv.import_csv(workspace, name, stream, key, overwrite)
+        else:
+            result = graph_importers[type](workspace, name, stream)
 
-    db.insert_file_chunk(upload_id, sequence, stringified_blob)
-    return sequence
+    spool.delete_upload(upload_id)
+    return result
 
 
 @bp.route("/<upload_id>", methods=["DELETE"])
+@require_login
 @swag_from("swagger/delete_upload_collection.yaml")
 def delete_upload_collection(upload_id: str) -> Any:
-    """Delete the database collection associated with the given upload_id."""
-    return db.delete_upload_collection(upload_id)
+    """Delete the chunks stored for the given upload_id."""
+    spool.delete_upload(upload_id)
+    return upload_id
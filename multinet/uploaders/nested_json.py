@@ -1,78 +1,127 @@
 """Multinet uploader for nested JSON files."""
+from contextlib import ExitStack
 from flasgger import swag_from
+from io import TextIOWrapper
 import itertools
-import json
 
-from multinet import db, util
+from multinet import db, jsonstream, util
 from multinet.auth.util import require_writer
-from multinet.errors import AlreadyExists
+from multinet.errors import AlreadyExists, DecodeFailed, MalformedRequestBody
+from multinet.ingest import BulkImporter, summarize
+from multinet.schema import TableSchema
 
 from flask import Blueprint, request
+from flask import current_app as app
 
-from typing import Tuple, List, Any
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
 
 bp = Blueprint("nested_json", __name__)
 bp.before_request(util.require_db)
 
 
-def analyze_nested_json(
-    raw_data: str, int_table_name: str, leaf_table_name: str
-) -> Tuple[List[List[dict]], List[dict]]:
-    """
-    Transform nested JSON data into MultiNet format.
+class Subtree:
+    """A subtree of a nested_json file that is still being read."""
 
-    `data` - the text of a nested_json file
-    `(nodes, edges)` - a node and edge table describing the tree.
-    """
-    ident = itertools.count(100)
-    data = json.loads(raw_data)
+    def __init__(self) -> None:
+        """Initialize an empty subtree."""
+        self.key: Optional[str] = None
+        self.node: Dict[str, Any] = {}
+        self.edge: Dict[str, Any] = {}
+        self.has_children = False
+        self.in_children = False
 
-    def keyed(rec: dict) -> dict:
-        if "_key" in rec:
-            return rec
+        # Edges to this subtree's children, which are waiting for its key
+        # (i.e., when its `node_data` comes after its `children`).
+        self.pending: List[Dict[str, Any]] = []
 
-        rec["_key"] = str(next(ident))
-
-        return rec
 
-    # The helper function will collect nodes and edges into these two lists.
-    nodes: List[List[dict]] = [[], []]
-    edges = []
-
-    def helper(tree: dict) -> None:
-        # Grab the root node of the subtree, and the child nodes.
-        root = keyed(tree.get("node_data", {}))
-        children = tree.get("children", [])
+def read_nested_json(
+    stream: IO[str], int_table_name: str, leaf_table_name: str, edge_table_name: str
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Transform nested JSON data into MultiNet format, as it is read.
 
-        # Capture the root node into one of two tables.
-        if children:
-            nodes[0].append(root)
-        else:
-            nodes[1].append(root)
+    `stream` - the text of a nested_json file
+    Yields the table name and contents of each node and edge describing the tree.
 
-        # Capture edges for each child.
-        for child in children:
-            # Grab the child data.
-            child_data = keyed(child.get("node_data", {}))
+    Each subtree is tracked on an explicit stack while it is open, so neither
+    the depth nor the size of the tree is limited by the recursion limit or by
+    memory; nodes and edges are produced as soon as their subtrees end.
+    """
+    ident = itertools.count(100)
+    events = jsonstream.parse(stream)
 
-            # Determine which table the child is in.
-            child_table_name = (
-                int_table_name if child.get("children") else leaf_table_name
-            )
+    def keyed(rec: Any) -> Dict[str, Any]:
+        if not isinstance(rec, dict):
+            raise MalformedRequestBody("node_data must be an object")
 
-            # Record the edge record.
-            edge = dict(child.get("edge_data", {}))
-            edge["_from"] = f'{child_table_name}/{child_data["_key"]}'
-            edge["_to"] = f'{int_table_name}/{root["_key"]}'
-            edges.append(edge)
+        if "_key" not in rec:
+            rec["_key"] = str(next(ident))
 
-        # Recursively add the child subtrees.
-        for child in children:
-            helper(child)
+        return rec
 
-    # Kick off the analysis.
-    helper(data)
-    return (nodes, edges)
+    def to_parent(edge: Dict[str, Any], key: str) -> Dict[str, Any]:
+        edge["_to"] = f"{int_table_name}/{key}"
+        return edge
+
+    if next(events, None) != ("start_map", None):
+        raise MalformedRequestBody("A nested_json tree must be an object")
+
+    stack = [Subtree()]
+    for kind, value in events:
+        tree = stack[-1]
+
+        if tree.in_children:
+            if kind == "start_map":
+                tree.has_children = True
+                stack.append(Subtree())
+            elif kind == "end_array":
+                tree.in_children = False
+            else:
+                raise MalformedRequestBody("Each child must be an object")
+
+        elif kind == "map_key":
+            event = next(events)
+            if value == "node_data":
+                tree.node = keyed(jsonstream.build(event, events))
+                tree.key = tree.node["_key"]
+                for edge in tree.pending:
+                    yield (edge_table_name, to_parent(edge, tree.node["_key"]))
+                tree.pending = []
+            elif value == "edge_data":
+                tree.edge = dict(jsonstream.build(event, events))
+            elif value == "children" and event[0] == "start_array":
+                tree.in_children = True
+            else:
+                jsonstream.skip(event, events)
+
+        elif kind == "end_map":
+            stack.pop()
+            if tree.key is None:
+                tree.key = keyed(tree.node)["_key"]
+                for edge in tree.pending:
+                    yield (edge_table_name, to_parent(edge, tree.key))
+
+            # Capture the node into one of two tables.
+            table_name = int_table_name if tree.has_children else leaf_table_name
+            yield (table_name, tree.node)
+
+            if stack:
+                # Record the edge to this subtree from its parent.
+                edge = tree.edge
+                edge["_from"] = f"{table_name}/{tree.key}"
+
+                parent = stack[-1]
+                if parent.key is None:
+                    parent.pending.append(edge)
+                else:
+                    yield (edge_table_name, to_parent(edge, parent.key))
+
+
+def check_nested_json(stream: IO[str]) -> None:
+    """Read a whole nested_json file, raising the first problem found with it."""
+    for _ in read_nested_json(stream, "internal", "leaf", "edges"):
+        pass
 
 
 @bp.route("/<workspace>/<graph>", methods=["POST"])
@@ -86,43 +135,85 @@ def upload(workspace: str, graph: str) -> Any:
     `graph` - the target graph.
     `data` - the nested_json data, passed in the request body.
     """
+    return import_nested_json(workspace, graph, request.stream)
+
+
+def import_nested_json(workspace: str, graph: str, stream: IO[bytes]) -> Any:
+    """Import a nested_json tree from `stream` into a new graph."""
     space = db.get_workspace_db(workspace, readonly=False)
     if space.has_graph(graph):
         raise AlreadyExists("graph", graph)
 
-    # Set up the parameters.
-    data = request.data.decode("utf8")
-
     edgetable_name = f"{graph}_edges"
     int_nodetable_name = f"{graph}_internal_nodes"
     leaf_nodetable_name = f"{graph}_leaf_nodes"
 
-    # Set up the database targets.
-    if space.has_collection(edgetable_name):
-        edgetable = space.collection(edgetable_name)
-    else:
-        edgetable = space.create_collection(edgetable_name, edge=True)
-
-    if space.has_collection(int_nodetable_name):
-        int_nodetable = space.collection(int_nodetable_name)
-    else:
-        int_nodetable = space.create_collection(int_nodetable_name)
-
-    if space.has_collection(leaf_nodetable_name):
-        leaf_nodetable = space.collection(leaf_nodetable_name)
-    else:
-        leaf_nodetable = space.create_collection(leaf_nodetable_name)
-
-    # Analyze the nested_json data into a node and edge table.
-    (nodes, edges) = analyze_nested_json(data, int_nodetable_name, leaf_nodetable_name)
-
-    # Upload the data to the database.
-    edgetable.insert_many(edges)
-    int_nodetable.insert_many(nodes[0])
-    leaf_nodetable.insert_many(nodes[1])
+    names = [
+        (edgetable_name, True),
+        (int_nodetable_name, False),
+        (leaf_nodetable_name, False),
+    ]
+
+    # Remember which tables are new, so that a failed upload doesn't leave them
+    # behind.
+    created: List[str] = []
+    tables = {}
+    text: IO[str] = TextIOWrapper(stream, encoding="utf8")
+    copy: Optional[IO[str]] = None
+
+    try:
+        # As with d3 json uploads, if any table is already there, the whole
+        # file is read (and copied) before anything is imported.
+        if any(space.has_collection(name) for name, _ in names):
+            copy = text = util.validated_copy(text, check_nested_json)
+
+        # Set up the database targets.
+        for name, edge in names:
+            if space.has_collection(name):
+                tables[name] = space.collection(name)
+            else:
+                tables[name] = space.create_collection(name, edge=edge)
+                created.append(name)
+
+        importers = {name: BulkImporter(table) for name, table in tables.items()}
+        schemas = {name: TableSchema() for name in tables}
+        edge_tables = util.EdgeTableTracker()
+
+        # Analyze the nested_json data into node and edge tables, uploading
+        # them to the database as they are produced.
+        with ExitStack() as stack:
+            for importer in importers.values():
+                stack.enter_context(importer)
+
+            for name, document in read_nested_json(
+                text, int_nodetable_name, leaf_nodetable_name, edgetable_name
+            ):
+                importers[name].add(document)
+                schemas[name].observe(document)
+                if name == edgetable_name:
+                    edge_tables.observe(document)
+    except Exception as e:
+        for name in created:
+            db.delete_table(workspace, name)
+
+        if isinstance(e, UnicodeDecodeError):
+            raise DecodeFailed(str(e))
+        if isinstance(e, jsonstream.JSONStreamError):
+            raise MalformedRequestBody(str(e))
+
+        raise
+    finally:
+        if copy is not None:
+            copy.close()
+
+    for name, importer in importers.items():
+        app.logger.info(summarize(importer.report))
+        db.save_table_schema(workspace, name, schemas[name])
 
     # Create graph
-    edge_table_info = util.get_edge_table_properties(workspace, edgetable_name)
+    edge_table_info = util.uploaded_edge_table_properties(
+        workspace, edgetable_name, edge_tables, edgetable_name in created
+    )
     db.create_graph(
         workspace,
         graph,
@@ -132,7 +223,7 @@ def upload(workspace: str, graph: str) -> Any:
     )
 
     return {
-        "edgecount": len(edges),
-        "int_nodecount": len(nodes[0]),
-        "leaf_nodecount": len(nodes[1]),
+        "edgecount": schemas[edgetable_name].rows,
+        "int_nodecount": schemas[int_nodetable_name].rows,
+        "leaf_nodecount": schemas[leaf_nodetable_name].rows,
     }
@@ -1,11 +1,12 @@
 """Multinet uploader for Newick tree files."""
 from flasgger import swag_from
+import re
 import uuid
-import newick
 
 from multinet import db, util
 from multinet.auth.util import require_writer
 from multinet.errors import ValidationFailed, AlreadyExists
+from multinet.ingest import import_documents, summarize
 from multinet.util import decode_data
 from multinet.validation import ValidationFailure, DuplicateKey
 
@@ -13,7 +14,7 @@ from dataclasses import dataclass
 from flask import Blueprint, request
 from flask import current_app as app
 
-from typing import Any, Optional, List, Set, Tuple
+from typing import Any, Dict, IO, Iterator, List, Set, Tuple
 
 bp = Blueprint("newick", __name__)
 bp.before_request(util.require_db)
@@ -25,41 +26,140 @@ class DuplicateEdge(ValidationFailure):
 
     _from: str
     _to: str
-    length: int
+    length: float
 
 
-def validate_newick(tree: List[newick.Node]) -> None:
-    """Validate newick tree."""
-    data_errors: List[ValidationFailure] = []
-    unique_keys: Set[str] = set()
-    unique_edges: Set[Tuple[str, str, float]] = set()
+@dataclass
+class InvalidNewick(ValidationFailure):
+    """A Newick file that can't be read, e.g. due to unbalanced parentheses."""
+
+    detail: str
+
 
-    def read_tree(parent: Optional[str], node: newick.Node) -> None:
-        key = node.name or uuid.uuid4().hex
+class NewickValidator:
+    """Check the nodes and edges of a tree for duplicates, as they are read."""
 
-        if key in unique_keys:
-            data_errors.append(DuplicateKey(key=key))
-        else:
-            unique_keys.add(key)
+    def __init__(self) -> None:
+        """Prepare to check a tree."""
+        self.errors: List[ValidationFailure] = []
+        self.keys: Set[str] = set()
+        self.edges: Set[Tuple[str, str, float]] = set()
 
-        for desc in node.descendants:
-            read_tree(key, desc)
+    def node(self, key: str) -> bool:
+        """Check a node, returning whether it is new."""
+        if key in self.keys:
+            self.errors.append(DuplicateKey(key=key))
+            return False
 
-        if parent:
-            unique = (parent, key, node.length)
-            if unique in unique_edges:
-                data_errors.append(
-                    DuplicateEdge(
-                        _from=f"table/{parent}", _to=f"table/{key}", length=node.length
-                    )
+        self.keys.add(key)
+        return True
+
+    def edge(self, parent: str, key: str, length: float) -> bool:
+        """Check an edge, returning whether it is new."""
+        unique = (parent, key, length)
+        if unique in self.edges:
+            self.errors.append(
+                DuplicateEdge(
+                    _from=f"table/{parent}", _to=f"table/{key}", length=length
                 )
-            else:
-                unique_edges.add(unique)
+            )
+            return False
+
+        self.edges.add(unique)
+        return True
 
-    read_tree(None, tree[0])
+    def finish(self) -> None:
+        """Raise the problems found with the tree, if there were any."""
+        if self.errors:
+            raise ValidationFailed(self.errors)
 
-    if len(data_errors) > 0:
-        raise ValidationFailed(data_errors)
+
+# A comment, a punctuation mark, or (part of) a node label.
+newick_token = re.compile(r"\[[^\]]*\]|[(),;]|[^(),;\[\]]+")
+
+
+def read_label(label: str) -> Tuple[str, float]:
+    """Return the key (the name, or a random key) and branch length in `label`."""
+    name, _, length = label.partition(":")
+    try:
+        return (name.strip() or uuid.uuid4().hex, float(length) if length else 0.0)
+    except ValueError:
+        raise ValidationFailed([InvalidNewick(detail=f"Bad branch length: {label}")])
+
+
+def read_newick(text: str) -> Iterator[Tuple[str, List[Tuple[str, float]]]]:
+    """
+    Read the first tree in Newick text, yielding each node after its children.
+
+    Each node is yielded as its key, and the keys and branch lengths of its
+    children. The text is scanned once, keeping an explicit stack of the
+    subtrees that are still open, so trees of any depth can be read.
+    """
+    open_subtrees: List[List[Tuple[str, float]]] = []
+    children: List[Tuple[str, float]] = []
+    label: List[str] = []
+    started = False
+
+    for match in newick_token.finditer(text):
+        token = match.group()
+        if token.startswith("["):
+            continue
+
+        if token not in ("(", ")", ",", ";"):
+            label.append(token)
+            continue
+
+        if token == "(":
+            open_subtrees.append([])
+            label = []
+            started = True
+            continue
+
+        # Any other punctuation ends the node being read.
+        key, length = read_label("".join(label))
+        yield key, children
+        label, children = [], []
+
+        if not open_subtrees:
+            if token != ";":
+                raise ValidationFailed([InvalidNewick(detail="Unbalanced parentheses")])
+            return
+
+        open_subtrees[-1].append((key, length))
+        if token == ")":
+            children = open_subtrees.pop()
+
+    # The text ended without a semicolon.
+    if open_subtrees:
+        raise ValidationFailed([InvalidNewick(detail="Unbalanced parentheses")])
+    if not started and not "".join(label).strip():
+        raise ValidationFailed([InvalidNewick(detail="No tree found")])
+
+    yield read_label("".join(label))[0], children
+
+
+def newick_tables(text: str, nodetable_name: str) -> Tuple[List[Dict], List[Dict]]:
+    """Validate a Newick tree, and return its node and edge tables."""
+    validator = NewickValidator()
+    nodes: List[Dict] = []
+    edges: List[Dict] = []
+
+    for key, children in read_newick(text):
+        if validator.node(key):
+            nodes.append({"_key": key})
+
+        for child, length in children:
+            if validator.edge(key, child, length):
+                edges.append(
+                    {
+                        "_from": f"{nodetable_name}/{key}",
+                        "_to": f"{nodetable_name}/{child}",
+                        "length": length,
+                    }
+                )
+
+    validator.finish()
+    return (nodes, edges)
 
 
 @bp.route("/<workspace>/<graph>", methods=["POST"])
@@ -73,20 +173,26 @@ def upload(workspace: str, graph: str) -> Any:
     `graph` - the target graph.
     `data` - the newick data, passed in the request body.
     """
+    return import_newick(workspace, graph, request.stream)
+
+
+def import_newick(workspace: str, graph: str, stream: IO[bytes]) -> Any:
+    """Import a newick tree from `stream` into a new graph."""
     app.logger.info("newick tree")
 
     space = db.get_workspace_db(workspace, readonly=False)
     if space.has_graph(graph):
         raise AlreadyExists("graph", graph)
 
-    body = decode_data(request.data)
-    tree = newick.loads(body)
-    validate_newick(tree)
+    body = decode_data(stream.read())
 
     edgetable_name = f"{graph}_edges"
     nodetable_name = f"{graph}_nodes"
 
-    if space.has_collection(edgetable_name):
+    nodes, edges = newick_tables(body, nodetable_name)
+
+    new_edgetable = not space.has_collection(edgetable_name)
+    if not new_edgetable:
         edgetable = space.collection(edgetable_name)
     else:
         # Note that edge=True must be set or the _from and _to keys
@@ -98,30 +204,23 @@ def upload(workspace: str, graph: str) -> Any:
     else:
         nodetable = space.create_collection(nodetable_name)
 
-    edgecount = 0
-    nodecount = 0
-
-    def read_tree(parent: Optional[str], node: newick.Node) -> None:
-        nonlocal nodecount
-        nonlocal edgecount
-        key = node.name or uuid.uuid4().hex
-        if not nodetable.has(key):
-            nodetable.insert({"_key": key})
-        nodecount = nodecount + 1
-        for desc in node.descendants:
-            read_tree(key, desc)
-        if parent:
-            edgetable.insert(
-                {
-                    "_from": "%s/%s" % (nodetable_name, parent),
-                    "_to": "%s/%s" % (nodetable_name, key),
-                    "length": node.length,
-                }
-            )
-            edgecount += 1
+    # Nodes that are already in the table are left as they are.
+    for report in (
+        import_documents(nodetable, nodes, on_duplicate="ignore"),
+        import_documents(edgetable, edges),
+    ):
+        app.logger.info(summarize(report))
+
+    db.record_table_schema(workspace, nodetable_name, nodes)
+    db.record_table_schema(workspace, edgetable_name, edges)
 
-    read_tree(None, tree[0])
-    edge_table_info = util.get_edge_table_properties(workspace, edgetable_name)
+    edge_tables = util.EdgeTableTracker()
+    for edge in edges:
+        edge_tables.observe(edge)
+
+    edge_table_info = util.uploaded_edge_table_properties(
+        workspace, edgetable_name, edge_tables, new_edgetable
+    )
     db.create_graph(
         workspace,
         graph,
@@ -130,4 +229,4 @@ def upload(workspace: str, graph: str) -> Any:
         edge_table_info["to_tables"],
     )
 
-    return {"edgecount": edgecount, "nodecount": nodecount}
+    return {"edgecount": len(edges), "nodecount": len(nodes)}
@@ -1,13 +1,16 @@
 """User data and functions."""
 
 import dataclasses
+import os
 from uuid import uuid4
 from arango.collection import StandardCollection
 from arango.cursor import Cursor
 from dacite import from_dict
 from flask import session
 
-from multinet.db import db, read_only_db, _run_aql_query
+from multinet.cache import TTLCache
+from multinet.context import request_cache
+from multinet.db import read_only_db, system_collection, _run_aql_query
 from multinet.errors import InternalServerError
 from multinet.auth.types import (
     GoogleUserInfo,
@@ -21,15 +24,17 @@ from typing import Optional, Dict
 
 MULTINET_COOKIE = "multinet-token"
 
+# Maps session cookies to the users they belong to, so that authenticated
+# requests don't need to look the user up each time. Logging out in this
+# process removes the entry immediately; other processes notice within the TTL.
+sessions: TTLCache[str, User] = TTLCache(
+    ttl=float(os.environ.get("SESSION_CACHE_TTL", "10"))
+)
+
 
 def user_collection() -> StandardCollection:
     """Return the collection that contains user documents."""
-    sysdb = db("_system")
-
-    if not sysdb.has_collection("users"):
-        sysdb.create_collection("users")
-
-    return sysdb.collection("users")
+    return system_collection("users")
 
 
 def user_exists(userinfo: UserInfo) -> bool:
@@ -70,8 +75,15 @@ def register_user(userinfo: UserInfo) -> User:
     return from_dict(User, next(coll.find(inserted_info, limit=1)))
 
 
+def forget_session(user: User) -> None:
+    """Drop the cached session of `user`, if there is one."""
+    if user.multinet.session is not None:
+        sessions.pop(user.multinet.session)
+
+
 def set_user_cookie(user: User) -> User:
     """Update the user cookie."""
+    forget_session(user)
     new_user = copy_user(user)
 
     new_cookie = uuid4().hex
@@ -82,6 +94,7 @@ def set_user_cookie(user: User) -> User:
 
 def delete_user_cookie(user: User) -> User:
     """Delete the user cookie."""
+    forget_session(user)
     user_copy = copy_user(user)
 
     # Remove the session object from the user record, then persist that to the
@@ -92,21 +105,32 @@ def delete_user_cookie(user: User) -> User:
 
 def user_from_cookie(cookie: str) -> Optional[User]:
     """Use provided cookie to load a user, return None if they dont exist."""
+    user = sessions.get(cookie)
+    if user is not None:
+        return user
+
     coll = user_collection()
 
     try:
-        return from_dict(User, next(coll.find({"multinet.session": cookie}, limit=1)))
+        user = from_dict(User, next(coll.find({"multinet.session": cookie}, limit=1)))
     except StopIteration:
         return None
 
+    sessions.set(cookie, user)
+    return user
+
 
 def current_user() -> Optional[User]:
     """Return the logged in user (if any) from the current session."""
+    cache = request_cache("user")
+    if "user" in cache:
+        return cache["user"]
+
     cookie = session.get(MULTINET_COOKIE)
-    if cookie is None:
-        return None
+    user = None if cookie is None else user_from_cookie(cookie)
 
-    return user_from_cookie(cookie)
+    cache["user"] = user
+    return user
 
 
 def get_user_cookie(user: User) -> str:
@@ -1,13 +1,15 @@
 """Utility functions."""
 import os
 import json
+import shutil
+import tempfile
 
 from functools import lru_cache
 from uuid import uuid1, uuid4
 from flask import Response
-from typing import Any, Generator, Dict, Set, Iterable
+from typing import Any, Callable, Generator, Dict, IO, Set, Iterable, cast
 
-from multinet import db
+from multinet import db, queries
 from multinet.types import EdgeTableProperties
 from multinet.errors import DatabaseNotLive, DecodeFailed
 
@@ -26,40 +28,67 @@ def generate_filtered_docs(rows: Iterable[Dict]) -> Generator[Dict, None, None]:
         yield filter_unwanted_keys(row)
 
 
+class EdgeTableTracker:
+    """
+    Gather the properties of an edge table from its edges, as they are added.
+
+    Uploaders feed each edge they import through `observe()`, so the tables
+    for a new graph are known without reading the edges back. Only the table
+    names are kept, so the memory used doesn't grow with the number of edges.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty properties."""
+        self.from_tables: Set[str] = set()
+        self.to_tables: Set[str] = set()
+
+    def observe(self, edge: Dict) -> None:
+        """Account for one edge of the table."""
+        self.from_tables.add(edge["_from"].partition("/")[0])
+        self.to_tables.add(edge["_to"].partition("/")[0])
+
+    def properties(self) -> EdgeTableProperties:
+        """Return the properties of the edges seen so far."""
+        return {"from_tables": self.from_tables, "to_tables": self.to_tables}
+
+
 def get_edge_table_properties(workspace: str, edge_table: str) -> EdgeTableProperties:
     """
     Return extracted information about an edge table.
 
-    Extracts 3 pieces of data from an edge table.
+    Extracts 2 pieces of data from an edge table.
 
-    table_keys: A mapping of all referenced tables to their respective referenced keys.
     from_tables: A set containing the tables referenced in the _from column.
     to_tables: A set containing the tables referenced in the _to column.
-    """
-
-    loaded_workspace = db.get_workspace_db(workspace)
-    edges = loaded_workspace.collection(edge_table).all()
 
-    tables_to_keys: Dict[str, Set[str]] = {}
+    The edges are aggregated by the database, rather than read back here.
+    """
     from_tables = set()
     to_tables = set()
 
-    for edge in edges:
-        from_node, to_node = edge["_from"].split("/"), edge["_to"].split("/")
-        from_tables.add(from_node[0])
-        to_tables.add(to_node[0])
+    for row in db.run_query(workspace, queries.edge_table_references(edge_table)):
+        table = row["table"]
+        if row["column"] == "_from":
+            from_tables.add(table)
+        else:
+            to_tables.add(table)
+
+    return {"from_tables": from_tables, "to_tables": to_tables}
+
 
-        for table, key in (from_node, to_node):
-            if table in tables_to_keys:
-                tables_to_keys[table].add(key)
-            else:
-                tables_to_keys[table] = {key}
+def uploaded_edge_table_properties(
+    workspace: str, edge_table: str, tracker: EdgeTableTracker, created: bool
+) -> EdgeTableProperties:
+    """
+    Return the properties of an edge table that edges were just uploaded to.
+
+    If the upload `created` the table, `tracker` has seen every edge in it;
+    otherwise the table's earlier edges are aggregated by the database.
+    """
+    if created:
+        return tracker.properties()
 
-    return {
-        "table_keys": tables_to_keys,
-        "from_tables": from_tables,
-        "to_tables": to_tables,
-    }
+    return get_edge_table_properties(workspace, edge_table)
 
 
 def generate(iterator: Iterable[Any]) -> Generator[str, None, None]:
@@ -95,6 +124,38 @@ def decode_data(data: bytes) -> str:
     return body
 
 
+class _Tee:
+    """A readable stream that copies whatever is read from it to another."""
+
+    def __init__(self, source: IO[str], copy: IO[str]):
+        self.source = source
+        self.copy = copy
+
+    def read(self, size: int = -1) -> str:
+        text = self.source.read(size)
+        self.copy.write(text)
+        return text
+
+
+def validated_copy(stream: IO[str], validate: Callable[[IO[str]], None]) -> IO[str]:
+    """
+    Validate all of the text in `stream`, and return a copy of it to read again.
+
+    The text is copied to a temporary file as `validate` reads it, so it is never
+    held in memory. The copy is returned rewound, and should be closed once read.
+    """
+    copy = tempfile.TemporaryFile("w+", encoding="utf8")
+    try:
+        validate(cast(IO[str], _Tee(stream, copy)))
+        shutil.copyfileobj(stream, copy)
+    except BaseException:
+        copy.close()
+        raise
+
+    copy.seek(0)
+    return copy
+
+
 def data_path(file_name: str) -> str:
     """Load data from the test directory."""
     file_path = os.path.join(TEST_DATA_DIR, file_name)
@@ -1,5 +1,6 @@
 """Validation errors for various multinet processes."""
-from typing import List, Dict
+import hashlib
+from typing import Any, List, Dict
 from dataclasses import dataclass, asdict
 
 
@@ -40,3 +41,30 @@ class DuplicateKey(ValidationFailure):
     """Duplicate key detected when trying to create a table."""
 
     key: str
+
+
+@dataclass
+class RejectedRows(ValidationFailure):
+    """Rows that the database refused to import, with its first error messages."""
+
+    count: int
+    errors: List[str]
+
+
+@dataclass
+class TooManyErrors(ValidationFailure):
+    """Validation stopped after finding the maximum number of errors."""
+
+    limit: int
+
+
+def key_digest(key: Any) -> int:
+    """
+    Return a 64-bit hash of `key`, for detecting duplicate keys.
+
+    Storing these rather than the keys themselves keeps the memory used by
+    validation small and independent of key length; the chance of two distinct
+    keys colliding is negligible (about 1 in 10**7 for a million keys).
+    """
+    encoded = str(key).encode("utf8")
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "big")
@@ -1,11 +1,21 @@
 """Utilities for validating tabular data for upload to Multinet."""
 
 from dataclasses import dataclass
+import os
 import re
-from typing import Set, MutableMapping, Sequence, List
+from typing import Iterable, Set, MutableMapping, Optional, Sequence, List
 
 from multinet.errors import ValidationFailed
-from multinet.validation import ValidationFailure, DuplicateKey, UnsupportedTable
+from multinet.validation import (
+    ValidationFailure,
+    DuplicateKey,
+    TooManyErrors,
+    UnsupportedTable,
+    key_digest,
+)
+
+# How many problems to report before giving up on a file.
+CSV_MAX_ERRORS = int(os.environ.get("CSV_MAX_ERRORS", "100"))
 
 
 @dataclass
@@ -34,77 +44,122 @@ class MissingBody(ValidationFailure):
     """Missing body in a CSV file."""
 
 
-def is_edge_table(rows: Sequence[MutableMapping]) -> bool:
-    """Determine if this table should be treated as an edge table."""
-    fieldnames = rows[0].keys()
-    return "_from" in fieldnames and "_to" in fieldnames
+# Checks that a cell has the form table_name/key
+valid_cell = re.compile("[^/]+/[^/]+")
 
 
-def is_node_table(rows: Sequence[MutableMapping], key_field: str) -> bool:
-    """Determine if this table should be treated as a node table."""
-    fieldnames = rows[0].keys()
-    return key_field != "_key" or "_key" in fieldnames
+class CSVValidator:
+    """
+    Validate a CSV file one row at a time.
 
+    Problems with the header (which decides whether the file is a node or an
+    edge table) are raised as soon as the validator is created; problems with
+    individual rows are collected, and raised by `finish()`. Once `max_errors`
+    problems have been found, a `TooManyErrors` is added and the validator is
+    `exhausted`: later rows are only counted.
+    """
 
-def validate_edge_table(rows: Sequence[MutableMapping]) -> None:
-    """Validate that the given table is a valid edge table."""
-    data_errors: List[ValidationFailure] = []
+    def __init__(
+        self,
+        fieldnames: Optional[Sequence[str]],
+        key_field: str,
+        overwrite: bool,
+        max_errors: int = CSV_MAX_ERRORS,
+    ):
+        """Check the header of the file, and prepare to check its rows."""
+        if not fieldnames:
+            raise ValidationFailed([MissingBody()])
 
-    # Checks that a cell has the form table_name/key
-    valid_cell = re.compile("[^/]+/[^/]+")
+        self.max_errors = max_errors
+        self.errors: List[ValidationFailure] = []
+        self.exhausted = False
+        self.rows = 0
+        self.keys: Set[int] = set()
 
-    for i, row in enumerate(rows):
-        fields: List[str] = []
-        if not valid_cell.match(row["_from"]):
-            fields.append("_from")
-        if not valid_cell.match(row["_to"]):
-            fields.append("_to")
+        self.edges = "_from" in fieldnames and "_to" in fieldnames
 
-        if fields:
-            # i+2 -> +1 for index offset, +1 due to header row
-            data_errors.append(InvalidRow(fields=fields, row=i + 2))
+        # Edge tables don't need keys, but any they do have must be unique.
+        self.key_field: Optional[str] = key_field
+        if self.edges:
+            if key_field not in fieldnames:
+                self.key_field = None
+            return
 
-    if len(data_errors) > 0:
-        raise ValidationFailed(data_errors)
+        if key_field == "_key" and "_key" not in fieldnames:
+            raise ValidationFailed([UnsupportedTable()])
 
+        if key_field != "_key" and key_field not in fieldnames:
+            raise ValidationFailed([KeyFieldDoesNotExist(key=key_field)])
 
-def validate_node_table(
-    rows: Sequence[MutableMapping], key_field: str, overwrite: bool
-) -> None:
-    """Validate that the given table is a valid node table."""
-    fieldnames = rows[0].keys()
-    data_errors: List[ValidationFailure] = []
-
-    if key_field != "_key" and key_field not in fieldnames:
-        data_errors.append(KeyFieldDoesNotExist(key=key_field))
-        raise ValidationFailed(data_errors)
-
-    if "_key" in fieldnames and key_field != "_key" and not overwrite:
-        data_errors.append(KeyFieldAlreadyExists(key=key_field))
-        raise ValidationFailed(data_errors)
-
-    keys = (row[key_field] for row in rows)
-    unique_keys: Set[str] = set()
-    for key in keys:
-        if key in unique_keys:
-            data_errors.append(DuplicateKey(key=key))
-        else:
-            unique_keys.add(key)
+        if "_key" in fieldnames and key_field != "_key" and not overwrite:
+            raise ValidationFailed([KeyFieldAlreadyExists(key=key_field)])
 
-    if len(data_errors) > 0:
-        raise ValidationFailed(data_errors)
+    def _error(self, error: ValidationFailure) -> None:
+        if self.exhausted:
+            return
+
+        if len(self.errors) >= self.max_errors:
+            self.errors.append(TooManyErrors(limit=self.max_errors))
+            self.exhausted = True
+        else:
+            self.errors.append(error)
+
+    def validate(self, row: MutableMapping) -> None:
+        """Check the next row of the file."""
+        self.rows += 1
+        if self.exhausted:
+            return
+
+        if self.edges:
+            fields: List[str] = []
+            if not valid_cell.match(row["_from"] or ""):
+                fields.append("_from")
+            if not valid_cell.match(row["_to"] or ""):
+                fields.append("_to")
+
+            if fields:
+                # +1 due to header row
+                self._error(InvalidRow(fields=fields, row=self.rows + 1))
+
+        if self.key_field is not None:
+            key = row[self.key_field]
+            if self.edges and not key:
+                return
+
+            digest = key_digest(key)
+            if digest in self.keys:
+                self._error(DuplicateKey(key=key))
+            else:
+                self.keys.add(digest)
+
+    def validate_all(self, rows: Iterable[MutableMapping]) -> None:
+        """Check the next several rows of the file (e.g., one chunk of it)."""
+        for row in rows:
+            self.validate(row)
+
+    def finish(self) -> None:
+        """Raise the problems found with the file, if there were any."""
+        if not self.rows:
+            raise ValidationFailed([MissingBody()])
+
+        if self.errors:
+            raise ValidationFailed(self.errors)
 
 
 def validate_csv(
-    rows: Sequence[MutableMapping], key_field: str, overwrite: bool
+    rows: Iterable[MutableMapping],
+    key_field: str,
+    overwrite: bool,
+    max_errors: int = CSV_MAX_ERRORS,
 ) -> None:
     """Perform any necessary CSV validation, and return appropriate errors."""
-    if not rows:
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
         raise ValidationFailed([MissingBody()])
 
-    if is_edge_table(rows):
-        validate_edge_table(rows)
-    elif is_node_table(rows, key_field):
-        validate_node_table(rows, key_field, overwrite)
-    else:
-        raise ValidationFailed([UnsupportedTable()])
+    validator = CSVValidator(list(first.keys()), key_field, overwrite, max_errors)
+    validator.validate(first)
+    validator.validate_all(rows)
+
+    validator.finish()
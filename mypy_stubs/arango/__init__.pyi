@@ -1,7 +1,14 @@
-from typing import Any
+from typing import Any, Optional
+from arango.http import HTTPClient
 
 class ArangoClient:
-    def __init__(self, host: str, port: int, protocol: str): ...
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        protocol: str,
+        http_client: Optional[HTTPClient] = None,
+    ): ...
     def db(
         self,
         name: str = "_system",
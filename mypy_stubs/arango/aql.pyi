@@ -3,6 +3,11 @@ from arango.connection import Connection  # type: ignore
 from arango.executor import Executor  # type: ignore
 from arango.cursor import Cursor
 
+class AQLQueryCache:
+    def configure(
+        self, mode: Optional[str] = None, limit: Optional[int] = None
+    ) -> Dict: ...
+
 class AQL:
     """AQL (ArangoDB Query Language) API wrapper.
 
@@ -13,6 +18,8 @@ class AQL:
     """
 
     def __init__(self, connection: Connection, executor: Executor): ...
+    @property
+    def cache(self) -> AQLQueryCache: ...
     def validate(self, query: str) -> Dict: ...
     def execute(
         self,
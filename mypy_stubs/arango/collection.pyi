@@ -4,6 +4,7 @@ from typing import Any, Optional, Dict, Union, List, Mapping
 
 class Collection:
     def count(self) -> int: ...
+    def revision(self) -> str: ...
     def has(
         self, document: Any, rev: Optional[Any] = ..., check_rev: bool = ...
     ) -> bool: ...
@@ -37,6 +38,17 @@ class StandardCollection(Collection):
         overwrite: bool = ...,
         return_old: bool = ...,
     ) -> List[Union[Dict, ArangoError]]: ...
+    def import_bulk(
+        self,
+        documents: Any,
+        halt_on_error: bool = ...,
+        details: bool = ...,
+        from_prefix: Optional[str] = ...,
+        to_prefix: Optional[str] = ...,
+        overwrite: Optional[bool] = ...,
+        on_duplicate: Optional[str] = ...,
+        sync: Optional[bool] = ...,
+    ) -> Dict: ...
     def delete(
         self,
         document: Union[Dict, str],
@@ -57,6 +69,13 @@ class StandardCollection(Collection):
         sync: Optional[Any] = ...,
     ) -> Dict: ...
     def properties(self) -> Dict: ...
+    def indexes(self) -> List[Dict]: ...
+    def add_persistent_index(
+        self,
+        fields: List[str],
+        unique: Optional[bool] = ...,
+        sparse: Optional[bool] = ...,
+    ) -> Dict: ...
 
 class VertexCollection(Collection): ...
 class EdgeCollection(Collection): ...
@@ -1,3 +1,10 @@
-from typing import Any, Generator
+from typing import Any, Dict, Iterator, List, Optional
 
-Cursor = Generator[Any, None, None]
+class Cursor(Iterator[Any]):
+    def __iter__(self) -> Cursor: ...
+    def __next__(self) -> Any: ...
+    def count(self) -> Optional[int]: ...
+    def batch(self) -> List[Any]: ...
+    def has_more(self) -> bool: ...
+    def statistics(self) -> Optional[Dict[str, Any]]: ...
+    def close(self, ignore_missing: bool = ...) -> Optional[bool]: ...
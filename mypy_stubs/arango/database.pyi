@@ -6,6 +6,7 @@ from arango.aql import AQL  # type: ignore
 
 class StandardDatabase:
     aql: AQL
+    def version(self) -> str: ...
     def has_database(self, name: str) -> bool: ...
     def has_graph(self, name: str) -> bool: ...
     def has_collection(self, name: str) -> bool: ...
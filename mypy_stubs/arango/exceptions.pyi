@@ -2,3 +2,4 @@ class DatabaseCreateError(Exception): ...
 class EdgeDefinitionCreateError(Exception): ...
 class AQLQueryValidateError(Exception): ...
 class AQLQueryExecuteError(Exception): ...
+class IndexCreateError(Exception): ...
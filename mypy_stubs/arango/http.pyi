@@ -0,0 +1,15 @@
+from typing import Any, Dict, Optional, Tuple
+from arango.response import Response
+
+class HTTPClient:
+    def send_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        data: Any = None,
+        headers: Optional[Dict] = None,
+        auth: Optional[Tuple[str, str]] = None,
+    ) -> Response: ...
+
+class DefaultHTTPClient(HTTPClient): ...
@@ -0,0 +1,12 @@
+from typing import Mapping, Optional
+
+class Response:
+    def __init__(
+        self,
+        method: Optional[str],
+        url: str,
+        headers: Mapping[str, str],
+        status_code: int,
+        status_text: str,
+        raw_body: str,
+    ): ...
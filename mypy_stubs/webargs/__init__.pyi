@@ -2,10 +2,12 @@ from typing import Any
 
 class fields:
     @staticmethod
-    def Int() -> Any: ...
+    def Int(required: bool = False, location: str = "json") -> Any: ...
     @staticmethod
     def Str(required: bool = False, location: str = "json") -> Any: ...
     @staticmethod
-    def List(t: Any) -> Any: ...
+    def List(t: Any, required: bool = False, location: str = "json") -> Any: ...
     @staticmethod
     def Bool(required: bool = False, location: str = "json") -> Any: ...
+    @staticmethod
+    def Dict(required: bool = False, location: str = "json") -> Any: ...
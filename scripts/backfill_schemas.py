@@ -0,0 +1,7 @@
+"""Script that records the schemas of tables created before schemas were."""
+from multinet.db import backfill_table_schemas
+
+
+if __name__ == "__main__":
+    for table in backfill_table_schemas():
+        print(f"Recorded the schema of {table}")
@@ -17,7 +17,6 @@ setup(
     description="Multinet API",
     install_requires=[
         "python-arango",
-        "newick",
         "uuid",
         "requests",
         "webargs",
@@ -0,0 +1,66 @@
+"""Tests for the revision-checked caches."""
+from multinet.cache import Revision, revision_cache
+
+
+def test_revision_cache_invalidation():
+    """Test that cached values are dropped once the revision changes."""
+    state = {"revision": "1", "calls": 0}
+    revision = Revision(lambda: state["revision"], ttl=0)
+
+    @revision_cache(revision)
+    def lookup(name):
+        state["calls"] += 1
+        return f"{name}-{state['revision']}"
+
+    assert lookup("a") == "a-1"
+    assert lookup("a") == "a-1"
+    assert state["calls"] == 1
+
+    # A write made elsewhere bumps the revision.
+    state["revision"] = "2"
+    assert lookup("a") == "a-2"
+    assert state["calls"] == 2
+
+    # Local invalidation.
+    lookup.cache_clear()
+    assert lookup("a") == "a-2"
+    assert state["calls"] == 3
+
+
+def test_revision_ttl():
+    """Test that the revision source is only consulted once per interval."""
+    reads = []
+
+    def source():
+        reads.append(None)
+        return "1"
+
+    revision = Revision(source, ttl=60)
+
+    @revision_cache(revision)
+    def lookup(name):
+        return name
+
+    for _ in range(10):
+        lookup("a")
+        lookup("b")
+
+    assert len(reads) == 1
+
+
+def test_revision_cache_misses():
+    """Test that None results are left out of the cache if asked."""
+    calls = []
+    revision = Revision(lambda: "1", ttl=60)
+
+    @revision_cache(revision, cache_misses=False)
+    def lookup(name):
+        calls.append(name)
+        return name if name == "known" else None
+
+    for _ in range(3):
+        assert lookup("known") == "known"
+        assert lookup("unknown") is None
+
+    assert calls == ["known"] + ["unknown"] * 3
+    assert len(lookup._entries) == 1
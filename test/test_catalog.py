@@ -0,0 +1,91 @@
+"""Tests for the cached catalog of workspace tables and graphs."""
+from multinet.db import (
+    CATALOG_MARKER,
+    backfill_table_schemas,
+    catalog_changed,
+    catalog_revision,
+    catalog_table,
+    db,
+    get_workspace_db,
+    get_workspace_metadata,
+    schema_collection,
+    table_schema,
+    workspace_catalog,
+    workspace_mapping,
+    workspace_mapping_collection,
+)
+
+
+def test_catalog_changes(managed_workspace):
+    """Test that changes to the catalog leave the workspace mapping alone."""
+    mapping_revision = workspace_mapping_collection().revision()
+    assert workspace_catalog(managed_workspace)["tables"] == {}
+
+    space = get_workspace_db(managed_workspace, readonly=False)
+    space.create_collection("things")
+    catalog_changed(managed_workspace)
+
+    assert workspace_catalog(managed_workspace)["tables"] == {"things": "node"}
+    assert workspace_mapping_collection().revision() == mapping_revision
+    assert "catalog_version" not in get_workspace_metadata(managed_workspace)
+
+
+def test_catalog_change_elsewhere(managed_workspace):
+    """Test that a change made by another worker is picked up."""
+    internal = workspace_mapping(managed_workspace)["internal"]
+    version = catalog_revision(internal).current()
+    assert workspace_catalog(managed_workspace)["graphs"] == {}
+
+    # Make the change as another worker would, without expiring this worker's
+    # revision marker.
+    space = get_workspace_db(managed_workspace, readonly=False)
+    space.create_collection("people")
+    space.create_collection("friends", edge=True)
+    space.create_graph(
+        "network",
+        edge_definitions=[
+            {
+                "edge_collection": "friends",
+                "from_vertex_collections": ["people"],
+                "to_vertex_collections": ["people"],
+            }
+        ],
+    )
+    schema_collection(db(internal)).insert(
+        {"_key": CATALOG_MARKER, "version": "elsewhere"}, overwrite=True
+    )
+
+    # Until the revision is re-read, the cached catalog is served...
+    assert workspace_catalog(managed_workspace)["graphs"] == {}
+
+    # ...except to lookups that miss it.
+    assert catalog_table(managed_workspace, "friends") == "edge"
+
+    catalog_revision(internal).expire()
+    assert catalog_revision(internal).current() != version
+    assert workspace_catalog(managed_workspace)["graphs"] == {
+        "network": {"nodeTables": ["people"], "edgeTable": "friends"}
+    }
+
+
+def test_legacy_table_schema(managed_workspace):
+    """Test that a table without a schema is only sampled on reads, until backfilled."""
+    space = get_workspace_db(managed_workspace, readonly=False)
+    space.create_collection("legacy").insert_many([{"a": 1}, {"b": "x"}])
+
+    internal = workspace_mapping(managed_workspace)["internal"]
+    schemas = schema_collection(db(internal))
+    revision = schemas.revision()
+
+    assert set(table_schema(managed_workspace, "legacy").column_names()) == {
+        "_key",
+        "a",
+        "b",
+    }
+    assert not schemas.has("legacy")
+    assert schemas.revision() == revision
+
+    table = f"{managed_workspace}/legacy"
+    assert table in backfill_table_schemas()
+    assert schemas.has("legacy")
+    assert table not in backfill_table_schemas()
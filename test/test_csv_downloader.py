@@ -0,0 +1,65 @@
+"""Tests functions in the CSV Downloader Flask Blueprint."""
+import csv
+from io import StringIO
+
+import conftest
+import pytest
+
+from multinet import db
+from multinet.downloaders.csv import csv_chunks
+
+
+def test_csv_chunks():
+    """Test that rows are written as CSV text in large chunks."""
+    rows = [{"_key": str(i), "name": f"name, {i}"} for i in range(1000)]
+
+    chunks = list(csv_chunks(iter(rows), ["_key", "name"], chunk_size=4096))
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 4096 for chunk in chunks[:-1])
+
+    written = list(csv.DictReader(StringIO("".join(chunks))))
+    assert written == rows
+
+    # A column missing from the header isn't silently dropped.
+    with pytest.raises(ValueError):
+        list(csv_chunks([{"_key": "0", "extra": 1}], ["_key"]))
+
+
+def test_csv_chunks_empty_table():
+    """Test that an empty table is written as just its header."""
+    assert list(csv_chunks([], ["_key", "name"])) == ["_key,name\r\n"]
+
+
+def test_download_edges_without_keys(populated_workspace, managed_user, server):
+    """Test that generated keys and endpoints are included in downloaded edges."""
+    workspace, _, _, edge_table = populated_workspace
+
+    with conftest.login(managed_user, server):
+        resp = server.get(f"/api/workspaces/{workspace}/tables/{edge_table}/download")
+
+    assert resp.status_code == 200
+
+    rows = list(csv.DictReader(StringIO(resp.data.decode("utf8"))))
+    assert rows
+    assert all(row["_key"] and row["_from"] and row["_to"] for row in rows)
+
+
+def test_download_columns_missing_from_schema(
+    managed_workspace, managed_user, server, monkeypatch
+):
+    """Test that columns the schema doesn't list are still downloaded."""
+    # The table has no stored schema, and the sample misses the last row.
+    monkeypatch.setattr(db, "SCHEMA_SAMPLE_SIZE", 5)
+
+    space = db.get_workspace_db(managed_workspace, readonly=False)
+    space.create_collection("legacy").insert_many(
+        [{"_key": str(i), "a": i} for i in range(5)] + [{"_key": "late", "b": "x"}]
+    )
+
+    with conftest.login(managed_user, server):
+        resp = server.get(f"/api/workspaces/{managed_workspace}/tables/legacy/download")
+
+    assert resp.status_code == 200
+
+    rows = list(csv.DictReader(StringIO(resp.data.decode("utf8"))))
+    assert {"_key": "late", "a": "", "b": "x"} in rows
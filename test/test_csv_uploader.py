@@ -6,10 +6,16 @@ import pytest
 
 import conftest
 from multinet.errors import ValidationFailed, DecodeFailed
-from multinet.uploaders.csv import decode_data
-from multinet.validation import DuplicateKey, UnsupportedTable
+from multinet.util import decode_data
+from multinet.validation import (
+    DuplicateKey,
+    RejectedRows,
+    TooManyErrors,
+    UnsupportedTable,
+)
 from multinet.validation.csv import (
     validate_csv,
+    CSVValidator,
     InvalidRow,
     KeyFieldAlreadyExists,
     KeyFieldDoesNotExist,
@@ -53,6 +59,45 @@ def test_edge_table_with_key_field(
     assert table_name not in node_table_resp.json
 
 
+def test_invalid_row_midstream(server, managed_workspace, managed_user):
+    """Test that a bad row partway through a streamed upload discards the table."""
+    lines = ["_key,name"] + [f"{i},name{i}" for i in range(5000)]
+    lines.insert(2500, "7,duplicate")
+
+    table_name = "midstream"
+    with conftest.login(managed_user, server):
+        resp = server.post(
+            f"/api/csv/{managed_workspace}/{table_name}", data="\n".join(lines)
+        )
+        assert resp.status_code == 400
+        assert resp.json["errors"] == [DuplicateKey(key="7").asdict()]
+
+        tables_resp = server.get(f"/api/workspaces/{managed_workspace}/tables")
+
+    assert tables_resp.status_code == 200
+    assert table_name not in tables_resp.json
+
+
+def test_rejected_rows(server, managed_workspace, managed_user):
+    """Test that rows the database refuses fail the upload, and discard the table."""
+    table_name = "rejected"
+    with conftest.login(managed_user, server):
+        resp = server.post(
+            f"/api/csv/{managed_workspace}/{table_name}",
+            data="_key,name\nok,fine\nnot ok,illegal key\n",
+        )
+        assert resp.status_code == 400
+
+        [error] = resp.json["errors"]
+        assert error["type"] == RejectedRows.__name__
+        assert error["count"] == 1
+        assert len(error["errors"]) == 1
+
+        tables_resp = server.get(f"/api/workspaces/{managed_workspace}/tables")
+
+    assert table_name not in tables_resp.json
+
+
 def test_missing_key_field():
     """Test that missing key fields are handled properly."""
     rows = read_csv("startrek_no_key_field.csv")
@@ -137,6 +182,44 @@ def test_invalid_headers():
     assert all(err in validation_resp for err in correct)
 
 
+def test_duplicate_edge_keys():
+    """Test that edge tables with keys are checked for duplicates too."""
+    rows = [
+        {"_key": "a", "_from": "people/1", "_to": "clubs/1"},
+        {"_key": "a", "_from": "people/2", "_to": "bad"},
+    ]
+    with pytest.raises(ValidationFailed) as v_error:
+        validate_csv(rows, key_field="_key", overwrite=False)
+
+    assert v_error.value.errors == [
+        InvalidRow(row=3, fields=["_to"]).asdict(),
+        DuplicateKey(key="a").asdict(),
+    ]
+
+
+def test_error_limit():
+    """Test that validation stops collecting errors at the limit."""
+    rows = ({"_key": "same"} for _ in range(1000))
+    with pytest.raises(ValidationFailed) as v_error:
+        validate_csv(rows, key_field="_key", overwrite=False, max_errors=5)
+
+    validation_resp = v_error.value.errors
+    assert len(validation_resp) == 6
+    assert validation_resp[-1] == TooManyErrors(limit=5).asdict()
+
+
+def test_chunked_validation():
+    """Test that a file can be validated in chunks."""
+    validator = CSVValidator(["_key", "name"], key_field="_key", overwrite=False)
+    validator.validate_all([{"_key": "1", "name": "a"}, {"_key": "2", "name": "b"}])
+    validator.validate_all([{"_key": "3", "name": "c"}, {"_key": "1", "name": "d"}])
+
+    assert validator.rows == 4
+    assert [err.asdict() for err in validator.errors] == [
+        DuplicateKey(key="1").asdict()
+    ]
+
+
 def test_decode_failed():
     """Test that the DecodeFailed validation error is raised."""
     test_data = b"\xff\xfe_\x00k\x00e\x00y\x00,\x00n\x00a\x00m\x00e\x00\n"
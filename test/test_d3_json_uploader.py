@@ -2,10 +2,15 @@
 import json
 import os
 from collections import OrderedDict
+from io import StringIO
 
+import conftest
 from multinet.util import data_path
 from multinet.uploaders.d3_json import (
     validate_d3_json,
+    read_d3_json,
+    D3Validator,
+    InvalidStructure,
     InconsistentLinkKeys,
     InvalidLinkKeys,
     NodeDuplicates,
@@ -44,3 +49,54 @@ def test_validate_d3_json():
     assert len(outcome4) == 2
     assert outcome4[0] == InvalidLinkKeys()
     assert outcome4[1] == InconsistentLinkKeys()
+
+
+def test_read_d3_json():
+    """Test that nodes and links are read and validated one at a time."""
+    with open(data_path("miserables.json")) as f:
+        data = json.load(f)
+
+    validator = D3Validator()
+    with open(data_path("miserables.json")) as f:
+        items = list(read_d3_json(f, validator))
+
+    assert validator.errors() == []
+    assert [item for kind, item in items if kind == "nodes"] == data["nodes"]
+    assert [item for kind, item in items if kind == "links"] == data["links"]
+
+    # Elements that fail validation aren't produced.
+    validator = D3Validator()
+    with open(data_path("miserables_duplicate_nodes.json")) as f:
+        nodes = [item for kind, item in read_d3_json(f, validator) if kind == "nodes"]
+
+    assert validator.errors() == [NodeDuplicates()]
+    assert len(nodes) == len({node["id"] for node in nodes})
+
+    validator = D3Validator()
+    assert list(read_d3_json(StringIO('{"nodes": []}'), validator)) == []
+    assert validator.errors() == [InvalidStructure()]
+
+
+def test_failed_upload_into_existing_tables(populated_workspace, managed_user, server):
+    """Test that a bad file adds nothing to tables that were already there."""
+    workspace, graph, node_table, edge_table = populated_workspace
+    tables_url = f"/api/workspaces/{workspace}/tables"
+
+    with conftest.login(managed_user, server):
+        counts = {
+            table: server.get(f"{tables_url}/{table}").json["count"]
+            for table in (node_table, edge_table)
+        }
+
+        # Keep the tables, but free up the graph name.
+        resp = server.delete(f"/api/workspaces/{workspace}/graphs/{graph}")
+        assert resp.status_code == 200
+
+        # The file is cut off after its nodes and first link.
+        data = '{"nodes": [{"id": "new1"}, {"id": "new2"}], "links": ['
+        data += '{"source": "new1", "target": "new2"}, {"source"'
+        resp = server.post(f"/api/d3_json/{workspace}/{graph}", data=data)
+        assert resp.status_code == 400
+
+        for table, count in counts.items():
+            assert server.get(f"{tables_url}/{table}").json["count"] == count
@@ -0,0 +1,198 @@
+"""Tests for the graph endpoints."""
+import conftest
+from multinet import api, db
+from multinet.validation import UndefinedKeys, UndefinedTable
+
+
+def test_graph_nodes_cursor(populated_workspace, managed_user, server):
+    """Test that paging through the nodes of a graph visits each node once."""
+    workspace, graph, _, _ = populated_workspace
+    url = f"/api/workspaces/{workspace}/graphs/{graph}/nodes"
+
+    with conftest.login(managed_user, server):
+        resp = server.get(url, query_string={"limit": 0, "cursor": ""})
+        assert resp.status_code == 400
+
+        # Without a cursor, a limit of 0 just asks for the count.
+        resp = server.get(url, query_string={"limit": 0, "count": True})
+        assert resp.status_code == 200
+        assert resp.json["nodes"] == []
+        count = resp.json["count"]
+
+        keys = []
+        cursor = ""
+        while cursor is not None:
+            resp = server.get(url, query_string={"limit": 25, "cursor": cursor})
+            assert resp.status_code == 200
+
+            keys += [node["_key"] for node in resp.json["nodes"]]
+            cursor = resp.json["cursor"]
+
+    assert len(keys) == len(set(keys)) == count
+
+
+def create_mixed_graph(server, workspace, node_table):
+    """
+    Create a graph whose edges join `node_table` to a second node table.
+
+    Returns the name of the graph, and a key from `node_table`.
+    """
+    resp = server.get(
+        f"/api/workspaces/{workspace}/tables/{node_table}", query_string={"limit": 1}
+    )
+    key = resp.json["rows"][0]["_key"]
+
+    resp = server.post(f"/api/csv/{workspace}/places", data="_key,name\na,Alpha\n")
+    assert resp.status_code == 200
+
+    resp = server.post(
+        f"/api/csv/{workspace}/visits", data=f"_from,_to\n{node_table}/{key},places/a\n"
+    )
+    assert resp.status_code == 200
+
+    resp = server.post(
+        f"/api/workspaces/{workspace}/graphs/mixed",
+        query_string={"edge_table": "visits"},
+    )
+    assert resp.status_code == 200
+
+    return "mixed", key
+
+
+def test_nodes_attributes(populated_workspace, managed_user, server):
+    """Test fetching the attributes of many nodes, across node tables."""
+    workspace, _, node_table, _ = populated_workspace
+
+    with conftest.login(managed_user, server):
+        graph, key = create_mixed_graph(server, workspace, node_table)
+        url = f"/api/workspaces/{workspace}/graphs/{graph}/nodes/attributes"
+
+        # Nodes that don't exist are left out.
+        resp = server.post(
+            url, json=[f"{node_table}/{key}", "places/a", "places/missing"]
+        )
+        assert resp.status_code == 200
+        assert sorted(node["_id"] for node in resp.json) == sorted(
+            [f"{node_table}/{key}", "places/a"]
+        )
+
+        resp = server.post(url, json=["nowhere/a"])
+        assert resp.status_code == 404
+
+        resp = server.post(url, json=["places-a"])
+        assert resp.status_code == 400
+
+        resp = server.post(url, json={"places": "a"})
+        assert resp.status_code == 400
+
+
+def test_subgraph_limits(populated_workspace, managed_user, server, monkeypatch):
+    """Test that subgraphs are capped at the configured size."""
+    workspace, graph, node_table, _ = populated_workspace
+    monkeypatch.setattr(api, "MAX_SUBGRAPH_NODES", 5)
+    monkeypatch.setattr(api, "MAX_SUBGRAPH_EDGES", 3)
+
+    with conftest.login(managed_user, server):
+        resp = server.get(
+            f"/api/workspaces/{workspace}/tables/{node_table}",
+            query_string={"limit": 1},
+        )
+        seed = resp.json["rows"][0]["_id"]
+        url = f"/api/workspaces/{workspace}/graphs/{graph}/subgraph"
+
+        resp = server.post(url, json={"seeds": [seed], "depth": 0})
+        assert resp.status_code == 200
+        assert [node["_id"] for node in resp.json["nodes"]] == [seed]
+
+        resp = server.post(
+            url,
+            json={
+                "seeds": [seed],
+                "depth": 5,
+                "node_limit": 1000000,
+                "edge_limit": 1000000,
+            },
+        )
+        assert resp.status_code == 200
+        assert len(resp.json["nodes"]) == 5
+        assert len(resp.json["links"]) <= 3
+
+        resp = server.post(url, json={"seeds": [seed], "node_limit": 0})
+        assert resp.status_code == 422
+
+        resp = server.post(url, json={"seeds": [seed], "depth": 6})
+        assert resp.status_code == 400
+
+
+def test_subgraph_deleted_node(populated_workspace, managed_user, server):
+    """Test that edges to deleted nodes are left out of a subgraph."""
+    workspace, graph, node_table, edge_table = populated_workspace
+
+    with conftest.login(managed_user, server):
+        resp = server.get(
+            f"/api/workspaces/{workspace}/tables/{edge_table}",
+            query_string={"limit": 1},
+        )
+        edge = resp.json["rows"][0]
+
+        space = db.get_workspace_db(workspace, readonly=False)
+        space.collection(node_table).delete(edge["_to"].split("/", 1)[1])
+
+        resp = server.post(
+            f"/api/workspaces/{workspace}/graphs/{graph}/subgraph",
+            json={"seeds": [edge["_from"]], "depth": 1},
+        )
+
+    assert resp.status_code == 200
+
+    # Links name their ends by table and key, and nodes by key.
+    keys = {node["id"] for node in resp.json["nodes"]}
+    assert edge["_from"].split("/", 1)[1] in keys
+    assert edge["_to"].split("/", 1)[1] not in keys
+    assert all(
+        link["source"].split("/", 1)[1] in keys
+        and link["target"].split("/", 1)[1] in keys
+        for link in resp.json["links"]
+    )
+
+
+def test_create_graph(populated_workspace, managed_user, server):
+    """Test that a graph is only created if its edges reference existing nodes."""
+    workspace, _, node_table, edge_table = populated_workspace
+    url = f"/api/workspaces/{workspace}/graphs"
+
+    with conftest.login(managed_user, server):
+        resp = server.post(f"{url}/missing", query_string={"edge_table": "nowhere"})
+        assert resp.status_code == 404
+
+        resp = server.get(
+            f"/api/workspaces/{workspace}/tables/{node_table}",
+            query_string={"limit": 1},
+        )
+        key = resp.json["rows"][0]["_key"]
+
+        resp = server.post(
+            f"/api/csv/{workspace}/dangling",
+            data=(
+                "_from,_to\n"
+                f"{node_table}/nonexistent,{node_table}/{key}\n"
+                f"nowhere/a,{node_table}/{key}\n"
+            ),
+        )
+        assert resp.status_code == 200
+
+        resp = server.post(f"{url}/dangling", query_string={"edge_table": "dangling"})
+        assert resp.status_code == 400
+        assert sorted(resp.json["errors"], key=lambda error: error["type"]) == [
+            UndefinedKeys(table=node_table, keys=["nonexistent"]).asdict(),
+            UndefinedTable(table="nowhere").asdict(),
+        ]
+
+        resp = server.post(f"{url}/copy", query_string={"edge_table": edge_table})
+        assert resp.status_code == 200
+
+        resp = server.get(url)
+        assert sorted(resp.json) == ["copy", "miserables"]
+
+        resp = server.get(f"{url}/copy")
+        assert resp.json == {"nodeTables": [node_table], "edgeTable": edge_table}
@@ -0,0 +1,81 @@
+"""Tests for the background database health monitor."""
+import pytest
+
+import multinet
+from multinet.health import HealthMonitor
+
+
+@pytest.fixture
+def database():
+    """Return the state of a fake database, and a probe of it."""
+    state = {"up": True, "probes": 0}
+
+    def probe():
+        state["probes"] += 1
+        if not state["up"]:
+            raise ConnectionError("refused")
+
+    return state, probe
+
+
+def monitor_of(probe, monkeypatch, **kwargs):
+    """Return a monitor whose background thread doesn't probe."""
+    monitor = HealthMonitor(probe, **kwargs)
+    monkeypatch.setattr(monitor, "_run", lambda: None)
+    return monitor
+
+
+def test_circuit_breaker(database, monkeypatch):
+    """Test that the circuit opens after repeated failures, and closes again."""
+    state, probe = database
+    monitor = monitor_of(probe, monkeypatch, interval=1, max_backoff=4, threshold=2)
+
+    assert monitor.check()
+    assert monitor.status()["latency_ms"]["last"] is not None
+
+    state["up"] = False
+    assert monitor.check()
+    assert not monitor.check()
+    assert monitor.status()["error"] == "refused"
+
+    # The probe backs off exponentially, up to the maximum.
+    assert monitor.next_interval() == 2
+    monitor.check()
+    monitor.check()
+    assert monitor.next_interval() == 4
+
+    state["up"] = True
+    assert monitor.check()
+    assert monitor.next_interval() == 1
+
+
+def test_trial_request(database, monkeypatch):
+    """Test that a request closes the open circuit once the database recovers."""
+    state, probe = database
+    monitor = monitor_of(probe, monkeypatch, threshold=1, retry_after=3600)
+
+    state["up"] = False
+    assert not monitor.is_live()
+
+    # A trial isn't due yet, so requests are refused without probing.
+    state["up"] = True
+    probes = state["probes"]
+    assert not monitor.is_live()
+    assert state["probes"] == probes
+
+    monitor.retry_after = 0
+    assert monitor.is_live()
+    assert monitor.status()["circuit"] == "closed"
+
+
+def test_health_route(database, monkeypatch, app):
+    """Test that the public health route reports nothing about the connection."""
+    state, probe = database
+    monitor = monitor_of(probe, monkeypatch, threshold=1, retry_after=60)
+    monkeypatch.setattr(multinet, "monitor", monitor)
+
+    state["up"] = False
+    resp = app.test_client().get("/health")
+
+    assert resp.status_code == 503
+    assert resp.json == {"live": False, "circuit": "open", "consecutive_failures": 1}
@@ -0,0 +1,119 @@
+"""Tests for the bulk importer."""
+import threading
+from concurrent.futures import wait
+
+from multinet import ingest
+from multinet.ingest import BulkImporter, first_errors, import_documents
+
+
+class RecordingCollection:
+    """A collection that records the batches imported into it."""
+
+    name = "recording"
+
+    def __init__(self):
+        """Initialize an empty collection."""
+        self.lock = threading.Lock()
+        self.batches = []
+
+    def import_bulk(self, documents, **kwargs):
+        """Record a batch, rejecting documents without a key."""
+        with self.lock:
+            self.batches.append(list(documents))
+
+        failed = [doc for doc in documents if "_key" not in doc]
+        return {
+            "created": len(documents) - len(failed),
+            "errors": len(failed),
+            "details": ["missing key"] * len(failed),
+        }
+
+
+def test_batches_and_report():
+    """Test that every document is imported once, and the report adds up."""
+    coll = RecordingCollection()
+    docs = [{"_key": str(i)} for i in range(2500)] + [{"value": 1}]
+
+    report = import_documents(coll, docs)
+
+    imported = [doc for batch in coll.batches for doc in batch]
+    assert sorted(imported, key=str) == sorted(docs, key=str)
+    assert report["rows"] == 2501
+    assert report["created"] == 2500
+    assert report["failed"] == 1
+    assert first_errors(report) == ["missing key"]
+    assert sum(batch["rows"] for batch in report["batches"]) == 2501
+    assert [batch["batch"] for batch in report["batches"]] == list(
+        range(len(coll.batches))
+    )
+
+
+class Clock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def monotonic(self):
+        """Return the current time."""
+        return self.now
+
+
+class TimedCollection:
+    """A collection whose imports take a set time on `clock`."""
+
+    name = "timed"
+
+    def __init__(self, clock, seconds):
+        """Initialize an empty collection."""
+        self.clock = clock
+        self.seconds = seconds
+        self.batches = []
+
+    def import_bulk(self, documents, **kwargs):
+        """Import a batch, taking `seconds` to do so."""
+        self.clock.now += self.seconds
+        self.batches.append(len(documents))
+        return {"created": len(documents), "errors": 0, "details": []}
+
+
+def test_adaptive_batch_size(monkeypatch):
+    """Test that batch sizes are scaled towards the target duration, within bounds."""
+    clock = Clock()
+    monkeypatch.setattr(ingest, "time", clock)
+
+    coll = TimedCollection(clock, seconds=0.1)
+    importer = BulkImporter(coll, workers=1, batch_size=200)
+    sizes = []
+
+    def import_batch():
+        # Add exactly one batch, and wait for it to be imported.
+        start = len(coll.batches) * 10000
+        importer.extend({"_key": str(start + i)} for i in range(importer.batch_size))
+        wait(importer._futures)
+        sizes.append(importer.batch_size)
+
+    # Fast batches grow the next batch, by at most a factor of 2.
+    import_batch()
+    import_batch()
+
+    # Slow batches shrink it, by at most a factor of 2.
+    coll.seconds = 100
+    import_batch()
+
+    # On target, it stays put.
+    coll.seconds = ingest.TARGET_BATCH_SECONDS
+    import_batch()
+
+    # It never falls below the minimum.
+    coll.seconds = 100
+    for _ in range(4):
+        import_batch()
+
+    report = importer.close()
+
+    assert sizes == [400, 800, 400, 400, 200, 100, 100, 100]
+    assert coll.batches == [200, 400, 800, 400, 400, 200, 100, 100]
+    assert report["rows"] == report["created"] == sum(coll.batches)
+    assert [batch["seconds"] for batch in report["batches"]][:3] == [0.1, 0.1, 100]
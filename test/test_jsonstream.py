@@ -0,0 +1,55 @@
+"""Tests for the incremental JSON parser."""
+from io import StringIO
+import json
+import pytest
+
+from multinet import jsonstream
+
+
+def parse_value(text, chunk_size):
+    """Parse a JSON document into a value, through its events."""
+    events = jsonstream.parse(StringIO(text), chunk_size=chunk_size)
+    value = jsonstream.build(next(events), events)
+
+    # Make sure the rest of the document is valid, too.
+    assert list(events) == []
+    return value
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+def test_chunk_boundaries(chunk_size):
+    """Test that tokens split between chunks are read correctly."""
+    document = {
+        "nodes": [{"id": i, "name": f"node \"{i}\" é"} for i in range(20)],
+        "values": [0, -1.5, 2e10, 1e-3, True, False, None],
+        "empty": [{}, []],
+    }
+
+    assert parse_value(json.dumps(document), chunk_size) == document
+    assert parse_value(json.dumps(document, indent=2), chunk_size) == document
+
+
+def test_events():
+    """Test the events generated for a document."""
+    events = list(jsonstream.parse(StringIO('{"a": [1, {"b": null}]}')))
+    assert events == [
+        ("start_map", None),
+        ("map_key", "a"),
+        ("start_array", None),
+        ("value", 1),
+        ("start_map", None),
+        ("map_key", "b"),
+        ("value", None),
+        ("end_map", None),
+        ("end_array", None),
+        ("end_map", None),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text", ['{"a": 1,}', "[1 2]", '{"a" 1}', "[1]]", "{", "tru", '"abc', "[01]", ""]
+)
+def test_invalid_json(text):
+    """Test that invalid documents are rejected."""
+    with pytest.raises(jsonstream.JSONStreamError):
+        list(jsonstream.parse(StringIO(text), chunk_size=2))
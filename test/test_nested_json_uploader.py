@@ -0,0 +1,90 @@
+"""Tests functions in the nested JSON Uploader Flask Blueprint."""
+from io import StringIO
+import json
+import pytest
+
+import conftest
+from multinet.errors import MalformedRequestBody
+from multinet.uploaders.nested_json import read_nested_json
+
+
+def read_tree(text):
+    """Read a nested_json tree into lists of the documents for each table."""
+    tables = {"internal": [], "leaf": [], "edges": []}
+    for table, document in read_nested_json(
+        StringIO(text), "internal", "leaf", "edges"
+    ):
+        tables[table].append(document)
+
+    return tables
+
+
+def test_read_nested_json():
+    """Test that nodes and edges are produced however the keys are ordered."""
+    tree = {
+        "children": [
+            {
+                "children": [{"edge_data": {"weight": 1}, "node_data": {"name": "a"}}],
+                "edge_data": {"weight": 2},
+                "node_data": {"name": "c", "_key": "c"},
+                "node_fields": ["name"],
+            },
+            {"node_data": {"name": "d"}, "children": []},
+        ],
+        "node_data": {"name": "b"},
+    }
+    tables = read_tree(json.dumps(tree))
+
+    assert tables["leaf"] == [
+        {"name": "a", "_key": "100"},
+        {"name": "d", "_key": "101"},
+    ]
+    assert tables["internal"] == [
+        {"name": "c", "_key": "c"},
+        {"name": "b", "_key": "102"},
+    ]
+    assert tables["edges"] == [
+        {"weight": 1, "_from": "leaf/100", "_to": "internal/c"},
+        {"weight": 2, "_from": "internal/c", "_to": "internal/102"},
+        {"_from": "leaf/101", "_to": "internal/102"},
+    ]
+
+
+def test_deep_nested_json():
+    """Test that trees deeper than the recursion limit can be read."""
+    depth = 10000
+    text = '{"node_data": {}, "children": [' * depth + "{}" + "]}" * depth
+    tables = read_tree(text)
+
+    assert len(tables["internal"]) == depth
+    assert len(tables["leaf"]) == 1
+    assert len(tables["edges"]) == depth
+
+
+def test_malformed_nested_json():
+    """Test that a tree that isn't an object is rejected."""
+    with pytest.raises(MalformedRequestBody):
+        read_tree("[]")
+
+    with pytest.raises(MalformedRequestBody):
+        read_tree('{"children": [1]}')
+
+
+def test_failed_upload_into_existing_tables(managed_workspace, managed_user, server):
+    """Test that a bad file adds nothing to tables that were already there."""
+    tables_url = f"/api/workspaces/{managed_workspace}/tables"
+
+    with conftest.login(managed_user, server):
+        resp = server.post(
+            f"/api/csv/{managed_workspace}/tree_leaf_nodes", data="_key\nz\n"
+        )
+        assert resp.status_code == 200
+
+        # The file is cut off after a complete leaf.
+        data = '{"children": [{"node_data": {"_key": "a"}}, {"node_data": '
+        resp = server.post(f"/api/nested_json/{managed_workspace}/tree", data=data)
+        assert resp.status_code == 400
+
+        resp = server.get(tables_url)
+        assert sorted(resp.json) == ["tree_leaf_nodes"]
+        assert server.get(f"{tables_url}/tree_leaf_nodes").json["count"] == 1
@@ -1,17 +1,17 @@
 """Tests functions in the Neick Uploader Flask Blueprint."""
-import newick
 import os
 import pytest
 
 from multinet.errors import ValidationFailed, DecodeFailed
+from multinet.util import decode_data
 from multinet.validation import DuplicateKey
-from multinet.uploaders.newick import validate_newick, decode_data
+from multinet.uploaders.newick import newick_tables, read_newick, InvalidNewick
 
 TEST_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "data"))
 
 
 def test_validate_newick():
-    """Test the validate_newick() function."""
+    """Test that problems with a Newick tree are reported."""
     duplicate_keys_file_path = os.path.join(
         TEST_DATA_DIR, "basic_newick_duplicates.tree"
     )
@@ -20,10 +20,8 @@ def test_validate_newick():
     with open(duplicate_keys_file_path) as test_file:
         test_file = test_file.read()
 
-    body = newick.loads(test_file)
-
     with pytest.raises(ValidationFailed) as v_error:
-        validate_newick(body)
+        newick_tables(test_file, "tree_nodes")
 
     validation_resp = v_error.value.errors
     assert DuplicateKey(key="A").asdict() in validation_resp
@@ -34,3 +32,54 @@ def test_validate_newick():
         b"\x00C\x00,\x00E\x00)\x00,\x00D\x00)\x00;\x00\n\x00"
     )
     pytest.raises(DecodeFailed, decode_data, test_data)
+
+
+def test_read_newick():
+    """Test that each node is read after its children, with their lengths."""
+    nodes = list(read_newick("((A:1,B)C:2.5[comment],D)E;"))
+
+    assert nodes == [
+        ("A", []),
+        ("B", []),
+        ("C", [("A", 1.0), ("B", 0.0)]),
+        ("D", []),
+        ("E", [("C", 2.5), ("D", 0.0)]),
+    ]
+
+
+def test_newick_tables():
+    """Test that a tree is read into node and edge tables."""
+    nodes, edges = newick_tables("((A:1,B)C:2.5,D)E;", "tree_nodes")
+
+    assert nodes == [{"_key": key} for key in "ABCDE"]
+    assert edges == [
+        {"_from": "tree_nodes/C", "_to": "tree_nodes/A", "length": 1.0},
+        {"_from": "tree_nodes/C", "_to": "tree_nodes/B", "length": 0.0},
+        {"_from": "tree_nodes/E", "_to": "tree_nodes/C", "length": 2.5},
+        {"_from": "tree_nodes/E", "_to": "tree_nodes/D", "length": 0.0},
+    ]
+
+    with pytest.raises(ValidationFailed) as v_error:
+        newick_tables("(B,(A,C,A),D);", "tree_nodes")
+    assert DuplicateKey(key="A").asdict() in v_error.value.errors
+
+    with pytest.raises(ValidationFailed) as v_error:
+        newick_tables("((A,B),C;", "tree_nodes")
+    assert v_error.value.errors == [
+        InvalidNewick(detail="Unbalanced parentheses").asdict()
+    ]
+
+
+def test_deep_newick_tree():
+    """Test that trees deeper than the recursion limit can be read."""
+    depth = 10000
+    text = "(" * depth + "leaf" + "".join(f"){i}" for i in range(depth)) + ";"
+
+    nodes, edges = newick_tables(text, "tree_nodes")
+    assert len(nodes) == depth + 1
+    assert len(edges) == depth
+    assert edges[0] == {
+        "_from": "tree_nodes/0",
+        "_to": "tree_nodes/leaf",
+        "length": 0.0,
+    }
@@ -0,0 +1,26 @@
+"""Tests for pagination cursors."""
+import pytest
+
+from multinet.errors import InvalidCursor
+from multinet.pagination import encode_cursor, decode_cursor
+
+
+def test_round_trip():
+    """Test that decoding an encoded cursor recovers the position."""
+    position = {"table": "members", "key": "a/b+c"}
+    cursor = encode_cursor(position)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == position
+
+
+def test_empty_cursor():
+    """Test that the empty cursor denotes the start of the results."""
+    assert decode_cursor("") == {}
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "bm90IGpzb24", encode_cursor([1])])
+def test_invalid_cursor(cursor):
+    """Test that malformed cursors are rejected."""
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
@@ -0,0 +1,106 @@
+"""Tests for the registry of pooled database handles."""
+import threading
+
+import pytest
+
+from multinet import pool
+from multinet.pool import HandleRegistry
+
+
+class FakeDatabase:
+    """Stand-in for a database handle, holding no collections at first."""
+
+    def __init__(self, name):
+        """Initialize the database."""
+        self.name = name
+        self.collections = set()
+
+    def has_collection(self, name):
+        """Return True if the collection exists."""
+        return name in self.collections
+
+    def create_collection(self, name):
+        """Create a collection."""
+        self.collections.add(name)
+
+    def collection(self, name):
+        """Return a new handle to a collection."""
+        return (self.name, name, object())
+
+
+class FakeClient:
+    """Stand-in for `ArangoClient`, which can be made to stall while verifying."""
+
+    stalled = threading.Event()
+    release = threading.Event()
+
+    def __init__(self, **kwargs):
+        """Initialize the client."""
+        self.verified = []
+
+    def db(self, name, username, password, verify):
+        """Return a handle for a database, after "verifying" it."""
+        self.verified.append(name)
+        if name == "slow":
+            FakeClient.stalled.set()
+            FakeClient.release.wait(5)
+
+        return FakeDatabase(name)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Return a registry whose handles never touch the network."""
+    monkeypatch.setattr(pool, "ArangoClient", FakeClient)
+    FakeClient.stalled.clear()
+    FakeClient.release.clear()
+
+    return HandleRegistry(host="localhost", port=8529, protocol="http")
+
+
+def test_handles_are_shared(registry):
+    """Test that each handle is verified once, then reused."""
+    first = registry.get("space", "root", "")
+    assert registry.get("space", "root", "") is first
+    assert registry.get("space", "readonly", "") is not first
+
+    stats = registry.stats()
+    assert stats["handles"] == 2
+    assert stats["handle_hits"] == 1
+    assert stats["handle_misses"] == 2
+
+
+def test_verification_does_not_block(registry):
+    """Test that a slow verification doesn't hold up other databases."""
+    thread = threading.Thread(target=registry.get, args=("slow", "root", ""))
+    thread.start()
+    assert FakeClient.stalled.wait(5)
+
+    # This would deadlock if the lock were held while verifying "slow".
+    registry.get("fast", "root", "")
+
+    FakeClient.release.set()
+    thread.join(5)
+    assert registry.stats()["handles"] == 2
+
+
+def test_collections_are_shared(registry):
+    """Test that a collection is created once, and its handle reused."""
+    users = registry.collection("_system", "users", "")
+    assert users[:2] == ("_system", "users")
+    assert registry.collection("_system", "users", "") is users
+
+    registry.discard("_system")
+    assert registry.collection("_system", "users", "") is not users
+
+
+def test_reset_after_fork(registry, monkeypatch):
+    """Test that a new process gets new handles and collections."""
+    handle = registry.get("space", "root", "")
+    users = registry.collection("_system", "users", "")
+
+    monkeypatch.setattr(pool.os, "getpid", lambda: -1)
+
+    assert registry.get("space", "root", "") is not handle
+    assert registry.collection("_system", "users", "") is not users
+    assert registry.stats()["handle_hits"] == 0
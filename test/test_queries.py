@@ -0,0 +1,199 @@
+"""Tests for the AQL query builders, run against a workspace database."""
+import pytest
+
+from multinet import db, queries
+from multinet.errors import BadQueryArgument
+
+
+@pytest.fixture
+def network(managed_workspace):
+    """
+    Fill a workspace with two node tables and an edge table, and return its name.
+
+    people/a -> people/b -> people/c -> clubs/x, and people/a -> people/c;
+    people/e has no edges, and people/d has an edge to a missing node.
+    """
+    space = db.get_workspace_db(managed_workspace, readonly=False)
+
+    people = space.create_collection("people")
+    people.insert_many([{"_key": key, "name": key.upper()} for key in "abcde"])
+    space.create_collection("clubs").insert({"_key": "x", "name": "X"})
+
+    links = space.create_collection("links", edge=True)
+    links.insert_many(
+        [
+            {"_from": "people/a", "_to": "people/b"},
+            {"_from": "people/a", "_to": "people/c"},
+            {"_from": "people/b", "_to": "people/c"},
+            {"_from": "people/c", "_to": "clubs/x"},
+            {"_from": "people/d", "_to": "people/gone"},
+        ]
+    )
+
+    return managed_workspace
+
+
+def keys(rows):
+    """Return the sorted keys of some documents."""
+    return sorted(row["_key"] for row in rows)
+
+
+def test_table_pages(network):
+    """Test that table pages hold the right rows, and counts if asked."""
+
+    def run(query):
+        return list(db.run_query(network, query))
+
+    pages = [run(queries.table_rows("people", offset, 2)) for offset in (0, 2, 4)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert keys(row for page in pages for row in page) == list("abcde")
+
+    [page] = run(queries.table_page("people", 1, 3))
+    assert page["count"] == 5
+    assert len(page["rows"]) == 3
+
+    [page] = run(queries.table_page("people", 0, 3, count=False))
+    assert page["count"] is None
+
+    [page] = run(queries.table_page_after("people", "b", 2))
+    assert [row["_key"] for row in page["rows"]] == ["c", "d"]
+    assert page["count"] == 5
+
+    [page] = run(queries.table_page_after("people", "", 10, count=False))
+    assert [row["_key"] for row in page["rows"]] == list("abcde")
+    assert page["count"] is None
+
+    assert run(queries.table_counts(["people", "clubs", "links"])) == [[5, 1, 5]]
+    assert run(queries.table_counts([])) == [[]]
+
+
+def test_table_scans(network):
+    """Test that whole tables are read, with attributes stripped if asked."""
+    assert keys(db.run_query(network, queries.table_scan("people"))) == list("abcde")
+
+    attributes = db.run_query(network, queries.table_attributes("people"))
+    assert sorted(attributes) == ["_id", "_key", "_rev", "name"]
+
+    exported = list(db.run_query(network, queries.table_export("people", ["_rev"])))
+    assert keys(exported) == list("abcde")
+    assert all(set(row) == {"_id", "_key", "name"} for row in exported)
+
+
+def test_node_lookups(network):
+    """Test that nodes are found by key, without their revisions."""
+    [node] = db.run_query(network, queries.node_attributes("people", "a"))
+    assert node == {"_id": "people/a", "_key": "a", "name": "A"}
+    assert list(db.run_query(network, queries.node_attributes("people", "gone"))) == []
+
+    nodes = list(db.run_query(network, queries.nodes_by_key("people", ["a", "gone"])))
+    assert nodes == [{"_id": "people/a", "_key": "a", "name": "A"}]
+
+
+def test_graph_nodes(network):
+    """Test that graph nodes are paged across tables, by offset or by key."""
+    tables = ["clubs", "people"]
+
+    [page] = db.run_query(network, queries.graph_nodes(tables, 0, 10))
+    assert page["count"] == 6
+    assert sorted(node["_id"] for node in page["nodes"]) == ["clubs/x"] + [
+        f"people/{key}" for key in "abcde"
+    ]
+
+    [page] = db.run_query(network, queries.graph_nodes(tables, 4, 10, count=False))
+    assert len(page["nodes"]) == 2
+    assert page["count"] is None
+
+    [page] = db.run_query(network, queries.graph_nodes_after(tables, "people", "c", 10))
+    assert [node["_key"] for node in page["nodes"]] == ["d", "e"]
+    assert page["count"] == 6
+
+
+def test_node_edges(network):
+    """Test that the edges of a node are found in each direction, and counted."""
+
+    def ends(direction, **kwargs):
+        query = queries.node_edges("links", "people/c", direction, 0, 10, **kwargs)
+        edges = db.run_query(network, query)
+        return sorted((edge["from"], edge["to"]) for edge in edges)
+
+    assert ends("incoming") == [("people/a", "people/c"), ("people/b", "people/c")]
+    assert ends("outgoing") == [("people/c", "clubs/x")]
+    assert len(ends("all")) == 3
+
+    cursor = db.run_query(network, queries.node_edges("links", "people/c", "all", 0, 1))
+    assert len(list(cursor)) == 1
+    assert cursor.statistics()["fullCount"] == 3
+
+    query = queries.node_edges("links", "people/c", "outgoing", 0, 10, neighbors=True)
+    [edge] = db.run_query(network, query)
+    assert edge["neighbor"] == {"_id": "clubs/x", "_key": "x", "name": "X"}
+
+    with pytest.raises(BadQueryArgument):
+        queries.node_edges("links", "people/c", "sideways", 0, 10)
+
+
+def test_subgraph(network):
+    """Test that subgraphs hold the nodes found, and the edges between them."""
+
+    def subgraph(seeds, depth, direction, node_limit=100, filters=None):
+        query = queries.subgraph(
+            "links", seeds, depth, direction, node_limit, 100, filters or {}
+        )
+        rows = list(db.run_query(network, query))
+
+        # Every node comes before every edge.
+        kinds = [next(iter(row)) for row in rows]
+        assert kinds == sorted(kinds, reverse=True)
+
+        nodes = sorted(row["node"]["_id"] for row in rows if "node" in row)
+        links = sorted(
+            (row["link"]["_from"], row["link"]["_to"]) for row in rows if "link" in row
+        )
+        return nodes, links
+
+    assert subgraph(["people/a"], 1, "outgoing") == (
+        ["people/a", "people/b", "people/c"],
+        [
+            ("people/a", "people/b"),
+            ("people/a", "people/c"),
+            ("people/b", "people/c"),
+        ],
+    )
+    assert subgraph(["people/x"], 0, "all") == ([], [])
+    assert subgraph(["clubs/x"], 2, "incoming")[0] == [
+        "clubs/x",
+        "people/a",
+        "people/b",
+        "people/c",
+    ]
+    assert len(subgraph(["people/a"], 5, "all", node_limit=2)[0]) == 2
+    assert subgraph(["people/a"], 1, "all", filters={"name": "B"}) == (
+        ["people/b"],
+        [],
+    )
+
+    # The edge to a missing node is left out, along with the node.
+    assert subgraph(["people/d"], 1, "all") == (["people/d"], [])
+
+
+def test_edge_table_references(network):
+    """Test that the tables referenced by each column of an edge table are found."""
+    rows = db.run_query(network, queries.edge_table_references("links"))
+
+    assert sorted((row["column"], row["table"]) for row in rows) == [
+        ("_from", "people"),
+        ("_to", "clubs"),
+        ("_to", "people"),
+    ]
+
+
+def test_missing_references(network):
+    """Test that only references to missing nodes are found, up to a limit."""
+    query = queries.missing_references("links", ["people", "clubs"], 10)
+    assert list(db.run_query(network, query)) == [{"table": "people", "keys": ["gone"]}]
+
+    query = queries.missing_references("links", ["clubs"], 10)
+    assert list(db.run_query(network, query)) == []
+
+    query = queries.missing_references("links", ["people"], 0)
+    assert list(db.run_query(network, query)) == [{"table": "people", "keys": []}]
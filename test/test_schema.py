@@ -0,0 +1,57 @@
+"""Tests for table schemas."""
+from multinet.schema import HyperLogLog, TableSchema, infer_type
+
+
+def test_infer_type():
+    """Test that CSV strings are typed by their contents."""
+    assert infer_type("12.5") == "number"
+    assert infer_type("True") == "boolean"
+    assert infer_type("abc") == "string"
+    assert infer_type("") == "null"
+    assert infer_type(None) == "null"
+    assert infer_type(3) == "number"
+    assert infer_type({"a": 1}) == "object"
+    assert infer_type([1]) == "array"
+
+
+def test_distinct_estimate():
+    """Test that the distinct count estimate is close."""
+    counter = HyperLogLog()
+    for i in range(20000):
+        counter.add(i % 5000)
+
+    assert abs(counter.estimate() - 5000) < 500
+
+    small = HyperLogLog()
+    for value in ["a", "b", "c", "a"]:
+        small.add(value)
+
+    assert small.estimate() == 3
+
+
+def test_heterogeneous_columns():
+    """Test that columns missing from some rows are counted as null there."""
+    schema = TableSchema().observe_all(
+        [{"_key": "1", "_id": "t/1", "a": "x"}, {"_key": "2", "b": "7"}]
+    )
+    description = schema.describe()
+
+    assert schema.column_names() == ["_key", "a", "b"]
+    assert description["rows"] == 2
+    assert description["columns"]["a"]["nulls"] == 1
+    assert description["columns"]["b"]["types"] == {"number": 1}
+
+
+def test_merge_and_round_trip():
+    """Test that stored schemas can be restored and extended."""
+    first = TableSchema().observe_all({"_key": str(i), "v": i} for i in range(100))
+    restored = TableSchema.from_document(first.to_document())
+    restored.merge(
+        TableSchema().observe_all({"_key": str(i), "w": "x"} for i in range(100, 150))
+    )
+    description = restored.describe()
+
+    assert description["rows"] == 150
+    assert restored.column_names() == ["_key", "v", "w"]
+    assert abs(description["columns"]["_key"]["distinct"] - 150) < 15
+    assert description["columns"]["v"]["nulls"] == 50
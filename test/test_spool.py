@@ -0,0 +1,93 @@
+"""Tests for the on-disk multipart upload spool."""
+import os
+import time
+from io import BytesIO
+import pytest
+
+from multinet import spool
+from multinet.errors import AlreadyExists, IncompleteUpload, UploadNotFound
+
+
+@pytest.fixture(autouse=True)
+def spool_dir(tmp_path, monkeypatch):
+    """Keep spooled uploads in a temporary directory."""
+    monkeypatch.setattr(spool, "SPOOL_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_chunks_read_in_sequence_order():
+    """Test that chunks are joined by sequence number, not arrival order."""
+    upload_id = spool.create_upload()
+    with pytest.raises(IncompleteUpload):
+        spool.open_upload(upload_id)
+
+    for sequence, data in [(10, b"c,d\n"), (0, b"a,"), (9, b"b\n")]:
+        spool.write_chunk(upload_id, sequence, BytesIO(data))
+
+    with pytest.raises(IncompleteUpload) as error:
+        spool.open_upload(upload_id)
+    assert error.value.missing == [1, 2, 3, 4, 5, 6, 7, 8]
+
+    for sequence in range(1, 9):
+        spool.write_chunk(upload_id, sequence, BytesIO(b""))
+
+    with spool.open_upload(upload_id) as stream:
+        assert stream.read() == b"a,b\nc,d\n"
+
+
+def test_duplicate_chunk():
+    """Test that a chunk can't be overwritten."""
+    upload_id = spool.create_upload()
+    spool.write_chunk(upload_id, 0, BytesIO(b"first"))
+
+    with pytest.raises(AlreadyExists):
+        spool.write_chunk(upload_id, 0, BytesIO(b"second"))
+
+    with spool.open_upload(upload_id) as stream:
+        assert stream.read() == b"first"
+
+
+def test_unknown_upload(spool_dir):
+    """Test that missing or malformed upload IDs aren't found."""
+    upload_id = spool.create_upload()
+    spool.delete_upload(upload_id)
+
+    for bad_id in [upload_id, "../etc", "u-nothex"]:
+        with pytest.raises(UploadNotFound):
+            spool.write_chunk(bad_id, 0, BytesIO(b"data"))
+
+    assert list(spool_dir.iterdir()) == []
+
+
+def test_sweep_uploads(spool_dir):
+    """Test that uploads are swept once they haven't been written to for a while."""
+    stale = spool.create_upload()
+    fresh = spool.create_upload()
+
+    day_ago = time.time() - 24 * 60 * 60
+    os.utime(spool_dir / stale, (day_ago, day_ago))
+
+    assert spool.sweep_uploads(max_age=60 * 60) == [stale]
+    assert [path.name for path in spool_dir.iterdir()] == [fresh]
+
+    # Creating an upload sweeps with the configured maximum age.
+    os.utime(spool_dir / fresh, (day_ago, day_ago))
+    latest = spool.create_upload()
+    assert [path.name for path in spool_dir.iterdir()] == [latest]
+
+
+def test_uploads_require_login(spool_dir, server):
+    """Test that nothing is written to the spool without a login."""
+    upload_id = spool.create_upload()
+
+    assert server.post("/api/uploads").status_code == 401
+    resp = server.post(
+        f"/api/uploads/{upload_id}/chunk",
+        query_string={"sequence": 0},
+        data={"chunk": (BytesIO(b"data"), "chunk")},
+    )
+    assert resp.status_code == 401
+    assert server.delete(f"/api/uploads/{upload_id}").status_code == 401
+
+    assert [path.name for path in spool_dir.iterdir()] == [upload_id]
+    assert list((spool_dir / upload_id).iterdir()) == []
@@ -0,0 +1,17 @@
+"""Tests for the `_system` lookup indexes."""
+from multinet.db import SYSTEM_INDEXES, _has_index, ensure_system_indexes, db
+
+
+def test_ensure_system_indexes_idempotent():
+    """Test that the indexes are created once, and left alone afterwards."""
+    assert ensure_system_indexes() == []
+
+    sysdb = db("_system")
+    before = {name: sysdb.collection(name).indexes() for name in SYSTEM_INDEXES}
+    for name, specs in SYSTEM_INDEXES.items():
+        assert all(_has_index(before[name], spec) for spec in specs)
+
+    assert ensure_system_indexes() == []
+
+    after = {name: sysdb.collection(name).indexes() for name in SYSTEM_INDEXES}
+    assert after == before
@@ -0,0 +1,75 @@
+"""Tests for the caching of users and their sessions."""
+from uuid import uuid4
+
+from flask import session
+
+from multinet import user as user_module
+from multinet.user import (
+    MULTINET_COOKIE,
+    UserInfo,
+    current_user,
+    register_user,
+    sessions,
+    set_user_cookie,
+    user_collection,
+    user_from_cookie,
+)
+
+
+def test_current_user_once_per_request(app, managed_user, monkeypatch):
+    """Test that the user is looked up once per request, and then per session."""
+    lookups = []
+
+    def counting_collection():
+        lookups.append(None)
+        return user_collection()
+
+    monkeypatch.setattr(user_module, "user_collection", counting_collection)
+    cookie = managed_user.multinet.session
+    sessions.pop(cookie)
+
+    with app.test_request_context():
+        session[MULTINET_COOKIE] = cookie
+        assert current_user().sub == managed_user.sub
+        assert current_user().sub == managed_user.sub
+
+    assert len(lookups) == 1
+
+    # Later requests are served from the session cache.
+    with app.test_request_context():
+        session[MULTINET_COOKIE] = cookie
+        assert current_user().sub == managed_user.sub
+
+    assert len(lookups) == 1
+
+
+def test_logout_forgets_session(server):
+    """Test that logging out evicts the session from the cache."""
+    user = set_user_cookie(
+        register_user(
+            UserInfo(
+                family_name="test",
+                given_name="test",
+                name="test test",
+                picture="",
+                email="test@test.test",
+                sub=uuid4().hex,
+            )
+        )
+    )
+    cookie = user.multinet.session
+
+    try:
+        assert user_from_cookie(cookie) is not None
+        assert sessions.get(cookie) is not None
+
+        with server.session_transaction() as session:
+            session[MULTINET_COOKIE] = cookie
+
+        resp = server.get("/api/user/logout")
+        assert resp.status_code == 200
+
+        assert sessions.get(cookie) is None
+        assert user_from_cookie(cookie) is None
+    finally:
+        user_collection().delete(user._key)
@@ -0,0 +1,42 @@
+"""Tests for the utility functions."""
+from io import StringIO
+
+import pytest
+
+from multinet.util import EdgeTableTracker, validated_copy
+
+
+def test_edge_table_tracker():
+    """Test that edge table properties are gathered from edges as they arrive."""
+    edges = [
+        {"_from": "people/1", "_to": "clubs/a"},
+        {"_from": "people/2", "_to": "clubs/a"},
+        {"_from": "clubs/a", "_to": "places/x/y"},
+    ]
+
+    tracker = EdgeTableTracker()
+    for edge in edges:
+        tracker.observe(edge)
+
+    assert tracker.properties() == {
+        "from_tables": {"people", "clubs"},
+        "to_tables": {"clubs", "places"},
+    }
+
+
+def test_validated_copy():
+    """Test that a stream is copied as it is validated, or not at all if invalid."""
+    text = "x" * 100000
+
+    def validate(stream):
+        assert stream.read(10) == "x" * 10
+
+    with validated_copy(StringIO(text), validate) as copy:
+        assert copy.read() == text
+
+    def reject(stream):
+        stream.read(10)
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        validated_copy(StringIO(text), reject)
@@ -4,8 +4,10 @@ from multinet.db import (
     create_workspace,
     delete_workspace,
     rename_workspace,
+    set_workspace_permissions,
     workspace_exists,
     workspace_mapping,
+    workspace_mapping_collection,
 )
 
 
@@ -96,3 +98,35 @@ def test_workspace_rename(generated_workspace):
 
     assert new_exists
     assert not old_exists
+
+
+def test_write_after_outside_change(managed_workspace):
+    """Test that a change made by another worker doesn't break later writes."""
+    cached = workspace_mapping(managed_workspace)
+    permissions = dict(cached["permissions"], public=True)
+
+    # Change the mapping document behind this process's cache, as another worker
+    # would; the cached document's revision is now stale.
+    workspace_mapping_collection().update(
+        {"_key": cached["_key"], "permissions": permissions}
+    )
+    assert workspace_mapping(managed_workspace)["_rev"] == cached["_rev"]
+
+    updated = set_workspace_permissions(
+        managed_workspace, dict(permissions, readers=["reader"])
+    )
+    assert updated["public"]
+    assert updated["readers"] == ["reader"]
+
+    # The same goes for renaming.
+    cached = workspace_mapping(managed_workspace)
+    workspace_mapping_collection().update(
+        {"_key": cached["_key"], "permissions": permissions}
+    )
+
+    new_name = uuid4().hex
+    rename_workspace(managed_workspace, new_name)
+    assert workspace_exists(new_name)
+
+    # Let the fixture clean up.
+    rename_workspace(new_name, managed_workspace)